@@ -0,0 +1,161 @@
+"""Paginated, searchable tables for the admin dashboard.
+
+Every table is read one page at a time with keyset pagination (the page
+ends at the last row's sort key, so page 50 costs the same as page 1) and
+searched by case-insensitive name prefix. Both go through the NOCASE
+indexes added in migration 9, so a page reads ``limit + 1`` index entries
+however many seasons of history the database holds.
+
+* teams: name starts with ``q``
+* players: name starts with ``q``, optionally only one team's squad
+* matches: either team's name starts with ``q``, optionally one season or
+  stage, newest first
+"""
+import base64
+import binascii
+import json
+import string
+
+PAGE_SIZE = 25
+PAGE_MAX = 100
+OPTIONAL_TEXT = (str, type(None))
+
+# NOCASE folds ASCII letters (only) to lower case before comparing
+_NOCASE_FOLD = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(value, types):
+    """The sort key from a cursor, or None if it is malformed.
+
+    ``types`` holds the accepted type (or tuple of types) of each key value.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(value.encode()))
+    except (ValueError, TypeError, binascii.Error):
+        return None
+    if not isinstance(values, list) or len(values) != len(types):
+        return None
+    if not all(isinstance(v, t) and not isinstance(v, bool) for v, t in zip(values, types)):
+        return None
+    return values
+
+
+def prefix_range(q):
+    """``[low, high)`` under NOCASE covering every string that starts with ``q``.
+
+    The bounds are folded the way NOCASE folds the column. Folded text has no
+    upper-case letters, so after ``@`` the next character is ``[``.
+    """
+    q = q.translate(_NOCASE_FOLD)
+    following = chr(ord(q[-1]) + 1)
+    if "A" <= following <= "Z":
+        following = "["
+    return q, q[:-1] + following
+
+
+def _fetch(conn, select, conditions, params, order, count):
+    query = select
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += f" ORDER BY {order} LIMIT ?"
+    return conn.execute(query, params + [count]).fetchall()
+
+
+def _finish(rows, key, limit):
+    has_more = len(rows) > limit
+    rows = [dict(row) for row in rows[:limit]]
+    return rows, encode_cursor([rows[-1][k] for k in key]) if has_more else None
+
+
+def _page(conn, select, conditions, params, order, key, limit):
+    return _finish(_fetch(conn, select, conditions, params, order, limit + 1), key, limit)
+
+
+def teams_page(conn, q=None, cursor=None, limit=PAGE_SIZE):
+    conditions, params = [], []
+    if q:
+        conditions.append("name >= ? COLLATE NOCASE AND name < ? COLLATE NOCASE")
+        params.extend(prefix_range(q))
+    after = decode_cursor(cursor, (str, int)) if cursor else None
+    if after:
+        conditions.append("(name COLLATE NOCASE, id) > (?, ?)")
+        params.extend(after)
+    return _page(conn, "SELECT id, name, coach, year_established, badge FROM teams",
+                 conditions, params, "name COLLATE NOCASE, id", ("name", "id"), limit)
+
+
+def players_page(conn, q=None, team_id=None, cursor=None, limit=PAGE_SIZE):
+    conditions, params = [], []
+    if q:
+        conditions.append("p.name >= ? COLLATE NOCASE AND p.name < ? COLLATE NOCASE")
+        params.extend(prefix_range(q))
+    if team_id:
+        conditions.append("p.team_id = ?")
+        params.append(team_id)
+    after = decode_cursor(cursor, (str, int)) if cursor else None
+    if after:
+        conditions.append("(p.name COLLATE NOCASE, p.id) > (?, ?)")
+        params.extend(after)
+    return _page(conn, """
+        SELECT p.id, p.name, p.team_id, t.name AS team_name, p.goals, p.yellow_cards, p.red_cards
+        FROM players p
+        LEFT JOIN teams t ON p.team_id = t.id
+    """, conditions, params, "p.name COLLATE NOCASE, p.id", ("name", "id"), limit)
+
+
+def matches_page(conn, q=None, year=None, stage=None, cursor=None, limit=PAGE_SIZE):
+    conditions, params = [], []
+    if q:
+        teams = "SELECT id FROM teams WHERE name >= ? COLLATE NOCASE AND name < ? COLLATE NOCASE"
+        conditions.append(f"(m.team_a IN ({teams}) OR m.team_b IN ({teams}))")
+        params.extend(prefix_range(q) * 2)
+    if year:
+        conditions.append("m.year = ?")
+        params.append(year)
+    if stage:
+        conditions.append("m.stage = ?")
+        params.append(stage)
+    select = """
+        SELECT m.id, m.score_a, m.score_b, m.stage, m.venue, m.date, m.year,
+               t1.name AS team_a_name, t2.name AS team_b_name
+        FROM matches m
+        JOIN teams t1 ON m.team_a = t1.id
+        JOIN teams t2 ON m.team_b = t2.id
+    """
+    order, key = "m.date DESC, m.id DESC", ("date", "id")
+    after = decode_cursor(cursor, (OPTIONAL_TEXT, int)) if cursor else None
+    if not after:
+        return _page(conn, select, conditions, params, order, key, limit)
+    if after[0] is None:
+        return _page(conn, select, conditions + ["m.date IS NULL AND m.id < ?"], params + [after[1]],
+                     order, key, limit)
+    # Undated fixtures (NULL sorts lowest) follow the dated ones; each part is its own index range
+    rows = _fetch(conn, select, conditions + ["(m.date, m.id) < (?, ?)"], params + after, order, limit + 1)
+    if len(rows) <= limit:
+        rows += _fetch(conn, select, conditions + ["m.date IS NULL"], params, order, limit + 1 - len(rows))
+    return _finish(rows, key, limit)
+
+
+# name -> (page function, query-string filters it accepts besides q and cursor)
+TABLES = {
+    "teams": (teams_page, ()),
+    "players": (players_page, ("team_id",)),
+    "matches": (matches_page, ("year", "stage")),
+}
+
+
+def page_from_args(conn, table, args, prefix="", limit=PAGE_SIZE):
+    """Read ``table`` with filters taken from a request's query string.
+
+    ``prefix`` namespaces the parameters (``players_q``, ``players_cursor``)
+    when several tables share one page.
+    """
+    fetch, filters = TABLES[table]
+    kwargs = {name: args.get(prefix + name) or None for name in ("q", "cursor") + filters}
+    if kwargs["q"]:
+        kwargs["q"] = kwargs["q"].strip() or None
+    return fetch(conn, limit=min(max(limit, 1), PAGE_MAX), **kwargs)
@@ -0,0 +1,191 @@
+"""Admin saves, one atomic transaction per action.
+
+Each function opens ``BEGIN IMMEDIATE`` on the connection it is given, so
+the write lock is held from the first read that decides what to write. It
+then makes every write the action needs and commits once. Child rows go in
+with ``executemany``. The derived tables (standings.py, leaderboards.py,
+charts.py), the fixture change log and the data-version bumps are all part
+of that same commit. Any error rolls the whole action back, so a half-saved
+fixture or a team without its rating can no longer be left behind.
+
+``players.goals`` is a player's goal total. It may include goals from
+before fixtures were recorded, but it never falls below the player's goals
+in ``match_goals``, and it moves with them in the same transaction:
+scorers added to a fixture are credited, and deleting a fixture takes its
+goals back out. An edit that would set a total below the recorded goals is
+refused (``WriteError``).
+
+Match cards are recorded per team (``yellow_a`` ... ``red_b``), so no
+per-player breakdown exists for ``players.yellow_cards``/``red_cards`` to
+follow. Player cards stay admin-entered. The fixture's card columns feed
+the discipline leaderboard in the fixture's own transaction.
+
+Callers must not have a transaction open. Notifying live listeners
+(live.Broadcaster) is left to the caller, after the commit.
+"""
+import contextlib
+
+import cache
+import charts
+import leaderboards
+import live
+import standings
+
+MATCH_COLUMNS = ("team_a", "team_b", "score_a", "score_b", "yellow_a", "yellow_b", "red_a", "red_b",
+                 "venue", "date", "stage", "year")
+
+
+class WriteError(ValueError):
+    pass
+
+
+@contextlib.contextmanager
+def transaction(conn):
+    """``BEGIN IMMEDIATE`` ... ``COMMIT``, or ``ROLLBACK`` if the block raises."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+# ---------- Player goal totals ----------
+def _credit_scorers(conn, condition, params, sign):
+    conn.execute(f"""
+        UPDATE players SET goals = COALESCE(goals, 0) + :sign * s.total
+        FROM (
+            SELECT mg.player_id, SUM(COALESCE(mg.goals_scored, 1)) AS total
+            FROM match_goals mg
+            WHERE {condition}
+            GROUP BY mg.player_id
+        ) AS s
+        WHERE players.id = s.player_id
+    """, {"sign": sign, **params})
+
+
+def credit_scorers(conn, match_id, sign=1):
+    """Add (``sign=1``) or take back (``sign=-1``) one fixture's goals from its scorers' totals."""
+    _credit_scorers(conn, "mg.match_id = :match_id", {"match_id": match_id}, sign)
+
+
+def credit_scorer_range(conn, first_id, last_id, sign=1):
+    """Same as ``credit_scorers`` for every fixture with ``first_id <= id <= last_id``."""
+    _credit_scorers(conn, "mg.match_id BETWEEN :first_id AND :last_id",
+                    {"first_id": first_id, "last_id": last_id}, sign)
+
+
+def recorded_goals(conn, player_id):
+    return conn.execute("SELECT COALESCE(SUM(COALESCE(goals_scored, 1)), 0) FROM match_goals WHERE player_id = ?",
+                        (player_id,)).fetchone()[0]
+
+
+# ---------- Teams ----------
+def save_team_rating(conn, name, year, points, badge_path=None):
+    """Create the team if it is new and set its rating for ``year``; True if the rating was new."""
+    with transaction(conn):
+        if conn.execute("SELECT 1 FROM teams WHERE name = ?", (name,)).fetchone() is None:
+            conn.execute("INSERT INTO teams (name, badge) VALUES (?, ?)", (name, badge_path))
+        updated = conn.execute("UPDATE team_ratings SET points = ? WHERE team_name = ? AND year = ?",
+                               (points, name, year)).rowcount
+        if not updated:
+            conn.execute("INSERT INTO team_ratings (team_name, year, points) VALUES (?, ?, ?)", (name, year, points))
+        charts.refresh(conn, year)
+        cache.bump_versions(conn, "teams", "team_ratings")
+    return not updated
+
+
+def update_team(conn, team_id, name, coach, year_established, badge):
+    """Edit a team; a rename takes its rating history (and charts) to the new name."""
+    with transaction(conn):
+        if conn.execute("SELECT 1 FROM teams WHERE name = ? AND id != ?", (name, team_id)).fetchone():
+            raise WriteError(f"another team is already called {name}")
+        old = conn.execute("SELECT name FROM teams WHERE id = ?", (team_id,)).fetchone()
+        conn.execute("UPDATE teams SET name = ?, coach = ?, year_established = ?, badge = ? WHERE id = ?",
+                     (name, coach, year_established, badge, team_id))
+        if old is not None and old[0] != name:
+            years = [year for (year,) in conn.execute(
+                "SELECT DISTINCT year FROM team_ratings WHERE team_name = ?", (old[0],))]
+            conn.execute("UPDATE team_ratings SET team_name = ? WHERE team_name = ?", (name, old[0]))
+            for year in years:
+                charts.refresh(conn, year)
+            cache.bump_versions(conn, "teams", "team_ratings")
+        else:
+            cache.bump_versions(conn, "teams")
+
+
+def delete_team(conn, team_id):
+    with transaction(conn):
+        conn.execute("DELETE FROM teams WHERE id = ?", (team_id,))
+        cache.bump_versions(conn, "teams")
+
+
+# ---------- Players ----------
+def add_player(conn, name, team_id, goals=0, yellow_cards=0, red_cards=0):
+    with transaction(conn):
+        player_id = conn.execute("""
+            INSERT INTO players (name, team_id, goals, yellow_cards, red_cards) VALUES (?, ?, ?, ?, ?)
+        """, (name, team_id, goals, yellow_cards, red_cards)).lastrowid
+        cache.bump_versions(conn, "players")
+    return player_id
+
+
+def update_player(conn, player_id, goals, yellow_cards, red_cards):
+    with transaction(conn):
+        recorded = recorded_goals(conn, player_id)
+        if int(goals) < recorded:
+            raise WriteError(f"goals can't be lower than the {recorded} recorded in fixtures")
+        conn.execute("UPDATE players SET goals = ?, yellow_cards = ?, red_cards = ? WHERE id = ?",
+                     (goals, yellow_cards, red_cards, player_id))
+        cache.bump_versions(conn, "players")
+
+
+def delete_player(conn, player_id):
+    with transaction(conn):
+        conn.execute("DELETE FROM players WHERE id = ?", (player_id,))
+        cache.bump_versions(conn, "players")
+
+
+# ---------- Fixtures ----------
+def add_match(conn, match, scorers=()):
+    """Insert a fixture (``MATCH_COLUMNS`` → values) and its ``(player_id, goals)`` scorers."""
+    columns = [column for column in MATCH_COLUMNS if column in match]
+    with transaction(conn):
+        match_id = conn.execute(
+            f"INSERT INTO matches ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            [match[column] for column in columns]).lastrowid
+        conn.executemany("INSERT INTO match_goals (match_id, player_id, goals_scored) VALUES (?, ?, ?)",
+                         [(match_id, player_id, goals) for player_id, goals in scorers])
+        credit_scorers(conn, match_id)
+        standings.apply_match(conn, match_id)
+        leaderboards.apply_match(conn, match_id)
+        live.log_change(conn, match_id)
+        cache.bump_versions(conn, "matches", "match_goals", "players")
+    return match_id
+
+
+def update_match(conn, match_id, changes):
+    """Update a fixture's ``MATCH_COLUMNS`` from ``changes``; its scorers are untouched."""
+    columns = [column for column in MATCH_COLUMNS if column in changes]
+    with transaction(conn):
+        # Take the old result out of the derived tables and add the new one
+        standings.apply_match(conn, match_id, -1)
+        leaderboards.apply_match(conn, match_id, -1)
+        conn.execute(f"UPDATE matches SET {', '.join(f'{column} = ?' for column in columns)} WHERE id = ?",
+                     [changes[column] for column in columns] + [match_id])
+        standings.apply_match(conn, match_id)
+        leaderboards.apply_match(conn, match_id)
+        live.log_change(conn, match_id)
+        cache.bump_versions(conn, "matches")
+
+
+def delete_match(conn, match_id):
+    with transaction(conn):
+        standings.apply_match(conn, match_id, -1)
+        leaderboards.apply_match(conn, match_id, -1)
+        credit_scorers(conn, match_id, -1)
+        conn.execute("DELETE FROM match_goals WHERE match_id = ?", (match_id,))
+        conn.execute("DELETE FROM matches WHERE id = ?", (match_id,))
+        live.log_change(conn, match_id, deleted=True)
+        cache.bump_versions(conn, "matches", "match_goals", "players")
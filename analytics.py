@@ -0,0 +1,184 @@
+"""Season analytics computed from fixtures with NumPy.
+
+``load_season()`` reads a season's played fixtures in one query into flat
+arrays: team indexes, scores and matchday numbers. ``compute()`` then
+derives everything from those arrays with batched array operations, and
+never loops over individual fixtures in Python:
+
+* records and goals for/against (``bincount`` over both sides at once);
+* head-to-head matrices of games played, wins and goals (``bincount``
+  over flattened team-pair cells);
+* Elo ratings, updated once per matchday: all of a day's fixtures are
+  scored against the ratings from before that day, and a team's changes
+  for the day are summed. The only Python loop is over matchdays;
+* attack and defence strength: goals scored and conceded per game,
+  relative to the season's average;
+* form: results and points from each team's last ``FORM_MATCHES`` games.
+
+NumPy is imported on first use, not when the module loads, so web workers
+start as fast as they did before (see benchmarks/bench_startup.py).
+
+    python analytics.py [database] [--year 2025]
+"""
+import argparse
+import sqlite3
+
+ELO_BASE = 1500.0
+ELO_K = 30.0
+FORM_MATCHES = 5
+TABLES = ("matches", "teams")  # data versions a computed season depends on
+
+SEASON_QUERY = """
+    SELECT m.team_a, m.team_b, m.score_a, m.score_b, m.date
+    FROM matches m
+    WHERE m.year = ? AND m.score_a IS NOT NULL AND m.score_b IS NOT NULL
+    ORDER BY m.date, m.id
+"""
+
+
+class Season:
+    """One season's fixtures as arrays; ``team_ids[i]`` is team index ``i``."""
+
+    def __init__(self, year, team_ids, names, team_a, team_b, score_a, score_b, matchday):
+        self.year = year
+        self.team_ids = team_ids
+        self.names = names
+        self.team_a = team_a
+        self.team_b = team_b
+        self.score_a = score_a
+        self.score_b = score_b
+        self.matchday = matchday
+
+
+def load_season(conn, year):
+    import numpy as np
+
+    rows = conn.execute(SEASON_QUERY, (str(year),)).fetchall()
+    fixtures = np.array([tuple(row[:4]) for row in rows], dtype=np.int64).reshape(-1, 4)
+    dates = np.array([row[4] or "" for row in rows], dtype=str)
+    team_ids, sides = np.unique(fixtures[:, :2], return_inverse=True)
+    sides = sides.reshape(-1, 2)
+    _, matchday = np.unique(dates, return_inverse=True)
+
+    names = dict(conn.execute("SELECT id, name FROM teams"))
+    return Season(year, team_ids, [names.get(int(team_id), f"Team {team_id}") for team_id in team_ids],
+                  sides[:, 0], sides[:, 1], fixtures[:, 2], fixtures[:, 3], matchday.reshape(-1))
+
+
+def _elo(np, n, a, b, score_a, score_b, matchday):
+    ratings = np.full(n, ELO_BASE)
+    actual = np.sign(score_a - score_b) * 0.5 + 0.5
+    margin = np.abs(score_a - score_b)
+    # World Football Elo goal-difference weighting: 1, 1.5, then (11 + N) / 8
+    weight = np.where(margin <= 1, 1.0, np.where(margin == 2, 1.5, (11 + margin) / 8))
+    bounds = np.flatnonzero(np.diff(matchday)) + 1
+    for start, end in zip(np.r_[0, bounds], np.r_[bounds, len(a)]):
+        ia, ib = a[start:end], b[start:end]
+        expected = 1 / (1 + 10 ** ((ratings[ib] - ratings[ia]) / 400))
+        delta = ELO_K * weight[start:end] * (actual[start:end] - expected)
+        ratings += np.bincount(ia, delta, n) - np.bincount(ib, delta, n)
+    return ratings
+
+
+class SeasonAnalytics:
+    """Per-team arrays for one season; ``table()`` and ``team()`` turn them into dicts."""
+
+    def __init__(self, season, form_matches=FORM_MATCHES):
+        import numpy as np
+
+        self.year = season.year
+        self.names = season.names
+        self.index = {name: i for i, name in enumerate(season.names)}
+        n = len(season.team_ids)
+        a, b, sa, sb = season.team_a, season.team_b, season.score_a, season.score_b
+
+        self.played = np.bincount(a, minlength=n) + np.bincount(b, minlength=n)
+        self.wins = np.bincount(a, sa > sb, n) + np.bincount(b, sb > sa, n)
+        self.draws = np.bincount(a, sa == sb, n) + np.bincount(b, sa == sb, n)
+        self.losses = self.played - self.wins - self.draws
+        self.goals_for = np.bincount(a, sa, n) + np.bincount(b, sb, n)
+        self.goals_against = np.bincount(a, sb, n) + np.bincount(b, sa, n)
+
+        # h2h_*[i, j]: team i's games, wins and goals against team j, counted
+        # into the flattened i * n + j cells of an n x n matrix
+        cells_a, cells_b, size = a * n + b, b * n + a, n * n
+        self.h2h_played = (np.bincount(cells_a, minlength=size) + np.bincount(cells_b, minlength=size)).reshape(n, n)
+        self.h2h_wins = (np.bincount(cells_a, sa > sb, size) + np.bincount(cells_b, sb > sa, size)).astype(int).reshape(n, n)
+        self.h2h_goals = (np.bincount(cells_a, sa, size) + np.bincount(cells_b, sb, size)).astype(int).reshape(n, n)
+
+        self.elo = _elo(np, n, a, b, sa, sb, season.matchday)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            average = self.goals_for.sum() / max(self.played.sum(), 1)
+            self.attack = np.nan_to_num(self.goals_for / self.played / average)
+            self.defence = np.nan_to_num(self.goals_against / self.played / average)
+
+        # Form: each team's games in fixture order, both sides stacked, last N kept
+        team = np.concatenate([a, b])
+        points = np.concatenate([np.select([sa > sb, sa == sb], [3, 1], 0), np.select([sb > sa, sa == sb], [3, 1], 0)])
+        order = np.lexsort((np.tile(np.arange(len(a)), 2), team))
+        team, points = team[order], points[order]
+        ends = np.cumsum(np.bincount(team, minlength=n))
+        recent = ends[team] - np.arange(len(team)) <= form_matches
+        self.form_points = np.bincount(team[recent], points[recent], n).astype(int)
+        letters = np.array(["L", "D", "", "W"])[points[recent]]
+        counts = np.bincount(team[recent], minlength=n)
+        self.form = ["".join(chunk) for chunk in np.split(letters, np.cumsum(counts)[:-1])] if n else []
+
+    def _row(self, i):
+        return {
+            "team": self.names[i],
+            "played": int(self.played[i]),
+            "wins": int(self.wins[i]),
+            "draws": int(self.draws[i]),
+            "losses": int(self.losses[i]),
+            "goals_for": int(self.goals_for[i]),
+            "goals_against": int(self.goals_against[i]),
+            "elo": round(float(self.elo[i]), 1),
+            "attack": round(float(self.attack[i]), 2),
+            "defence": round(float(self.defence[i]), 2),
+            "form": self.form[i],
+            "form_points": int(self.form_points[i]),
+        }
+
+    def table(self):
+        """Every team, highest Elo first."""
+        return [self._row(i) for i in sorted(range(len(self.names)), key=lambda i: -self.elo[i])]
+
+    def team(self, name):
+        """One team's row plus its head-to-head record against each opponent, or None."""
+        i = self.index.get(name)
+        if i is None:
+            return None
+        row = self._row(i)
+        row["head_to_head"] = [{
+            "opponent": self.names[j],
+            "played": int(self.h2h_played[i, j]),
+            "wins": int(self.h2h_wins[i, j]),
+            "draws": int(self.h2h_played[i, j] - self.h2h_wins[i, j] - self.h2h_wins[j, i]),
+            "losses": int(self.h2h_wins[j, i]),
+            "goals_for": int(self.h2h_goals[i, j]),
+            "goals_against": int(self.h2h_goals[j, i]),
+        } for j in self.h2h_played[i].nonzero()[0]]
+        return row
+
+
+def compute(conn, year):
+    return SeasonAnalytics(load_season(conn, year))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Print a season's Elo table and form.")
+    parser.add_argument("database", nargs="?", default="ultimate_cup.db")
+    parser.add_argument("--year", type=int)
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.database)
+    year = args.year or int(conn.execute("SELECT MAX(year) FROM matches").fetchone()[0])
+    season = compute(conn, year)
+    conn.close()
+
+    print(f"📈 {year}")
+    for rank, row in enumerate(season.table(), start=1):
+        print(f"{rank:>3}. {row['team']:<28} Elo {row['elo']:>7.1f}  {row['wins']}-{row['draws']}-{row['losses']}  "
+              f"GF {row['goals_for']:>3} GA {row['goals_against']:>3}  form {row['form'] or '-'}")
@@ -1,10 +1,23 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash
-import sqlite3
-import pandas as pd
-import json                # only needed if you still use json elsewhere
-import plotly
-import plotly.express as px
-import plotly.io as pio    # <- for reliable serialization
+from flask import Flask, Response, render_template, request, redirect, url_for, session, flash, stream_with_context
+import admin_tables
+import admin_writes
+import analytics
+import assets
+import badges
+import cache
+import charts
+import db
+import export
+import importer
+import instrumentation
+import leaderboards
+import live
+import tournament
+from db import get_db, get_read_db
+import base64
+import binascii
+import io
+import json
 
 import os
 from werkzeug.utils import secure_filename
@@ -18,164 +31,246 @@ app.secret_key = "ultimatecup_secret"
 UPLOAD_FOLDER = 'static/uploads'
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+app.config['RESPONSE_CACHE_ENTRIES'] = 256
+app.config['RESPONSE_CACHE_BYTES'] = 32 * 1024 * 1024
+app.config['PUBLIC_MAX_AGE'] = 0  # browsers revalidate every time, usually getting a 304
 
 # ---------- Database Connection ----------
-def get_db():
-    conn = sqlite3.connect("ultimate_cup.db")
-    conn.row_factory = sqlite3.Row
-    return conn
+db.init_app(app)
+
+# ---------- Instrumentation ----------
+# Off unless ULTIMATE_CUP_METRICS / ULTIMATE_CUP_PROFILE_SLOW_MS are set
+instrumentation.init_app(app)
+
+# ---------- Response Cache ----------
+# Public pages are cached until an admin write bumps a table they read
+response_cache = cache.ResponseCache(app.config['RESPONSE_CACHE_ENTRIES'], app.config['RESPONSE_CACHE_BYTES'])
+instrumentation.register_collector(lambda: [
+    (f"response_cache_{name}", f"Response cache {name} in this worker.", value)
+    for name, value in response_cache.stats().items()
+])
+
+
+# ---------- Static Assets ----------
+# url_for('static', ...) resolves to fingerprinted, precompressed copies once
+# `python assets.py build` has run; hashed files are cached as immutable
+assets.init_app(app)
+app.jinja_env.globals.update(badge_url=badges.badge_url, badge_srcset=badges.badge_srcset,
+                              image_srcset=badges.image_srcset)
+
+
+@app.route('/cache_stats')
+def cache_stats():
+    if 'logged_in' not in session:
+        return {"error": "Login required"}, 401
+    return response_cache.stats()
 
 
 # ---------- Home ----------
 @app.route('/')
+@response_cache.cached()
 def index():
     return render_template('index.html')
 
 
+# ---------- Season Analytics ----------
+# Elo, form, goals and head-to-head from one vectorized pass per season (see
+# analytics.py), recomputed only when fixtures or teams change
+analytics_cache = cache.SeasonCache(analytics.compute)
+instrumentation.register_collector(lambda: [
+    (f"analytics_cache_{name}", f"Season analytics cache {name} in this worker.", value)
+    for name, value in analytics_cache.stats().items()
+])
+ANALYTICS_FIELDS = ("elo", "form", "form_points", "goals_for", "goals_against", "attack", "defence")
+
+
+def get_season_analytics(conn, year):
+    return analytics_cache.get(conn, year, cache.current_versions(conn, analytics.TABLES))
+
+
 # ---------- User Dashboard ----------
-@app.route('/user')
-def user_dashboard():
-    conn = get_db()
-    # df = pd.read_sql_query("SELECT * FROM team_ratings", conn)
-    df = pd.read_sql_query("""
+def get_team_ratings(conn, year):
+    rows = conn.execute("""
         SELECT r.team_name, r.year, r.points, t.badge
         FROM team_ratings r
         LEFT JOIN teams t ON r.team_name = t.name
+        WHERE r.year = ?
         ORDER BY r.points DESC
-    """, conn)
-    conn.close()
+    """, (year,)).fetchall()
+
+    table = []
+    for rank, row in enumerate(rows, start=1):
+        entry = dict(row)
+        entry["Rank"] = rank
+        table.append(entry)
+    return table
 
-    if df.empty:
-        conn.close()
-        return render_template('user_dashboard.html', year=None, table=[], graphJSON=None)
+
+@app.route('/user')
+@cache.conditional("team_ratings", "teams", "matches")
+@response_cache.cached("team_ratings", "teams", "matches")
+def user_dashboard():
+    conn = get_read_db()
 
     # --- Extract available years ---
-    years = sorted(df["year"].unique().tolist(), reverse=True)
+    years = [row["year"] for row in conn.execute(
+        "SELECT DISTINCT year FROM team_ratings ORDER BY year DESC"
+    ).fetchall()]
+
+    if not years:
+        return render_template('user_dashboard.html', year=None, table=[], chart_svg=None)
 
     # --- Get selected year from query params ---
-    selected_year = request.args.get('year', years[0])  # default to latest
-    selected_year = int(selected_year)
-
-    # --- Filter by year ---
-    df_year = df[df["year"] == selected_year].sort_values(by="points", ascending=False)
-    df_year["Rank"] = range(1, len(df_year) + 1)
-
-    # --- Create bar chart ---
-    fig = px.bar(
-        df_year,
-        x="team_name",
-        y="points",
-        color="team_name",
-        title=f"{selected_year} Ultimate Cup Team Ratings",
-        text="points"
-    )
-    fig.update_traces(textposition='outside')
-    fig.update_layout(showlegend=False)
+    selected_year = request.args.get('year', years[0], type=int)  # default to latest
 
-    graphJSON = json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
-    conn.close()
+    # --- Ranked table for the year, filtered in SQL ---
+    table = get_team_ratings(conn, selected_year)
+    season = {row["team"]: row for row in get_season_analytics(conn, selected_year).table()}
+    for entry in table:
+        entry["analytics"] = season.get(entry["team_name"])
+    # Pre-rendered SVG, re-drawn only when the season's ratings change (see charts.py)
+    chart_svg = charts.get_chart(conn, selected_year)
 
     return render_template(
         'user_dashboard.html',
         year=selected_year,
         years=years,
-        table=df_year.to_dict(orient='records'),
-        graphJSON=graphJSON
+        table=table,
+        chart_svg=chart_svg
     )
-def get_team_performance():
-    conn = get_db()
-    cur = conn.cursor()
 
-    query = """
-        SELECT 
-            t.id,
+
+def get_team_records(conn, year=None, team_name=None):
+    """W/D/L for every team (or just ``team_name``) in one grouped query.
+
+    ``year=None`` sums every season. Records come from the materialised
+    team_standings table (see standings.py).
+    """
+    rows = conn.execute("""
+        SELECT
             t.name,
-            SUM(CASE WHEN (m.team_a = t.id AND m.score_a > m.score_b)
-                      OR (m.team_b = t.id AND m.score_b > m.score_a) THEN 1 ELSE 0 END) AS wins,
-            SUM(CASE WHEN (m.team_a = t.id AND m.score_a < m.score_b)
-                      OR (m.team_b = t.id AND m.score_b < m.score_a) THEN 1 ELSE 0 END) AS losses,
-            SUM(CASE WHEN m.score_a = m.score_b THEN 1 ELSE 0 END) AS draws,
-            COUNT(m.id) AS total_matches
+            COALESCE(SUM(s.wins), 0) AS wins,
+            COALESCE(SUM(s.losses), 0) AS losses,
+            COALESCE(SUM(s.draws), 0) AS draws
         FROM teams t
-        LEFT JOIN matches m ON t.id IN (m.team_a, m.team_b)
+        LEFT JOIN team_standings s ON s.team_id = t.id AND (:year IS NULL OR s.year = :year)
+        WHERE :team IS NULL OR t.name = :team
         GROUP BY t.id, t.name
-    """
+        ORDER BY t.name
+    """, {"year": year, "team": team_name}).fetchall()
 
-    results = cur.execute(query).fetchall()
-    conn.close()
-
-    performance = []
-    for row in results:
-        total = row["total_matches"]
-        win_percent = (row["wins"] / total * 100) if total > 0 else 0
-        performance.append({
+    records = []
+    for row in rows:
+        total = row["wins"] + row["losses"] + row["draws"]
+        records.append({
             "team": row["name"],
             "wins": row["wins"],
             "losses": row["losses"],
             "draws": row["draws"],
-            "total": total,
-            "win_percent": round(win_percent, 1)
+            "win_percentage": (row["wins"] / total * 100) if total > 0 else 0
         })
+    return records
 
-@app.route('/team_summary')
-def team_summary():
-    team_name = request.args.get('team')
-    if not team_name:
-        return {"error": "No team provided"}, 400
 
-    conn = get_db()
-    cur = conn.cursor()
+def get_team_performance():
+    performance = [{
+        "team": record["team"],
+        "wins": record["wins"],
+        "losses": record["losses"],
+        "draws": record["draws"],
+        "total": record["wins"] + record["losses"] + record["draws"],
+        "win_percent": round(record["win_percentage"], 1)
+    } for record in get_team_records(get_read_db())]
 
-    # Find team ID
-    cur.execute("SELECT id FROM teams WHERE name = ?", (team_name,))
-    team = cur.fetchone()
-    if not team:
-        conn.close()
-        return {"error": "Team not found"}, 404
+    # 🔽 Sort teams by win percentage (highest first)
+    performance.sort(key=lambda x: x["win_percent"], reverse=True)
+
+    return performance
 
-    team_id = team["id"]
-
-    # Fetch matches involving the team
-    matches = cur.execute("""
-        SELECT team_a, team_b, score_a, score_b
-        FROM matches
-        WHERE team_a = ? OR team_b = ?
-    """, (team_id, team_id)).fetchall()
-
-    wins = losses = draws = 0
-    for m in matches:
-        if m["team_a"] == team_id:
-            if m["score_a"] > m["score_b"]:
-                wins += 1
-            elif m["score_a"] < m["score_b"]:
-                losses += 1
-            else:
-                draws += 1
-        elif m["team_b"] == team_id:
-            if m["score_b"] > m["score_a"]:
-                wins += 1
-            elif m["score_b"] < m["score_a"]:
-                losses += 1
-            else:
-                draws += 1
-
-    total = wins + losses + draws
-    win_percentage = (wins / total * 100) if total > 0 else 0
-
-    conn.close()
+
+@app.route('/api/team_summaries')
+@cache.conditional("teams", "matches")
+@response_cache.cached("teams", "matches")
+def api_team_summaries():
+    conn = get_read_db()
+    year = request.args.get('year', type=int)
+    records = get_team_records(conn, year)
+    if year is not None:
+        # Season figures only; all-time records have no single Elo or form
+        season = {row["team"]: row for row in get_season_analytics(conn, year).table()}
+        for record in records:
+            if record["team"] in season:
+                record.update({field: season[record["team"]][field] for field in ANALYTICS_FIELDS})
+    return {"year": year, "teams": {record["team"]: record for record in records}}
+
+
+# ---------- Leaderboards ----------
+LEADERBOARD_SIZE = 10
+LEADERBOARD_MAX = 50
+
+
+@app.route('/api/leaderboards')
+@cache.conditional("matches", "match_goals", "players", "teams")
+@response_cache.cached("matches", "match_goals", "players", "teams")
+def api_leaderboards():
+    """Top scorers and most-carded teams for ?year= (default latest) and optional ?stage=."""
+    conn = get_read_db()
+    year = request.args.get('year', type=int)
+    if year is None:
+        seasons = leaderboards.seasons(conn)
+        year = seasons[0] if seasons else None
+    stage = request.args.get('stage') or leaderboards.ALL_STAGES
+    limit = min(max(request.args.get('limit', LEADERBOARD_SIZE, type=int), 1), LEADERBOARD_MAX)
     return {
-        "team": team_name,
-        "wins": wins,
-        "losses": losses,
-        "draws": draws,
-        "win_percentage": win_percentage
+        "year": year,
+        "stage": stage or None,
+        "top_scorers": leaderboards.top_scorers(conn, year, stage, limit) if year else [],
+        "discipline": leaderboards.discipline(conn, year, stage, limit) if year else [],
     }
 
 
-    # 🔽 Sort teams by win percentage (highest first)
-    performance.sort(key=lambda x: x["win_percent"], reverse=True)
+# ---------- Tournament ----------
+# Group tables and knockout bracket, rebuilt only when fixtures or teams change (see tournament.py)
+tournament_cache = cache.SeasonCache(tournament.season)
+instrumentation.register_collector(lambda: [
+    (f"tournament_cache_{name}", f"Tournament cache {name} in this worker.", value)
+    for name, value in tournament_cache.stats().items()
+])
 
-    return performance
+
+@app.route('/api/tournament')
+@cache.conditional(*tournament.TABLES)
+def api_tournament():
+    """Group tables and bracket for ?year= (default the latest season with fixtures)."""
+    conn = get_read_db()
+    year = request.args.get('year', type=int)
+    if year is None:
+        latest = conn.execute("SELECT MAX(year) FROM matches").fetchone()[0]
+        if latest is None:
+            return {"year": None, "groups": [], "knockout": [], "champion": None}
+        year = int(latest)
+    season = tournament_cache.get(conn, year, cache.current_versions(conn, tournament.TABLES))
+    return {"year": year, **season}
+
+
+@app.route('/team_summary')
+@cache.conditional("teams", "matches")
+@response_cache.cached("teams", "matches")
+def team_summary():
+    team_name = request.args.get('team')
+    if not team_name:
+        return {"error": "No team provided"}, 400
+
+    conn = get_read_db()
+    year = request.args.get('year', type=int)
+    records = get_team_records(conn, year, team_name)
+    if not records:
+        return {"error": "Team not found"}, 404
+    record = records[0]
+    team = get_season_analytics(conn, year).team(team_name) if year is not None else None
+    if team:
+        record.update({field: team[field] for field in ANALYTICS_FIELDS + ("head_to_head",)})
+    return record
 
 
 
@@ -197,25 +292,32 @@ def login():
 
 
 # # ---------- Admin Dashboard ----------
+ADMIN_TABLES = ("teams", "players", "matches")
+
+
 @app.route('/admin')
 def admin_dashboard():
     if 'logged_in' not in session:
         return redirect(url_for('login'))
     conn = get_db()
-    teams = conn.execute("SELECT * FROM teams").fetchall()
-    players = conn.execute("""
-        SELECT p.*, t.name AS team_name
-        FROM players p
-        LEFT JOIN teams t ON p.team_id = t.id
-    """).fetchall()
-    matches = conn.execute("""
-        SELECT m.*, t1.name AS team_a_name, t2.name AS team_b_name
-        FROM matches m
-        JOIN teams t1 ON m.team_a = t1.id
-        JOIN teams t2 ON m.team_b = t2.id
-    """).fetchall()
-    conn.close()
-    return render_template('admin_dashboard.html', teams=teams, players=players, matches=matches)
+    # One page of each table; ?players_q=...&players_cursor=... pages and searches players, and so on
+    tables = {name: admin_tables.page_from_args(conn, name, request.args, prefix=f"{name}_")
+              for name in ADMIN_TABLES}
+    # Small list for the fixture form's team pickers; scorers are fetched per team
+    team_options = conn.execute("SELECT id, name FROM teams ORDER BY name COLLATE NOCASE, id").fetchall()
+    return render_template('admin_dashboard.html', tables=tables, team_options=team_options)
+
+
+@app.route('/api/admin/<table>')
+def api_admin_table(table):
+    """?q=&cursor=&limit= plus team_id (players) or year/stage (matches)."""
+    if 'logged_in' not in session:
+        return {"error": "Login required"}, 401
+    if table not in admin_tables.TABLES:
+        return {"error": f"Unknown table: {table}"}, 404
+    limit = request.args.get('limit', admin_tables.PAGE_SIZE, type=int)
+    rows, next_cursor = admin_tables.page_from_args(get_db(), table, request.args, limit=limit)
+    return {"rows": rows, "next_cursor": next_cursor}
 
 from werkzeug.utils import secure_filename
 import os
@@ -228,7 +330,6 @@ os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 def get_players(team_id):
     conn = get_db()
     players = conn.execute("SELECT id, name FROM players WHERE team_id = ?", (team_id,)).fetchall()
-    conn.close()
     return {"players": [dict(p) for p in players]}
 
 
@@ -243,39 +344,14 @@ def add_team():
 
         badge_path = None
         if badge and badge.filename != '':
-            badge_path = f"static/badges/{badge.filename}"
-            badge.save(badge_path)
-
-        conn = get_db()
-        cur = conn.cursor()
-
-        # Check if team exists
-        cur.execute("SELECT id FROM teams WHERE name = ?", (name,))
-        team = cur.fetchone()
-        if team is None:
-            cur.execute("INSERT INTO teams (name, badge) VALUES (?, ?)", (name, badge_path))
-            conn.commit()
-
-        # Check if team rating already exists for that year
-        cur.execute("SELECT id FROM team_ratings WHERE team_name = ? AND year = ?", (name, year))
-        existing = cur.fetchone()
-
-        if existing:
-            cur.execute("""
-                UPDATE team_ratings 
-                SET points = ? 
-                WHERE team_name = ? AND year = ?
-            """, (points, name, year))
-            flash(f"✅ {name}'s points updated for {year}.", "success")
-        else:
-            cur.execute("""
-                INSERT INTO team_ratings (team_name, year, points)
-                VALUES (?, ?, ?)
-            """, (name, year, points))
-            flash(f"✅ {name} added successfully for {year}.", "success")
+            # Resized, metadata-stripped and named by content hash; never the raw upload
+            badge_path = badges.store_badge(badge)
 
-        conn.commit()
-        conn.close()
+        # Team, rating and chart are saved together or not at all
+        if admin_writes.save_team_rating(get_db(), name, year, points, badge_path):
+            flash(f"✅ {name} added successfully for {year}.", "success")
+        else:
+            flash(f"✅ {name}'s points updated for {year}.", "success")
 
     except Exception as e:
         flash(f"❌ Error adding team: {e}", "error")
@@ -295,55 +371,48 @@ def add_player():
         yellow_cards = request.form.get('yellow_cards', 0)
         red_cards = request.form.get('red_cards', 0)
 
-        cur.execute("""
-            INSERT INTO players (name, team_id, goals, yellow_cards, red_cards)
-            VALUES (?, ?, ?, ?, ?)
-        """, (name, team_id, goals, yellow_cards, red_cards))
-
-        conn.commit()
-        conn.close()
+        admin_writes.add_player(conn, name, team_id, goals, yellow_cards, red_cards)
         return redirect(url_for('admin_dashboard'))
 
     # If GET: fetch all teams for dropdown
     teams = cur.execute("SELECT id, name FROM teams").fetchall()
-    conn.close()
     return render_template('add_player.html', teams=teams)
 
 
 # ---------- Edit Player ----------
+def form_count(field):
+    """A whole number of goals or cards from the form (blank is 0); WriteError if it isn't one."""
+    value = request.form.get(field, '').strip()
+    if not value:
+        return 0
+    if not (value.isascii() and value.isdigit()):
+        raise admin_writes.WriteError(f"{field.replace('_', ' ')} must be a whole number, not '{value}'")
+    return int(value)
+
+
 @app.route('/edit_player/<int:id>', methods=['GET', 'POST'])
 def edit_player(id):
     conn = get_db()
     cur = conn.cursor()
 
     if request.method == 'POST':
-        goals = request.form.get('goals', 0)
-        yellow_cards = request.form.get('yellow_cards', 0)
-        red_cards = request.form.get('red_cards', 0)
-
-        cur.execute("""
-            UPDATE players 
-            SET goals = ?, yellow_cards = ?, red_cards = ?
-            WHERE id = ?
-        """, (goals, yellow_cards, red_cards, id))
-
-        conn.commit()
-        conn.close()
+        try:
+            goals, yellow_cards, red_cards = (form_count(field) for field in ('goals', 'yellow_cards', 'red_cards'))
+            admin_writes.update_player(conn, id, goals, yellow_cards, red_cards)
+        except admin_writes.WriteError as e:
+            flash(f"❌ {e}", "error")
+            return redirect(url_for('edit_player', id=id))
         return redirect(url_for('admin_dashboard'))
 
     # If GET, fetch player info
     player = cur.execute("SELECT * FROM players WHERE id = ?", (id,)).fetchone()
-    conn.close()
-    return render_template('edit_player.html', player=player)
+    return render_template('edit_player.html', player=player, recorded_goals=admin_writes.recorded_goals(conn, id))
 
 
 # ---------- Delete Player ----------
 @app.route('/delete_player/<int:id>', methods=['GET'])
 def delete_player(id):
-    conn = get_db()
-    conn.execute("DELETE FROM players WHERE id = ?", (id,))
-    conn.commit()
-    conn.close()
+    admin_writes.delete_player(get_db(), id)
     return redirect(url_for('admin_dashboard'))
 
 # ---------- Add Match Fixture ----------
@@ -363,22 +432,13 @@ def add_match():
     stage = data.get('stage')
     year = date.split("-")[0] if date else "2025"
 
-    conn = get_db()
-    cur = conn.cursor()
-
-    # Insert match
-    cur.execute("""
-        INSERT INTO matches (team_a, team_b, score_a, score_b, yellow_a, yellow_b, red_a, red_b, venue, date, stage, year)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (team_a, team_b, score_a, score_b, yellow_a, yellow_b, red_a, red_b, venue, date, stage, year))
-    match_id = cur.lastrowid
-
-    # Insert goal scorers
+    # Goal scorers
     scorers = data.getlist('scorers[]')
     goals_a = data.getlist('goals_a[]')
     goals_b = data.getlist('goals_b[]')
 
     # Handle scorers for both teams
+    scorer_rows = []
     for i, player_id in enumerate(scorers):
         if player_id:
             goals_scored = 1
@@ -388,31 +448,95 @@ def add_match():
             elif i < len(goals_b):
                 goals_scored = int(goals_b[i]) if goals_b[i] else 1
 
-            cur.execute("""
-                INSERT INTO match_goals (match_id, player_id, goals_scored)
-                VALUES (?, ?, ?)
-            """, (match_id, player_id, goals_scored))
+            scorer_rows.append((player_id, goals_scored))
 
-    conn.commit()
-    conn.close()
+    # Fixture, scorers, player totals and derived tables in one transaction
+    admin_writes.add_match(get_db(), {
+        "team_a": team_a, "team_b": team_b, "score_a": score_a, "score_b": score_b,
+        "yellow_a": yellow_a, "yellow_b": yellow_b, "red_a": red_a, "red_b": red_b,
+        "venue": venue, "date": date, "stage": stage, "year": year,
+    }, scorer_rows)
+    broadcaster.notify()
 
     flash("✅ Match and scorers added successfully!", "success")
     return redirect(url_for('admin_dashboard'))
 
 
+# ---------- Bulk Import ----------
+@app.route('/admin/import', methods=['POST'])
+def bulk_import():
+    if 'logged_in' not in session:
+        return {"error": "Login required"}, 401
+
+    kind = request.form.get('kind')
+    upload = request.files.get('file')
+    fmt = importer.detect_format(upload.filename) if upload else None
+    if kind not in importer.IMPORTERS or fmt is None:
+        return {"error": "Choose fixtures or players and a CSV (.csv) or JSON Lines (.jsonl) file"}, 400
+
+    # Stream the upload straight into chunked inserts; nothing is loaded whole
+    stream = io.TextIOWrapper(upload.stream, encoding='utf-8', newline='')
+    report = importer.run_import(get_db(), kind, stream, fmt)
+    if kind == 'fixtures' and report.inserted:
+        broadcaster.notify()  # committed chunks are in match_changes even if the import stopped
+    if report.stopped:
+        return report.as_dict(), 400 if report.bad_file else 500
+    return report.as_dict()
+
+
+# ---------- Export ----------
+@app.route('/api/export/<kind>')
+def export_data(kind):
+    """Stream fixtures, players or ratings for ``?year=`` (repeatable; default every season)."""
+    if 'logged_in' not in session:
+        return {"error": "Login required"}, 401
+    fmt = request.args.get('format', 'csv')
+    years = request.args.getlist('year')
+    if kind not in export.EXPORTS or fmt not in export.FORMATS:
+        return {"error": "Export fixtures, players or ratings as csv, jsonl or parquet"}, 400
+    if not all(year.isascii() and year.isdigit() for year in years):
+        return {"error": "year must be a season such as 2025"}, 400
+    years = [int(year) for year in years]
+    if fmt == 'parquet' and not export.parquet_available():
+        return {"error": "Parquet export needs pyarrow on the server"}, 501
+
+    # Rows go out a chunk at a time; the read connection stays checked out until the last one
+    return Response(
+        stream_with_context(export.stream(get_read_db(), kind, fmt, years)),
+        mimetype=export.FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename="{export.filename(kind, fmt, years)}"'},
+    )
+
+
 # ---------- Matches Page ----------
-@app.route('/matches')
-def matches():
-    conn = get_db()
+MATCHES_PAGE_SIZE = 20
+MATCHES_PAGE_MAX = 100
 
-    # 🔹 Get all available years from the matches table
-    years = [row['year'] for row in conn.execute("SELECT DISTINCT year FROM matches ORDER BY year DESC").fetchall()]
 
-    # 🔹 Filters
-    selected_year = request.args.get('year')
-    selected_stage = request.args.get('stage')
+def encode_cursor(match):
+    return base64.urlsafe_b64encode(json.dumps([match["date"], match["id"]]).encode()).decode()
+
+
+def decode_cursor(value):
+    """Return the (date, id) a page continues after, or None if malformed.
+
+    The date is None when the page ended on a fixture without a date.
+    """
+    try:
+        date, match_id = json.loads(base64.urlsafe_b64decode(value.encode()))
+    except (ValueError, TypeError, binascii.Error):
+        return None
+    if not (date is None or isinstance(date, str)) or type(match_id) is not int:
+        return None
+    return date, match_id
+
 
-    # 🔹 Base query
+def get_matches_page(conn, year=None, stage=None, after=None, limit=MATCHES_PAGE_SIZE):
+    """One page of fixtures, newest first, keyed on (date, id).
+
+    Returns the match dicts (with scorers) and the cursor for the next page,
+    or None when this is the last one.
+    """
     query = """
         SELECT 
             m.id, m.team_a, m.team_b, m.score_a, m.score_b,
@@ -427,31 +551,79 @@ def matches():
     params = []
 
     # 🔸 Apply filters dynamically
-    if selected_year:
+    if year:
         conditions.append("m.year = ?")
-        params.append(selected_year)
-    if selected_stage:
+        params.append(year)
+    if stage:
         conditions.append("m.stage = ?")
-        params.append(selected_stage)
-
-    if conditions:
-        query += " WHERE " + " AND ".join(conditions)
-    query += " ORDER BY m.date DESC"
-
-    matches_rows = conn.execute(query, params).fetchall()
-    matches_data = []
+        params.append(stage)
+
+    def fetch(condition, condition_params, count):
+        where = conditions + [condition] if condition else conditions
+        sql = query + (" WHERE " + " AND ".join(where) if where else "")
+        sql += " ORDER BY m.date DESC, m.id DESC LIMIT ?"
+        return conn.execute(sql, params + condition_params + [count]).fetchall()
+
+    # Dated fixtures come first and undated ones (NULL sorts lowest) after them.
+    # Past the first page each part is read as its own index range, so a deep
+    # page still seeks instead of scanning from the top.
+    wanted = limit + 1  # one extra row tells us whether another page exists
+    if after is None:
+        matches_rows = fetch(None, [], wanted)
+    elif after[0] is None:
+        matches_rows = fetch("m.date IS NULL AND m.id < ?", [after[1]], wanted)
+    else:
+        matches_rows = fetch("(m.date, m.id) < (?, ?)", list(after), wanted)
+        if len(matches_rows) < wanted:
+            matches_rows += fetch("m.date IS NULL", [], wanted - len(matches_rows))
+
+    has_more = len(matches_rows) > limit
+    matches_data = build_match_dicts(conn, matches_rows[:limit])
+
+    next_cursor = encode_cursor(matches_data[-1]) if has_more else None
+    return matches_data, next_cursor
+
+
+def get_matches_by_id(conn, match_ids):
+    """Current fixture dicts for ``match_ids``, in the same shape as a page."""
+    if not match_ids:
+        return []
+    placeholders = ", ".join("?" * len(match_ids))
+    rows = conn.execute(f"""
+        SELECT 
+            m.id, m.team_a, m.team_b, m.score_a, m.score_b,
+            m.yellow_a, m.yellow_b, m.red_a, m.red_b,
+            m.stage, m.date, m.venue, m.year,
+            t1.name AS team_a_name, t2.name AS team_b_name
+        FROM matches m
+        JOIN teams t1 ON m.team_a = t1.id
+        JOIN teams t2 ON m.team_b = t2.id
+        WHERE m.id IN ({placeholders})
+    """, list(match_ids)).fetchall()
+    return build_match_dicts(conn, rows)
+
+
+def build_match_dicts(conn, matches_rows):
+    """Fixture dicts, with scorers, for rows of the matches/teams join."""
+    # 🔹 Load every scorer for the page in one query
+    scorers_by_match = {}
+    if matches_rows:
+        placeholders = ", ".join("?" * len(matches_rows))
+        scorers_query = f"""
+            SELECT mg.match_id, p.name AS player_name, mg.goals_scored, p.team_id
+            FROM match_goals mg
+            JOIN players p ON mg.player_id = p.id
+            WHERE mg.match_id IN ({placeholders})
+            ORDER BY mg.match_id, mg.id
+        """
+        for row in conn.execute(scorers_query, [match["id"] for match in matches_rows]):
+            scorers_by_match.setdefault(row["match_id"], []).append(row)
 
     # 🔹 Build match data + goal scorers
+    matches_data = []
     for match in matches_rows:
         match = dict(match)
-
-        scorers_query = """
-            SELECT p.name AS player_name, mg.goals_scored, p.team_id
-            FROM match_goals mg
-            JOIN players p ON mg.player_id = p.id
-            WHERE mg.match_id = ?
-        """
-        goal_rows = conn.execute(scorers_query, (match["id"],)).fetchall()
+        goal_rows = scorers_by_match.get(match["id"], [])
 
         team_a_scorers = [f"{row['player_name']} ({row['goals_scored']})" for row in goal_rows if row["team_id"] == match["team_a"]]
         team_b_scorers = [f"{row['player_name']} ({row['goals_scored']})" for row in goal_rows if row["team_id"] == match["team_b"]]
@@ -473,19 +645,110 @@ def matches():
             "team_a_scorers": team_a_scorers,
             "team_b_scorers": team_b_scorers
         })
+    return matches_data
 
-    conn.close()
+
+@app.route('/matches')
+@cache.conditional("matches", "teams", "match_goals", "players")
+@response_cache.cached("matches", "teams", "match_goals", "players")
+def matches():
+    conn = get_read_db()
+
+    # 🔹 Get all available years from the matches table
+    years = [row['year'] for row in conn.execute("SELECT DISTINCT year FROM matches ORDER BY year DESC").fetchall()]
+
+    # 🔹 Filters
+    selected_year = request.args.get('year')
+    selected_stage = request.args.get('stage')
+
+    # 🔹 First page only; the template fetches the rest from /api/matches
+    matches_data, next_cursor = get_matches_page(conn, selected_year, selected_stage)
+
+    # 🔹 Live updates pick up from the change log as of this render
+    live_since = live.latest_change(conn)
 
     # 🔹 Render the template
     return render_template(
         'matches.html',
         matches=matches_data,
+        next_cursor=next_cursor,
+        live_since=live_since,
         years=years,
         selected_year=selected_year,
         selected_stage=selected_stage
     )
 
 
+# ---------- API: Fixtures ----------
+@app.route('/api/matches')
+@cache.conditional("matches", "teams", "match_goals", "players")
+def api_matches():
+    after = None
+    if request.args.get('cursor'):
+        after = decode_cursor(request.args['cursor'])
+        if after is None:
+            return {"error": "Invalid cursor"}, 400
+    limit = min(max(request.args.get('limit', MATCHES_PAGE_SIZE, type=int), 1), MATCHES_PAGE_MAX)
+
+    matches_data, next_cursor = get_matches_page(
+        get_read_db(), request.args.get('year'), request.args.get('stage'), after, limit
+    )
+
+    def generate():
+        yield '{"matches": ['
+        for i, match in enumerate(matches_data):
+            yield (", " if i else "") + json.dumps(match)
+        yield '], "next_cursor": ' + json.dumps(next_cursor) + '}'
+
+    return Response(generate(), mimetype='application/json')
+
+
+# ---------- Live Scores (Server-Sent Events) ----------
+# Each open stream holds a thread, so streaming is off under the Procfile's sync
+# gunicorn workers (a fan would pin the worker). asgi.py turns it on and runs
+# streams on their own pool; ULTIMATE_CUP_LIVE_UPDATES=1 turns it on elsewhere.
+# Without it the matches page polls /api/matches/changes instead.
+app.config['LIVE_UPDATES'] = os.environ.get('ULTIMATE_CUP_LIVE_UPDATES', '') not in ('', '0')
+app.config['LIVE_STREAM_MAX'] = int(os.environ.get('ULTIMATE_CUP_LIVE_STREAM_MAX', 32))  # per worker
+app.config['LIVE_STREAM_SECONDS'] = 60  # then the browser reconnects; also frees a thread whose client left
+app.config['LIVE_POLL_SECONDS'] = 15
+broadcaster = live.Broadcaster(lambda: db.get_pool(app), get_matches_by_id)
+instrumentation.register_collector(lambda: [
+    ("live_stream_subscribers", "Open live score streams in this worker.", broadcaster.stats()["subscribers"]),
+])
+
+
+@app.route('/api/matches/stream')
+def match_stream():
+    if not app.config['LIVE_UPDATES']:
+        return {"error": "Live streaming is off; poll /api/matches/changes"}, 404
+    since = request.headers.get('Last-Event-ID', type=int)
+    if since is None:
+        since = request.args.get('since', type=int)
+    try:
+        body = live.event_stream(broadcaster, since, app.config['LIVE_STREAM_SECONDS'],
+                                 app.config['LIVE_STREAM_MAX'])
+    except live.StreamLimit:
+        return {"error": "Too many live streams; poll /api/matches/changes"}, 503, {"Retry-After": "60"}
+    return Response(
+        body,
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
+@app.route('/api/matches/changes')
+@cache.conditional("matches", "teams")
+def match_changes():
+    """Polling fallback: the stream's events after change id ``?since=`` (a 304 while nothing changed)."""
+    since = request.args.get('since', 0, type=int)
+    events = live.changes(get_read_db(), get_matches_by_id, since)
+    return {
+        "events": [{"id": event_id, "match": payload} for event_id, payload in events],
+        "last_id": events[-1][0] if events else since,
+    }
+
+
 # @app.route('/add_team', methods=['POST'])
 # def add_team():
 #     if 'logged_in' not in session:
@@ -576,29 +839,23 @@ def matches():
 # ---- TEAMS ----
 @app.route('/edit_team/<int:id>', methods=['POST'])
 def edit_team(id):
-    conn = get_db()
-    conn.execute("""
-        UPDATE teams 
-        SET name = ?, coach = ?, year_established = ?, badge = ?
-        WHERE id = ?
-    """, (
-        request.form['name'],
-        request.form.get('coach'),
-        request.form.get('year_established'),
-        request.form.get('badge'),
-        id
-    ))
-    conn.commit()
-    conn.close()
+    try:
+        admin_writes.update_team(
+            get_db(),
+            id,
+            request.form['name'],
+            request.form.get('coach'),
+            request.form.get('year_established'),
+            request.form.get('badge'),
+        )
+    except admin_writes.WriteError as e:
+        flash(f"❌ {e}", "error")
     return redirect(url_for('admin_dashboard'))
 
 
 @app.route('/delete_team/<int:id>', methods=['POST'])
 def delete_team(id):
-    conn = get_db()
-    conn.execute("DELETE FROM teams WHERE id = ?", (id,))
-    conn.commit()
-    conn.close()
+    admin_writes.delete_team(get_db(), id)
     return redirect(url_for('admin_dashboard'))
 
 
@@ -640,28 +897,28 @@ def edit_match(match_id):
     cur = conn.cursor()
 
     if request.method == 'POST':
-        cur.execute("""
-            UPDATE matches
-            SET team_a = ?, team_b = ?, score_a = ?, score_b = ?, stage = ?, venue = ?, date = ?
-            WHERE id = ?
-        """, (
-            request.form['team_a'],
-            request.form['team_b'],
-            request.form['score_a'],
-            request.form['score_b'],
-            request.form['stage'],
-            request.form['venue'],
-            request.form['date'],
-            match_id
-        ))
-        conn.commit()
-        conn.close()
+        date = request.form['date']
+        changes = {
+            "team_a": request.form['team_a'],
+            "team_b": request.form['team_b'],
+            "score_a": request.form['score_a'],
+            "score_b": request.form['score_b'],
+            "stage": request.form['stage'],
+            "venue": request.form['venue'],
+            "date": date,
+            "year": date.split("-")[0] if date else None,
+        }
+        # Cards are optional on the edit form; missing ones are left as they were
+        for column in ("yellow_a", "yellow_b", "red_a", "red_b"):
+            if request.form.get(column, '') != '':
+                changes[column] = request.form.get(column, type=int)
+        admin_writes.update_match(conn, match_id, changes)
+        broadcaster.notify()
         return redirect(url_for('admin_dashboard'))
 
     # If GET: show edit form
     match = cur.execute("SELECT * FROM matches WHERE id = ?", (match_id,)).fetchone()
     teams = cur.execute("SELECT id, name FROM teams").fetchall()
-    conn.close()
 
     return render_template('edit_match.html', match=match, teams=teams)
 
@@ -670,10 +927,8 @@ def edit_match(match_id):
 # ---------- DELETE MATCH FIXTURE ----------
 @app.route('/delete_match/<int:match_id>', methods=['POST'])
 def delete_match(match_id):
-    conn = get_db()
-    conn.execute("DELETE FROM matches WHERE id = ?", (id,))
-    conn.commit()
-    conn.close()
+    admin_writes.delete_match(get_db(), match_id)
+    broadcaster.notify()
     flash("🗑️ Match fixture deleted successfully.", "info")
     return redirect(url_for('admin_dashboard'))
 
@@ -0,0 +1,79 @@
+"""ASGI entry point for serving the app from an event loop.
+
+    uvicorn asgi:application --workers 4
+
+Socket I/O, including slow clients reading or uploading, is handled by the
+event loop, so a slow connection no longer pins a whole worker. The views
+themselves stay synchronous Flask views: every one of them works through
+sqlite3, which has no async API, so async handlers would only have moved
+the same blocking calls onto threads while forking the code base. a2wsgi
+runs the unchanged views on bounded thread pools instead:
+
+* public reads (GET/HEAD of ``PUBLIC_READ_ENDPOINTS``: the pages, public
+  JSON APIs and static files) run on ``ASGI_READ_THREADS`` threads, one per
+  pooled SQLite connection by default;
+* the live scores stream (see live.py) runs on its own pool, one thread per
+  stream up to ``LIVE_STREAM_MAX`` plus a few spare to turn further streams
+  away quickly, so open streams can't take the threads page loads need.
+  Streaming is on by default here (``ULTIMATE_CUP_LIVE_UPDATES=0`` turns it
+  off) and off under plain gunicorn;
+* everything else (admin pages and APIs, exports, form posts, uploads) runs
+  on ``ASGI_ADMIN_THREADS`` threads, so a burst of public traffic can't
+  starve the admin routes, or the other way round.
+"""
+import os
+
+from a2wsgi import WSGIMiddleware
+from werkzeug.exceptions import HTTPException
+
+from app import app
+
+# Listed one by one: a new route is admin until it is added here
+PUBLIC_READ_ENDPOINTS = {
+    "index", "user_dashboard", "matches", "team_summary", "static", "get_players",
+    "api_team_summaries", "api_leaderboards", "api_tournament", "api_matches", "match_changes",
+}
+LIVE_STREAM_ENDPOINT = "match_stream"
+READ_METHODS = ("GET", "HEAD")
+LIVE_SPARE_THREADS = 4
+
+
+def route_pool(flask_app, method, path):
+    """``"read"``, ``"live"`` or ``"admin"``: the pool a request runs on."""
+    if method not in READ_METHODS:
+        return "admin"
+    try:
+        rule, _ = flask_app.url_map.bind("").match(path, method, return_rule=True)
+    except HTTPException:
+        return "admin"
+    if rule.endpoint == LIVE_STREAM_ENDPOINT:
+        return "live"
+    if rule.endpoint in PUBLIC_READ_ENDPOINTS:
+        return "read"
+    return "admin"
+
+
+class PooledWSGI:
+    """Serve a WSGI app over ASGI, each request on the thread pool ``route_pool`` picks."""
+
+    def __init__(self, wsgi_app, **threads):
+        self.wsgi_app = wsgi_app
+        self.pools = {name: WSGIMiddleware(wsgi_app, workers=count) for name, count in threads.items()}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.pools["read"](scope, receive, send)
+        pool = self.pools[route_pool(self.wsgi_app, scope["method"], scope["path"])]
+        await pool(scope, receive, send)
+
+
+app.config.setdefault("ASGI_READ_THREADS", int(os.environ.get("ASGI_READ_THREADS", app.config["DB_POOL_SIZE"])))
+app.config["LIVE_UPDATES"] = os.environ.get("ULTIMATE_CUP_LIVE_UPDATES", "1") != "0"
+app.config.setdefault("ASGI_ADMIN_THREADS", int(os.environ.get("ASGI_ADMIN_THREADS", 4)))
+
+application = PooledWSGI(
+    app,
+    read=app.config["ASGI_READ_THREADS"],
+    live=app.config["LIVE_STREAM_MAX"] + LIVE_SPARE_THREADS,
+    admin=app.config["ASGI_ADMIN_THREADS"],
+)
@@ -0,0 +1,200 @@
+"""Fingerprinted, precompressed static assets.
+
+``python assets.py build`` copies every file under ``static/`` to
+``static/dist/`` with its content hash in the name
+(``images/stadium row.jpg`` -> ``dist/images/stadium row.1a2b3c4d5e6f7a8b.jpg``),
+writes ``.gz`` (and ``.br`` when the ``brotli`` package is installed) next to
+the copies that compress well, and records the mapping in
+``static/dist/manifest.json``.
+
+Once ``init_app`` is wired in, ``url_for('static', filename=...)`` resolves
+through the manifest, so templates pick up the hashed names without
+changes. Hashed files are served with ``Cache-Control: immutable`` and the
+best precompressed encoding the client accepts. Without a manifest (no build
+step has run yet) everything falls back to the plain files.
+
+``build_version()`` fingerprints what a page is rendered with besides the
+data: the templates (taken at startup) and the manifest. cache.py mixes it
+into ETags, so a deploy invalidates pages browsers already hold.
+
+    python assets.py build [static_root]
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+import sys
+
+from flask import request, send_from_directory
+
+import badges
+
+DIST = "dist"
+MANIFEST = "manifest.json"
+IMMUTABLE_MAX_AGE = 31536000
+
+# Only keep a compressed copy when it is meaningfully smaller (images rarely are)
+MIN_SAVING = 0.05
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _fingerprint(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def _tree_fingerprint(root):
+    digest = hashlib.sha256()
+    for directory, subdirs, files in os.walk(root):
+        subdirs.sort()
+        for name in sorted(files):
+            path = os.path.join(directory, name)
+            digest.update(f"{os.path.relpath(path, root)}:{_fingerprint(path)};".encode())
+    return digest.hexdigest()[:16]
+
+
+def _precompress(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    compressors = [(".gz", lambda d: gzip.compress(d, compresslevel=9, mtime=0))]
+    try:
+        import brotli
+        compressors.append((".br", lambda d: brotli.compress(d, quality=11)))
+    except ImportError:
+        pass
+    written = []
+    for suffix, compress in compressors:
+        compressed = compress(data)
+        if len(compressed) <= len(data) * (1 - MIN_SAVING):
+            with open(path + suffix, "wb") as f:
+                f.write(compressed)
+            written.append(suffix)
+    return written
+
+
+def build(static_root="static"):
+    """Fingerprint everything under ``static_root`` and return the manifest.
+
+    Copies from earlier builds are left in place, so pages rendered before a
+    deploy can still load the assets they reference.
+    """
+    dist_root = os.path.join(static_root, DIST)
+
+    manifest = {}
+    for directory, subdirs, files in os.walk(static_root):
+        subdirs[:] = sorted(d for d in subdirs if os.path.join(directory, d) != dist_root)
+        for name in sorted(files):
+            source = os.path.join(directory, name)
+            logical = os.path.relpath(source, static_root).replace(os.sep, "/")
+            if badges.is_content_hashed(name) or name.startswith("."):
+                continue  # already immutable under its own name
+            stem, ext = os.path.splitext(logical)
+            hashed = f"{DIST}/{stem}.{_fingerprint(source)}{ext}"
+            target = os.path.join(static_root, hashed)
+            if not os.path.exists(target):
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.copyfile(source, target)
+                _precompress(target)
+            manifest[logical] = hashed
+
+    os.makedirs(dist_root, exist_ok=True)
+    with open(os.path.join(dist_root, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+class Manifest:
+    """``static/dist/manifest.json``, re-read whenever the file changes."""
+
+    def __init__(self, static_folder):
+        self.path = os.path.join(static_folder, DIST, MANIFEST)
+        self._mtime = None
+        self._files = {}
+        self._hashed = frozenset()
+        self._digest = ""
+
+    def _load(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            mtime = None
+        if mtime != self._mtime:
+            files, digest = {}, ""
+            if mtime is not None:
+                with open(self.path, "rb") as f:
+                    data = f.read()
+                files, digest = json.loads(data), hashlib.sha256(data).hexdigest()[:16]
+            self._files, self._hashed, self._digest, self._mtime = files, frozenset(files.values()), digest, mtime
+
+    def lookup(self, filename):
+        self._load()
+        return self._files.get(filename, filename)
+
+    def is_hashed(self, filename):
+        self._load()
+        return filename in self._hashed
+
+    def digest(self):
+        """Hash of the manifest's contents; empty without a manifest."""
+        self._load()
+        return self._digest
+
+
+def is_immutable(manifest, filename):
+    return manifest.is_hashed(filename) or badges.is_content_hashed(filename)
+
+
+def build_version(app):
+    """Fingerprint of the templates and asset manifest the app is serving."""
+    return f"{app.extensions['template_fingerprint']}.{app.extensions['asset_manifest'].digest()}"
+
+
+def init_app(app):
+    manifest = Manifest(app.static_folder)
+    app.extensions["asset_manifest"] = manifest
+    app.extensions["template_fingerprint"] = _tree_fingerprint(os.path.join(app.root_path, app.template_folder))
+
+    @app.url_defaults
+    def hashed_static_urls(endpoint, values):
+        if endpoint == "static" and "filename" in values:
+            values["filename"] = manifest.lookup(values["filename"])
+
+    @app.before_request
+    def serve_precompressed():
+        if request.endpoint != "static":
+            return None
+        filename = (request.view_args or {}).get("filename", "")
+        if not manifest.is_hashed(filename):
+            return None
+        for encoding, suffix in ENCODINGS:
+            if encoding in request.accept_encodings and os.path.isfile(os.path.join(app.static_folder, filename + suffix)):
+                response = send_from_directory(
+                    app.static_folder, filename + suffix,
+                    mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream")
+                response.headers["Content-Encoding"] = encoding
+                response.vary.add("Accept-Encoding")
+                return response
+        return None
+
+    @app.after_request
+    def cache_immutable_assets(response):
+        if (request.endpoint == "static" and response.status_code in (200, 206, 304)
+                and is_immutable(manifest, (request.view_args or {}).get("filename", ""))):
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = IMMUTABLE_MAX_AGE
+            response.cache_control.immutable = True
+            response.vary.add("Accept-Encoding")
+        return response
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "build":
+        sys.exit(__doc__)
+    built = build(sys.argv[2] if len(sys.argv) > 2 else "static")
+    print(f"✅ Fingerprinted {len(built)} static files.")
@@ -0,0 +1,208 @@
+"""Image pipeline for team badges and the site's photos.
+
+Uploads are never served as-is: each one is decoded, stripped of metadata
+(EXIF, ICC profiles, text chunks) and re-encoded into a few sized variants,
+WebP plus a PNG/JPEG fallback. Templates offer every size through
+``srcset`` and the browser picks the one the screen needs. Each variant is named after the SHA-256 of
+the original bytes, e.g. ``static/badges/3f2a9c0d1b7e6a54-thumb.webp``.
+The same content always maps to the same names, so those files never change
+and can be served with far-future ``immutable`` cache headers.
+
+Pillow is imported on first use so web workers that never see an upload
+don't pay for it.
+
+    python badges.py backfill [database]
+"""
+import hashlib
+import io
+import json
+import os
+import re
+import sqlite3
+import sys
+
+from flask import url_for
+
+STATIC_ROOT = "static"
+BADGE_DIR = os.path.join(STATIC_ROOT, "badges")
+IMAGE_DIR = os.path.join(STATIC_ROOT, "images")
+IMAGE_MANIFEST = os.path.join(STATIC_ROOT, "image_variants.json")
+
+# Longest side in pixels, also used as the srcset width. Badges are drawn at
+# 40px: thumb covers 2x screens, medium denser ones. Photos are 250px cards.
+BADGE_SIZES = {"thumb": 80, "medium": 256}
+IMAGE_SIZES = {"medium": 800, "large": 1600}
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".gif")
+HASHED_NAME = re.compile(r"^[0-9a-f]{16}-[a-z]+\.(webp|png|jpg)$")
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def is_content_hashed(filename):
+    return bool(HASHED_NAME.match(os.path.basename(filename)))
+
+
+def _encode(image, fmt):
+    buffer = io.BytesIO()
+    if fmt == "webp":
+        image.save(buffer, "WEBP", quality=82, method=6)
+    elif fmt == "png":
+        image.save(buffer, "PNG", optimize=True)
+    else:
+        image.convert("RGB").save(buffer, "JPEG", quality=82, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def save_variants(data, dest_dir, sizes, fallback=None):
+    """Write every size/format variant of ``data`` into ``dest_dir``.
+
+    Each size gets WebP plus ``fallback`` ("png" or "jpg"), which by default
+    is PNG for images with transparency and JPEG for the rest. Returns
+    ``{variant: {fmt: path}}``. Files that already exist are left alone,
+    since the same name always means the same content.
+    """
+    from PIL import Image, ImageOps
+
+    digest = content_hash(data)
+    with Image.open(io.BytesIO(data)) as source:
+        source = ImageOps.exif_transpose(source)
+        has_alpha = source.mode in ("RGBA", "LA", "P") and (
+            source.mode != "P" or "transparency" in source.info)
+        source = source.convert("RGBA" if has_alpha else "RGB")
+        fallback = fallback or ("png" if has_alpha else "jpg")
+
+        os.makedirs(dest_dir, exist_ok=True)
+        variants = {}
+        for variant, longest_side in sizes.items():
+            image = source.copy()
+            image.thumbnail((longest_side, longest_side), Image.LANCZOS)
+            image.info = {}  # drop EXIF/ICC/text so nothing is re-embedded
+            variants[variant] = {}
+            for fmt in ("webp", fallback):
+                path = os.path.join(dest_dir, f"{digest}-{variant}.{fmt}")
+                if not os.path.exists(path):
+                    with open(path, "wb") as f:
+                        f.write(_encode(image, fmt))
+                variants[variant][fmt] = path.replace(os.sep, "/")
+    return variants
+
+
+def store_badge(upload, dest_dir=BADGE_DIR):
+    """Process an uploaded badge and return the path stored in ``teams.badge``.
+
+    That is the PNG thumbnail; ``badge_url()`` turns it (or its WebP sibling)
+    into a URL.
+    """
+    data = upload.read()
+    try:
+        variants = save_variants(data, dest_dir, BADGE_SIZES, fallback="png")
+    except Exception as e:  # Pillow raises several types for undecodable input
+        raise ValueError(f"badge is not a readable image ({e})")
+    return variants["thumb"]["png"]
+
+
+def badge_variant(path, variant="thumb", fmt="webp"):
+    """Sibling variant of a stored badge path, or None for legacy uploads."""
+    if not path or not is_content_hashed(path):
+        return None
+    directory, name = os.path.split(path)
+    candidate = f"{directory}/{name.split('-', 1)[0]}-{variant}.{fmt}"
+    return candidate if os.path.exists(candidate) else None
+
+
+def badge_url(path, fmt=None, variant="thumb"):
+    """URL of a stored ``teams.badge``, or of a sibling variant (None if there isn't one).
+
+    Templates render every badge through this (or ``badge_srcset``), whether
+    the row holds a hashed variant, a legacy ``static/badges/...`` path or
+    ``/static/...``.
+    """
+    if fmt is not None or variant != "thumb":
+        path = badge_variant(path, variant, fmt or "png")
+    if not path:
+        return None
+    filename = path.lstrip("/")
+    prefix = STATIC_ROOT + "/"
+    if not filename.startswith(prefix):
+        return path
+    return url_for("static", filename=filename[len(prefix):])
+
+
+def badge_srcset(path, fmt):
+    """``srcset`` of every size of a stored badge in ``fmt``, or None for legacy uploads."""
+    urls = [(badge_url(path, fmt, variant), width) for variant, width in BADGE_SIZES.items()]
+    return ", ".join(f"{url} {width}w" for url, width in urls if url) or None
+
+
+def backfill(database="ultimate_cup.db", static_root=STATIC_ROOT):
+    """Generate variants for the existing badges and photos.
+
+    Teams whose badge points at an original file are moved to its thumbnail.
+    The photo variants are recorded in ``static/image_variants.json``, keyed
+    by their path under ``static/``.
+    """
+    badge_dir = os.path.join(static_root, "badges")
+    image_dir = os.path.join(static_root, "images")
+
+    conn = sqlite3.connect(database)
+    badges = 0
+    for name in sorted(os.listdir(badge_dir)):
+        path = os.path.join(badge_dir, name)
+        if is_content_hashed(name) or not name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        with open(path, "rb") as f:
+            thumb = save_variants(f.read(), badge_dir, BADGE_SIZES, fallback="png")["thumb"]["png"]
+        original = path.replace(os.sep, "/")
+        conn.execute("UPDATE teams SET badge = ? WHERE badge IN (?, ?)", (thumb, original, "/" + original))
+        badges += 1
+    conn.commit()
+    conn.close()
+
+    manifest = {}
+    for name in sorted(os.listdir(image_dir)):
+        path = os.path.join(image_dir, name)
+        if is_content_hashed(name) or not name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        with open(path, "rb") as f:
+            variants = save_variants(f.read(), image_dir, IMAGE_SIZES)
+        prefix = static_root.rstrip("/") + "/"
+        manifest[f"images/{name}"] = {
+            variant: {fmt: p[len(prefix):] for fmt, p in formats.items()}
+            for variant, formats in variants.items()
+        }
+    with open(os.path.join(static_root, os.path.basename(IMAGE_MANIFEST)), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return badges, len(manifest)
+
+
+_manifest_cache = {"mtime": None, "data": {}}
+
+
+def image_variant(filename, variant="medium", fmt="webp"):
+    """Path under ``static/`` of a photo variant, or the original filename."""
+    try:
+        mtime = os.path.getmtime(IMAGE_MANIFEST)
+    except OSError:
+        return filename
+    if mtime != _manifest_cache["mtime"]:
+        with open(IMAGE_MANIFEST) as f:
+            _manifest_cache.update(mtime=mtime, data=json.load(f))
+    return _manifest_cache["data"].get(filename, {}).get(variant, {}).get(fmt, filename)
+
+
+def image_srcset(filename, fmt="webp"):
+    """``srcset`` of every size of a photo in ``fmt``, or None until ``backfill`` has run."""
+    widths = {image_variant(filename, variant, fmt): width for variant, width in IMAGE_SIZES.items()}
+    widths.pop(filename, None)  # image_variant falls back to the original
+    return ", ".join(f"{url_for('static', filename=path)} {width}w" for path, width in widths.items()) or None
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "backfill":
+        sys.exit(__doc__)
+    badge_count, image_count = backfill(sys.argv[2] if len(sys.argv) > 2 else "ultimate_cup.db")
+    print(f"✅ Generated variants for {badge_count} badges and {image_count} images.")
+
@@ -0,0 +1,183 @@
+"""Statements and commits per admin save: the route bodies as they were
+before admin_writes.py (a commit per step, one INSERT per scorer) against
+the single-transaction versions. Statements are counted per execution, so
+an ``executemany`` of six scorers counts six; batching saves the Python
+round trips and the commits, not SQLite's work per row.
+
+The ``syncs`` column counts the fsync/fdatasync calls SQLite actually
+makes, per action, averaged over the rounds. The script re-runs itself with
+a small counting library preloaded (common.py; it needs a C compiler, and
+without one the column reads n/a). Every action runs at
+``synchronous = FULL`` and again at ``NORMAL``, the pool's setting. In WAL
+mode FULL syncs the log on every commit. NORMAL syncs only when a
+checkpoint copies the log back into the database, so fewer commits mean
+fewer syncs at FULL, but only rarer checkpoints at NORMAL.
+
+The script also checks that ``players.goals`` still covers every player's
+recorded goals after the new saves run.
+
+    python benchmarks/bench_admin_writes.py
+"""
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+from common import build_sync_counter, preload_env, sync_count
+from synthetic import generate
+
+import admin_writes
+import cache
+import charts
+import leaderboards
+import live
+import standings
+
+ROUNDS = 30
+SCORERS = 6
+
+
+class Counter:
+    """Statements and commits seen by sqlite3's trace callback."""
+
+    def __init__(self):
+        self.statements = 0
+        self.commits = 0
+
+    def __call__(self, statement):
+        self.statements += 1
+        self.commits += statement.strip().upper() == "COMMIT"
+
+
+# ---------- Before: the route bodies this replaced ----------
+def legacy_add_team(conn, name, year, points):
+    cur = conn.cursor()
+    cur.execute("SELECT id FROM teams WHERE name = ?", (name,))
+    if cur.fetchone() is None:
+        cur.execute("INSERT INTO teams (name, badge) VALUES (?, ?)", (name, None))
+        conn.commit()
+    cur.execute("SELECT id FROM team_ratings WHERE team_name = ? AND year = ?", (name, year))
+    if cur.fetchone():
+        cur.execute("UPDATE team_ratings SET points = ? WHERE team_name = ? AND year = ?", (points, name, year))
+    else:
+        cur.execute("INSERT INTO team_ratings (team_name, year, points) VALUES (?, ?, ?)", (name, year, points))
+    charts.refresh(conn, year)
+    cache.bump_versions(conn, "teams", "team_ratings")
+    conn.commit()
+
+
+def legacy_add_match(conn, match, scorers):
+    cur = conn.cursor()
+    cur.execute("""
+        INSERT INTO matches (team_a, team_b, score_a, score_b, venue, date, stage, year)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, [match[column] for column in ("team_a", "team_b", "score_a", "score_b", "venue", "date", "stage", "year")])
+    match_id = cur.lastrowid
+    standings.apply_match(conn, match_id)
+    for player_id, goals in scorers:
+        cur.execute("INSERT INTO match_goals (match_id, player_id, goals_scored) VALUES (?, ?, ?)",
+                    (match_id, player_id, goals))
+    leaderboards.apply_match(conn, match_id)
+    live.log_change(conn, match_id)
+    cache.bump_versions(conn, "matches", "match_goals")
+    conn.commit()
+    return match_id
+
+
+def legacy_delete_match(conn, match_id):
+    standings.apply_match(conn, match_id, -1)
+    leaderboards.apply_match(conn, match_id, -1)
+    conn.execute("DELETE FROM match_goals WHERE match_id = ?", (match_id,))
+    conn.execute("DELETE FROM matches WHERE id = ?", (match_id,))
+    live.log_change(conn, match_id, deleted=True)
+    cache.bump_versions(conn, "matches", "match_goals")
+    conn.commit()
+
+
+def legacy_edit_player(conn, player_id, goals, yellow_cards, red_cards):
+    conn.execute("UPDATE players SET goals = ?, yellow_cards = ?, red_cards = ? WHERE id = ?",
+                 (goals, yellow_cards, red_cards, player_id))
+    cache.bump_versions(conn, "players")
+    conn.commit()
+
+
+# ---------- Scenarios ----------
+def scenarios(conn):
+    """``(action, before, after)``; each callable takes the round number."""
+    team_a, team_b = [row[0] for row in conn.execute("SELECT id FROM teams ORDER BY id LIMIT 2")]
+    squad = [row[0] for row in conn.execute("SELECT id FROM players WHERE team_id = ? LIMIT ?", (team_a, SCORERS))]
+    scorers = [(player_id, 1) for player_id in squad]
+    match = {"team_a": team_a, "team_b": team_b, "score_a": len(scorers), "score_b": 0,
+             "venue": "Bench Arena", "date": "2030-06-01", "stage": "Group Stage", "year": "2030"}
+    player_id, goals = conn.execute("SELECT id, goals FROM players ORDER BY goals DESC LIMIT 1").fetchone()
+    added = {"before": [], "after": []}  # fixtures the add_match rounds leave for the delete rounds
+
+    return [
+        ("add_team (new team)",
+         lambda i: legacy_add_team(conn, f"Legacy {i}", 2030, 1.0),
+         lambda i: admin_writes.save_team_rating(conn, f"Batched {i}", 2030, 1.0)),
+        (f"add_match ({SCORERS} scorers)",
+         lambda i: added["before"].append(legacy_add_match(conn, match, scorers)),
+         lambda i: added["after"].append(admin_writes.add_match(conn, match, scorers))),
+        (f"delete_match ({SCORERS} scorers)",
+         lambda i: legacy_delete_match(conn, added["before"].pop()),
+         lambda i: admin_writes.delete_match(conn, added["after"].pop())),
+        ("edit_player",
+         lambda i: legacy_edit_player(conn, player_id, goals + i % 2, 1, 0),
+         lambda i: admin_writes.update_player(conn, player_id, goals + i % 2, 1, 0)),
+    ]
+
+
+def measure(conn, fn):
+    counter = Counter()
+    conn.set_trace_callback(counter)
+    syncs_before = sync_count()
+    fn(0)
+    conn.set_trace_callback(None)
+    timings = []
+    for i in range(1, ROUNDS + 1):
+        start = time.perf_counter()
+        fn(i)
+        timings.append(time.perf_counter() - start)
+    syncs = None if syncs_before is None else (sync_count() - syncs_before) / (ROUNDS + 1)
+    return counter.statements, counter.commits, syncs, statistics.median(timings) * 1000
+
+
+if __name__ == "__main__":
+    if sync_count() is None and "--no-sync-counter" not in sys.argv:
+        library = build_sync_counter(tempfile.gettempdir())
+        if library:
+            # Start again with the counter loaded under SQLite
+            os.execve(sys.executable, [sys.executable, *sys.argv, "--no-sync-counter"], preload_env(library))
+
+    workdir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(workdir, "writes.db")
+        generate(path, seasons=2, teams=16, players=18)
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA journal_mode = WAL")
+
+        print(f"{'synchronous':<12} {'action':<32} {'path':>8} {'statements':>11} {'commits':>8} "
+              f"{'syncs':>7} {'median ms':>10}")
+        for synchronous in ("FULL", "NORMAL"):
+            conn.execute(f"PRAGMA synchronous = {synchronous}")
+            for name, legacy, batched in scenarios(conn):
+                for label, fn in (("before", legacy), ("after", batched)):
+                    statements, commits, syncs, median_ms = measure(conn, fn)
+                    syncs = "n/a" if syncs is None else f"{syncs:.2f}"
+                    print(f"{synchronous:<12} {name:<32} {label:>8} {statements:>11} {commits:>8} "
+                          f"{syncs:>7} {median_ms:>10.2f}")
+
+        short = conn.execute("""
+            SELECT COUNT(*) FROM players p
+            WHERE COALESCE(p.goals, 0) < (SELECT COALESCE(SUM(goals_scored), 0) FROM match_goals WHERE player_id = p.id)
+        """).fetchone()[0]
+        conn.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    if short:
+        raise SystemExit(f"❌ {short} players have fewer goals than their fixtures record")
+    print("✅ player goal totals cover every recorded goal")
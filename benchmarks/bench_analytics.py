@@ -0,0 +1,105 @@
+"""Season analytics (analytics.py) against a plain per-fixture Python loop that
+computes the same records, goals, Elo, form and head-to-head counts, on
+seasons of growing size.
+
+Elo is sequential by nature, so analytics.py still steps through matchdays
+one at a time (the ``days`` column); everything within a matchday, and
+every other figure, is a handful of array operations.
+
+Every size is checked first: both implementations must agree for every
+team, so the speed-up is measured on equal results.
+
+    python benchmarks/bench_analytics.py
+"""
+import os
+import sqlite3
+import statistics
+import time
+
+from common import build_database
+
+import analytics
+
+ROUNDS = 10
+SIZES = [(600, 16), (12000, 64), (60000, 256), (240000, 1024)]  # (fixtures over six seasons, teams)
+YEAR = 2025
+
+
+def reference(season):
+    """The per-row version: one Python iteration per fixture."""
+    n = len(season.names)
+    played, wins, draws, goals_for, goals_against = ([0] * n for _ in range(5))
+    elo = [analytics.ELO_BASE] * n
+    results = [[] for _ in range(n)]
+    h2h = {}
+    pending, day = [], None
+
+    def settle():
+        for i, change in pending:
+            elo[i] += change
+        pending.clear()
+
+    fixtures = zip(season.team_a.tolist(), season.team_b.tolist(), season.score_a.tolist(),
+                   season.score_b.tolist(), season.matchday.tolist())
+    for a, b, sa, sb, matchday in fixtures:
+        if matchday != day:
+            settle()
+            day = matchday
+        for team, gf, ga in ((a, sa, sb), (b, sb, sa)):
+            played[team] += 1
+            goals_for[team] += gf
+            goals_against[team] += ga
+            wins[team] += gf > ga
+            draws[team] += gf == ga
+            results[team].append("W" if gf > ga else "D" if gf == ga else "L")
+        h2h[a, b] = h2h.get((a, b), 0) + 1
+        h2h[b, a] = h2h.get((b, a), 0) + 1
+
+        margin = abs(sa - sb)
+        weight = 1.0 if margin <= 1 else 1.5 if margin == 2 else (11 + margin) / 8
+        expected = 1 / (1 + 10 ** ((elo[b] - elo[a]) / 400))
+        delta = analytics.ELO_K * weight * ((sa > sb) + 0.5 * (sa == sb) - expected)
+        pending.extend(((a, delta), (b, -delta)))
+    settle()
+
+    forms = ["".join(r[-analytics.FORM_MATCHES:]) for r in results]
+    return played, wins, draws, goals_for, goals_against, elo, forms, h2h
+
+
+def check(season, computed):
+    played, wins, draws, goals_for, goals_against, elo, forms, h2h = reference(season)
+    assert computed.played.tolist() == played
+    assert computed.wins.tolist() == wins and computed.draws.tolist() == draws
+    assert computed.goals_for.tolist() == goals_for and computed.goals_against.tolist() == goals_against
+    assert max(abs(x - y) for x, y in zip(computed.elo.tolist(), elo)) < 1e-6, "Elo ratings differ"
+    assert computed.form == forms, "form strings differ"
+    assert {(int(i), int(j)): int(computed.h2h_played[i, j]) for i, j in zip(*computed.h2h_played.nonzero())} == h2h
+
+
+def timed(fn):
+    fn()
+    timings = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+if __name__ == "__main__":
+    print(f"{'teams':>6} {'fixtures':>9} {'days':>5} {'query ms':>9} {'numpy ms':>9} {'python ms':>10} {'speed-up':>9}")
+    for n_matches, n_teams in SIZES:
+        path = build_database(n_matches, n_teams=n_teams, players_per_team=1)
+        conn = sqlite3.connect(path)
+        season = analytics.load_season(conn, YEAR)
+        check(season, analytics.SeasonAnalytics(season))
+
+        query_ms = timed(lambda: analytics.load_season(conn, YEAR))
+        numpy_ms = timed(lambda: analytics.SeasonAnalytics(season))
+        python_ms = timed(lambda: reference(season))
+        conn.close()
+        os.remove(path)
+        days = int(season.matchday.max()) + 1
+        print(f"{n_teams:>6} {len(season.team_a):>9} {days:>5} {query_ms:>9.2f} {numpy_ms:>9.2f} "
+              f"{python_ms:>10.2f} {python_ms / numpy_ms:>8.1f}x")
+    print("✅ vectorized analytics match the per-fixture loop for every size")
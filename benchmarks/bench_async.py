@@ -0,0 +1,140 @@
+"""Load test: sync gunicorn workers against the ASGI entry point (asgi.py)
+under uvicorn, same worker count, same box, same synthetic database.
+
+Two scenarios per server:
+
+* concurrency sweep: closed-loop clients hammering the public read routes
+  for a few seconds at each concurrency level;
+* slow clients: a handful of connections that send half a request and then
+  stall (as a phone on a bad network does), while fast clients keep going.
+  A sync worker is stuck on the stalled socket; the event loop is not.
+
+    python benchmarks/bench_async.py [--workers 2] [--seconds 3]
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import ROOT, build_database
+
+PATHS = ["/user", "/matches", "/api/matches?limit=20", "/api/team_summaries?year=2025"]
+CONCURRENCY = (1, 16, 64)
+REQUEST_TIMEOUT = 5.0
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(kind, workers, port, workdir):
+    if kind == "sync":
+        command = [sys.executable, "-m", "gunicorn", "--pythonpath", ROOT, "-w", str(workers),
+                   "-b", f"127.0.0.1:{port}", "--log-level", "warning", "app:app"]
+    else:
+        command = [sys.executable, "-m", "uvicorn", "--app-dir", ROOT, "--workers", str(workers),
+                   "--port", str(port), "--log-level", "warning", "asgi:application"]
+    process = subprocess.Popen(command, cwd=workdir)
+    deadline = time.time() + 20
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    sys.exit(f"❌ {kind} server did not start")
+
+
+async def get(port, path):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: bench\r\nConnection: close\r\n\r\n".encode())
+        await writer.drain()
+        data = await reader.read()
+        return int(data.split(b" ", 2)[1])
+    finally:
+        writer.close()
+
+
+async def load(port, concurrency, seconds):
+    latencies, errors = [], 0
+    stop = time.perf_counter() + seconds
+
+    async def client(i):
+        nonlocal errors
+        n = i
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            try:
+                status = await asyncio.wait_for(get(port, PATHS[n % len(PATHS)]), REQUEST_TIMEOUT)
+                if status != 200:
+                    errors += 1
+            except (asyncio.TimeoutError, OSError):
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+            n += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "rps": (len(latencies) - errors) / elapsed,
+        "p50": statistics.median(latencies) * 1000 if latencies else 0,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0,
+        "errors": errors,
+    }
+
+
+async def with_slow_clients(port, slow, concurrency, seconds):
+    stalled = []
+    for _ in range(slow):
+        _, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /user HTTP/1.1\r\nHost: bench\r\n")  # headers never finished
+        await writer.drain()
+        stalled.append(writer)
+    try:
+        return await load(port, concurrency, seconds)
+    finally:
+        for writer in stalled:
+            writer.close()
+
+
+def run(kind, args, workdir):
+    port = free_port()
+    process = start_server(kind, args.workers, port, workdir)
+    try:
+        asyncio.run(load(port, 4, 1))  # warm up every worker
+        results = [(f"c={c}", asyncio.run(load(port, c, args.seconds))) for c in CONCURRENCY]
+        results.append((f"c=16 +{args.workers * 2} slow",
+                        asyncio.run(with_slow_clients(port, args.workers * 2, 16, args.seconds))))
+    finally:
+        process.terminate()
+        process.wait()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=3)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    shutil.copy(build_database(2000), os.path.join(workdir, "ultimate_cup.db"))
+    try:
+        print(f"{'server':>6} {'scenario':>16} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        for kind in ("sync", "asgi"):
+            for scenario, r in run(kind, args, workdir):
+                print(f"{kind:>6} {scenario:>16} {r['rps']:>8.0f} {r['p50']:>8.1f} {r['p99']:>8.1f} {r['errors']:>7}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
@@ -0,0 +1,65 @@
+"""Revalidation cost of the public views: a fresh 200 against a 304 answered
+from the data-version validator.
+
+Every statement run on the pooled connection is recorded, and the script
+fails if a 304 touches the matches, scorers or ratings tables.
+
+    python benchmarks/bench_conditional.py
+"""
+import re
+import statistics
+import sys
+import time
+
+from common import build_database
+
+import app as app_module
+import db
+
+ROUNDS = 50
+URLS = ["/matches", "/matches?year=2025", "/user", "/team_summary?team=Team 1"]
+HEAVY_TABLES = {"matches", "match_goals", "team_ratings", "team_standings", "players"}
+
+
+class StatementLog(list):
+    def __call__(self, statement):
+        self.append(statement)
+
+    def tables(self):
+        return {name for statement in self for name in re.findall(r"(?:FROM|JOIN)\s+(\w+)", statement)}
+
+
+def timed(client, url, headers=None):
+    timings = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        response = client.get(url, headers=headers or {})
+        timings.append(time.perf_counter() - start)
+    return response, statistics.median(timings) * 1000
+
+
+if __name__ == "__main__":
+    app = app_module.app
+    db.close_pool(app)
+    app.config['DATABASE'] = build_database(500)
+    app.config['DB_POOL_SIZE'] = 1
+    app_module.response_cache.max_entries = 0  # time the full render, not a cache hit
+    log = StatementLog()
+    with app.app_context():
+        db.get_db().set_trace_callback(log)
+
+    client = app.test_client()
+    failed = False
+    print(f"{'url':<28} {'200 ms':>8} {'304 ms':>8}  tables read on 304")
+    for url in URLS:
+        fresh = client.get(url)
+        _, full_ms = timed(client, url)
+
+        log.clear()
+        not_modified, revalidate_ms = timed(client, url, {"If-None-Match": fresh.headers["ETag"]})
+        assert not_modified.status_code == 304, url
+        touched = log.tables()
+        failed |= bool(touched & HEAVY_TABLES)
+        print(f"{url:<28} {full_ms:>8.2f} {revalidate_ms:>8.2f}  {', '.join(sorted(touched))}")
+
+    sys.exit("FAIL: a 304 read fixture or ratings tables" if failed else 0)
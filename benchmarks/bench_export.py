@@ -0,0 +1,109 @@
+"""Peak Python memory of a season export (export.py) as the number of
+seasons grows, against building the whole file in memory first (every row
+fetched, then written out), which is what a DataFrame export amounts to.
+
+The streamed export reads ``CHUNK_SIZE`` rows at a time and hands each
+encoded chunk on (here it is only counted), so its peak should stay flat
+while the materialised one grows with the data.
+
+The script also re-imports the fixtures it exported, in both formats, into
+a copy of the smallest database with its fixtures deleted. The match and goal
+totals must come back unchanged.
+
+    python benchmarks/bench_export.py
+"""
+import csv
+import io
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+
+from synthetic import generate
+
+import admin_writes
+import export
+import importer
+from migrations import migrate
+
+SEASONS = [16, 64, 256]  # well past CHUNK_SIZE fixtures each
+TEAMS = 32
+TOTALS = """
+    SELECT COUNT(*), SUM(score_a + score_b),
+           (SELECT SUM(goals_scored) FROM match_goals), (SELECT SUM(goals) FROM players)
+    FROM matches
+"""
+
+
+def streamed(conn, fmt):
+    return sum(len(piece) for piece in export.stream(conn, "fixtures", fmt))
+
+
+def materialised(conn, fmt):
+    rows = [chunk for chunk in export.chunks(conn, "fixtures", chunk_size=10 ** 9)][0]
+    buffer = io.StringIO()
+    if fmt == "csv":
+        writer = csv.writer(buffer)
+        writer.writerow(export.columns("fixtures"))
+        writer.writerows(rows)
+    else:
+        buffer.writelines(piece for piece in export._jsonl("fixtures", [rows]))
+    return len(buffer.getvalue())
+
+
+def peak(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = fn(*args)
+    elapsed = time.perf_counter() - start
+    peak_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return size, peak_bytes / 1024, elapsed * 1000
+
+
+def round_trip(path, workdir, fmt):
+    copy = os.path.join(workdir, f"round-trip-{fmt}.db")
+    shutil.copy(path, copy)
+    conn = sqlite3.connect(copy, isolation_level=None)
+    before = conn.execute(TOTALS).fetchone()
+    data = "".join(export.stream(conn, "fixtures", fmt))
+    for (match_id,) in conn.execute("SELECT id FROM matches").fetchall():
+        admin_writes.delete_match(conn, match_id)
+    report = importer.run_import(conn, "fixtures", io.StringIO(data, newline=""), fmt)
+    after = conn.execute(TOTALS).fetchone()
+    conn.close()
+    return report.error_count == 0 and before == after
+
+
+if __name__ == "__main__":
+    workdir = tempfile.mkdtemp()
+    streamed_peaks, paths = [], []
+    try:
+        print(f"{'seasons':>8} {'fixtures':>9} {'format':>7} {'file KiB':>9} "
+              f"{'streamed KiB':>13} {'materialised KiB':>17} {'streamed ms':>12}")
+        for seasons in SEASONS:
+            path = os.path.join(workdir, f"export-{seasons}.db")
+            counts = generate(path, seasons=seasons, teams=TEAMS, players=18)
+            migrate(path)
+            paths.append(path)
+            conn = sqlite3.connect(path)
+            for fmt in ("csv", "jsonl"):
+                streamed(conn, fmt)  # warm up the statement cache and page cache
+                size, streamed_kib, streamed_ms = peak(streamed, conn, fmt)
+                _, materialised_kib, _ = peak(materialised, conn, fmt)
+                streamed_peaks.append(streamed_kib)
+                print(f"{seasons:>8} {counts['matches']:>9} {fmt:>7} {size / 1024:>9.0f} "
+                      f"{streamed_kib:>13.0f} {materialised_kib:>17.0f} {streamed_ms:>12.1f}")
+            conn.close()
+
+        trips = {fmt: round_trip(paths[0], workdir, fmt) for fmt in ("csv", "jsonl")}
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if max(streamed_peaks) > 2 * min(streamed_peaks):
+        raise SystemExit("❌ streamed export memory grew with the number of seasons")
+    if not all(trips.values()):
+        raise SystemExit(f"❌ re-importing the export changed the totals: {trips}")
+    print("✅ export memory is flat across season counts and both formats re-import unchanged")
@@ -0,0 +1,94 @@
+"""Bulk fixture import against keying the same fixtures in through /add_match.
+
+The bulk path streams a generated CSV through importer.py. The form path posts
+one fixture per request, as an admin would, so it is run on far fewer rows
+and compared on throughput. Peak traced memory shows the importer stays
+bounded by its chunk size rather than the file size.
+
+    python benchmarks/bench_import.py [rows]
+"""
+import csv
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from common import STAGES, build_database
+
+import app as app_module
+import db
+import importer
+import standings
+
+FORM_ROWS = 300
+
+
+def fixture_rows(n, n_teams=8, players_per_team=11, seed=7):
+    rng = random.Random(seed)
+    for i in range(n):
+        team_a, team_b = rng.sample(range(1, n_teams + 1), 2)
+        score_a, score_b = rng.randint(0, 4), rng.randint(0, 4)
+        scorer = lambda team, score: f"Player {team}-{rng.randrange(players_per_team)}:{score}" if score else ""
+        yield {
+            "team_a": f"Team {team_a}", "team_b": f"Team {team_b}", "team_a_id": team_a, "team_b_id": team_b,
+            "score_a": score_a, "score_b": score_b,
+            "date": f"{2010 + i % 15}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "stage": rng.choice(STAGES), "venue": "Lafia City Stadium",
+            "scorers_a": scorer(team_a, score_a), "scorers_b": scorer(team_b, score_b),
+        }
+
+
+def write_csv(rows):
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    fields = ["team_a", "team_b", "score_a", "score_b", "date", "stage", "venue", "scorers_a", "scorers_b"]
+    with os.fdopen(fd, "w", newline="") as f:
+        writer = csv.DictWriter(f, fields, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+
+def bulk(n, trace_memory=False):
+    csv_path = write_csv(fixture_rows(n))
+    conn = sqlite3.connect(build_database(0), isolation_level=None)
+    with open(csv_path, newline="") as stream:
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        report = importer.run_import(conn, "fixtures", stream, "csv")
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        tracemalloc.stop()
+    os.remove(csv_path)
+    assert report.error_count == 0, report.errors[:5]
+    assert not standings.check(conn)
+    return report.inserted, elapsed, peak
+
+
+def per_form(n):
+    app = app_module.app
+    db.close_pool(app)
+    app.config['DATABASE'] = build_database(0)
+    client = app.test_client()
+    start = time.perf_counter()
+    for row in fixture_rows(n):
+        client.post('/add_match', data={
+            "team_a": row["team_a_id"], "team_b": row["team_b_id"],
+            "score_a": row["score_a"], "score_b": row["score_b"],
+            "date": row["date"], "stage": row["stage"], "venue": row["venue"],
+        })
+    return n, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    inserted, elapsed, _ = bulk(rows)
+    print(f"bulk import  {inserted:>7} rows  {elapsed:7.2f} s  {inserted / elapsed:>9.0f} rows/s")
+    for n in (rows // 10, rows):
+        _, _, peak = bulk(n, trace_memory=True)
+        print(f"  peak Python memory importing {n:>7} rows: {peak / 1024 / 1024:.1f} MB")
+    inserted, elapsed = per_form(FORM_ROWS)
+    print(f"/add_match   {inserted:>7} rows  {elapsed:7.2f} s  {inserted / elapsed:>9.0f} rows/s")
@@ -0,0 +1,53 @@
+"""Benchmark the /matches page as the number of fixtures grows.
+
+Query count per request should stay flat (years + one page of fixtures + one
+scorer batch), and since the page only renders the first MATCHES_PAGE_SIZE
+fixtures, so should latency.
+
+    python benchmarks/bench_matches.py
+"""
+import os
+import statistics
+import time
+
+from common import QueryCounter, build_database
+
+import app as app_module
+import db
+
+SIZES = [10, 100, 500, 2000]
+ROUNDS = 20
+
+
+def run(n_matches):
+    path = build_database(n_matches)
+    counter = QueryCounter()
+
+    db.close_pool(app_module.app)
+    app_module.app.config['DATABASE'] = path
+    app_module.get_read_db = lambda: counter.attach(db.get_read_db())
+    app_module.response_cache.max_entries = 0  # measure the view, not cache hits
+    client = app_module.app.test_client()
+    client.get('/matches')  # warm up templates
+
+    timings = []
+    counter.count = 0
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        response = client.get('/matches')
+        timings.append(time.perf_counter() - start)
+        assert response.status_code == 200
+    db.close_pool(app_module.app)
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    return counter.count / ROUNDS, statistics.median(timings) * 1000
+
+
+if __name__ == "__main__":
+    original = app_module.get_read_db
+    print(f"{'matches':>8} {'queries/req':>12} {'median ms':>10}")
+    for size in SIZES:
+        queries, median_ms = run(size)
+        print(f"{size:>8} {queries:>12.1f} {median_ms:>10.2f}")
+    app_module.get_read_db = original
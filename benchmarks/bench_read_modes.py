@@ -0,0 +1,124 @@
+"""Public reads while an admin write holds the database, in each DB_READ_MODE.
+
+A writer thread repeatedly opens ``BEGIN IMMEDIATE``, rewrites every
+fixture and keeps the transaction open for ``HOLD`` seconds before it
+commits, like a long bulk edit. Reader threads meanwhile load public pages
+(response cache off, so every request reads the database). A read that had
+to wait for the writer would take about as long as the hold, so the check
+is that no read overlapping a write comes anywhere near it.
+
+With the primary in WAL mode, readers already don't wait on a writer. The
+other modes add isolation on top: ``readonly`` connections can't write,
+and ``snapshot`` readers never touch the primary file. The snapshot
+refresh (an online backup of the whole file) is timed separately.
+
+    python benchmarks/bench_read_modes.py
+"""
+import os
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from synthetic import generate
+
+import app as app_module
+import db
+
+HOLD = 0.5  # seconds each write transaction stays open
+WRITES = 6
+READERS = 4
+URLS = ["/matches", "/api/matches?limit=50", "/user", "/api/leaderboards", "/api/tournament"]
+
+
+def writer(path, windows, done):
+    conn = sqlite3.connect(path, isolation_level=None)
+    try:
+        for _ in range(WRITES):
+            conn.execute("BEGIN IMMEDIATE")
+            start = time.perf_counter()
+            conn.execute("UPDATE matches SET venue = venue")
+            time.sleep(HOLD)
+            conn.execute("COMMIT")
+            windows.append((start, time.perf_counter()))
+            time.sleep(HOLD / 2)
+    finally:
+        conn.close()
+        done.set()
+
+
+def reader(reads, done):
+    client = app_module.app.test_client()
+    i = 0
+    while not done.is_set():
+        start = time.perf_counter()
+        response = client.get(URLS[i % len(URLS)])
+        reads.append((start, time.perf_counter() - start))
+        assert response.status_code == 200, response.status_code
+        i += 1
+
+
+def run(path, mode):
+    app = app_module.app
+    db.close_pool(app)
+    app.config["DB_READ_MODE"] = mode
+    app.config["DB_SNAPSHOT_SECONDS"] = HOLD
+    client = app.test_client()
+    for url in URLS:
+        client.get(url)  # warm up pools, templates and the first snapshot
+
+    windows, reads, done = [], [], threading.Event()
+    threads = [threading.Thread(target=reader, args=(reads, done)) for _ in range(READERS)]
+    threads.append(threading.Thread(target=writer, args=(path, windows, done)))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    db.close_pool(app)
+
+    during = [duration for start, duration in reads
+              if any(w_start <= start + duration and start <= w_end for w_start, w_end in windows)]
+    return len(reads), sorted(during)
+
+
+def snapshot_refresh_ms(path):
+    app = app_module.app
+    snapshot = db.Snapshot(path, None, 3600, lambda uri: db._new_pool(app, uri, read_only=True))
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        snapshot.refresh()
+        timings.append(time.perf_counter() - start)
+    snapshot.close()
+    return statistics.median(timings) * 1000
+
+
+if __name__ == "__main__":
+    workdir = tempfile.mkdtemp()
+    app = app_module.app
+    original_database = app.config["DATABASE"]
+    app_module.response_cache.max_entries = 0
+    try:
+        path = os.path.join(workdir, "reads.db")
+        counts = generate(path, seasons=12, teams=64, players=18)
+        app.config["DATABASE"] = path
+        print(f"{counts['matches']} fixtures; each write holds the lock {HOLD * 1000:.0f} ms")
+        print(f"{'mode':>9} {'reads':>6} {'during writes':>14} {'p50 ms':>7} {'p99 ms':>7} {'max ms':>7}")
+        slowest = 0
+        for mode in db.READ_MODES:
+            total, during = run(path, mode)
+            p99 = during[min(len(during) - 1, int(len(during) * 0.99))]
+            print(f"{mode:>9} {total:>6} {len(during):>14} {statistics.median(during) * 1000:>7.2f} "
+                  f"{p99 * 1000:>7.2f} {during[-1] * 1000:>7.2f}")
+            slowest = max(slowest, during[-1])
+        print(f"snapshot refresh (online backup) {snapshot_refresh_ms(path):.1f} ms")
+    finally:
+        db.close_pool(app)
+        app.config["DATABASE"] = original_database
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if slowest >= HOLD / 2:
+        raise SystemExit(f"❌ a public read took {slowest * 1000:.0f} ms while a write was open")
+    print("✅ no public read waited on an admin write")
@@ -0,0 +1,88 @@
+"""Worker start-up cost: what a gunicorn worker pays to import ``app`` and serve
+its first request.
+
+Each measurement runs in a fresh interpreter so nothing is already imported:
+
+* the slowest top-level entries from ``python -X importtime -c "import app"``
+* time from interpreter start to the first ``/`` response
+* resident set size after that first response
+
+``--check`` exits non-zero if importing ``app`` pulls in any of the heavy
+analytics packages, so it can guard against an eager import creeping back.
+
+    python benchmarks/bench_startup.py [--check]
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+from common import ROOT
+
+HEAVY_MODULES = ("pandas", "plotly", "numpy")
+
+FIRST_RESPONSE = """
+import json, sys, time
+start = time.perf_counter()
+import app
+loaded = time.perf_counter()
+response = app.app.test_client().get('/')
+served = time.perf_counter()
+rss_kb = 0
+with open('/proc/self/status') as status:
+    for line in status:
+        if line.startswith('VmRSS:'):
+            rss_kb = int(line.split()[1])
+print(json.dumps({
+    "status": response.status_code,
+    "import_ms": (loaded - start) * 1000,
+    "first_response_ms": (served - start) * 1000,
+    "rss_mb": rss_kb / 1024,
+    "heavy": [name for name in %r if name in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def python(*args):
+    return subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True, text=True, check=True)
+
+
+def import_time(top=10):
+    stderr = python("-X", "importtime", "-c", "import app").stderr
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        entries.append((int(cumulative_us), name.rstrip()))
+    entries.sort(reverse=True)
+    return entries[:top]
+
+
+def first_response():
+    started = time.perf_counter()
+    result = json.loads(python("-c", FIRST_RESPONSE).stdout)
+    result["process_ms"] = (time.perf_counter() - started) * 1000
+    return result
+
+
+if __name__ == "__main__":
+    result = first_response()
+
+    if "--check" in sys.argv:
+        if result["heavy"]:
+            print(f"FAIL: importing app loaded {', '.join(result['heavy'])}")
+            sys.exit(1)
+        print("OK: no heavy analytics modules loaded at import time")
+        sys.exit(0)
+
+    print("Slowest imports (cumulative us):")
+    for cumulative_us, name in import_time():
+        print(f"  {cumulative_us:>9}  {name}")
+    print()
+    print(f"import app           {result['import_ms']:8.1f} ms")
+    print(f"first response       {result['first_response_ms']:8.1f} ms (status {result['status']})")
+    print(f"whole process        {result['process_ms']:8.1f} ms")
+    print(f"worker RSS           {result['rss_mb']:8.1f} MB")
+    print(f"heavy modules loaded {', '.join(result['heavy']) or 'none'}")
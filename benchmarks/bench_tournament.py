@@ -0,0 +1,78 @@
+"""Group tables and knockout bracket (tournament.py) on synthetic tournaments
+of growing size: the cold build (one season query plus one pass in Python)
+against a hit in the per-(year, data version) cache.
+
+Every built season is also checked: each group is a complete round robin,
+positions follow the tiebreak order, and every knockout winner reaches the
+next tie until a single champion is left.
+
+    python benchmarks/bench_tournament.py
+"""
+import math
+import os
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from synthetic import generate
+
+import tournament
+from cache import SeasonCache
+
+ROUNDS = 20
+SIZES = [(16, 6), (64, 10), (256, 10)]  # (teams, seasons)
+
+
+def check(season):
+    for group in season["groups"]:
+        table = group["table"]
+        for row in table:
+            assert row["played"] == len(table) - 1, f"{group['group']}: {row['team']} played {row['played']}"
+        keys = [(r["points"], r["goal_difference"], r["goals_for"]) for r in table]
+        assert keys == sorted(keys, reverse=True), f"{group['group']} is out of order"
+
+    rounds = season["knockout"]
+    qualified = 2 * len(season["groups"])
+    assert len(rounds) == int(math.log2(qualified)), f"{len(rounds)} knockout rounds for {qualified} teams"
+    for knockout_round, following in zip(rounds, rounds[1:]):
+        for tie in knockout_round["ties"]:
+            assert tie["next"] and tie["next"]["stage"] == following["stage"], f"{tie['winner']} goes nowhere"
+    assert rounds[-1]["stage"] == "Final" and season["champion"] == rounds[-1]["ties"][0]["winner"]
+
+
+def timed(fn):
+    fn()
+    timings = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+if __name__ == "__main__":
+    workdir = tempfile.mkdtemp()
+    try:
+        print(f"{'teams':>6} {'seasons':>8} {'fixtures':>9} {'query ms':>9} {'build ms':>9} {'cached ms':>10}")
+        for teams, seasons in SIZES:
+            path = os.path.join(workdir, f"t{teams}.db")
+            generate(path, seasons=seasons, teams=teams, players=11)
+            conn = sqlite3.connect(path)
+            conn.row_factory = sqlite3.Row
+            years = [row[0] for row in conn.execute("SELECT DISTINCT year FROM matches ORDER BY year")]
+            for year in years:
+                check(tournament.build(tournament.load_season(conn, year)))
+
+            year = years[-1]
+            fixtures = tournament.load_season(conn, year)
+            query_ms = timed(lambda: tournament.load_season(conn, year))
+            build_ms = timed(lambda: tournament.build(fixtures))
+            season_cache = SeasonCache(tournament.season)
+            cached_ms = timed(lambda: season_cache.get(conn, year, (1, 1)))
+            conn.close()
+            print(f"{teams:>6} {seasons:>8} {len(fixtures):>9} {query_ms:>9.2f} {build_ms:>9.2f} {cached_ms:>10.4f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    print("✅ group tables and brackets check out for every season")
@@ -0,0 +1,68 @@
+"""Side-by-side benchmark of the /user data path: the old pandas + plotly.express
+implementation against the plain-SQL table and the stored SVG chart.
+
+Only the work done between the database and the template is timed, so the
+numbers isolate DataFrame and figure construction from Jinja rendering. The
+Plotly path also made every visitor download plotly.js (several MB), which
+is not counted in its chart bytes.
+
+    pip install -r benchmarks/requirements.txt   # pandas and plotly
+    python benchmarks/bench_user_dashboard.py
+"""
+import json
+import sqlite3
+import statistics
+import time
+
+from common import build_database
+
+import app as app_module
+import charts
+
+ROUNDS = 50
+YEAR = 2025
+
+
+def legacy(conn, year):
+    import pandas as pd
+    import plotly
+    import plotly.express as px
+
+    df = pd.read_sql_query("""
+        SELECT r.team_name, r.year, r.points, t.badge
+        FROM team_ratings r
+        LEFT JOIN teams t ON r.team_name = t.name
+        ORDER BY r.points DESC
+    """, conn)
+    df_year = df[df["year"] == year].sort_values(by="points", ascending=False)
+    df_year["Rank"] = range(1, len(df_year) + 1)
+    fig = px.bar(df_year, x="team_name", y="points", color="team_name",
+                 title=f"{year} Ultimate Cup Team Ratings", text="points")
+    fig.update_traces(textposition='outside')
+    fig.update_layout(showlegend=False)
+    graph_json = json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+    return df_year.to_dict(orient='records'), graph_json
+
+
+def current(conn, year):
+    table = app_module.get_team_ratings(conn, year)
+    return table, charts.get_chart(conn, year)
+
+
+def measure(fn, conn):
+    fn(conn, YEAR)  # warm up imports and caches
+    timings = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        _, chart = fn(conn, YEAR)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000, len(chart)
+
+
+if __name__ == "__main__":
+    conn = sqlite3.connect(build_database(100))
+    conn.row_factory = sqlite3.Row
+    print(f"{'path':>8} {'median ms':>10} {'chart bytes':>12}")
+    for name, fn in (("pandas", legacy), ("sql", current)):
+        median_ms, size = measure(fn, conn)
+        print(f"{name:>8} {median_ms:>10.3f} {size:>12}")
@@ -0,0 +1,125 @@
+"""Shared helpers for the benchmark scripts: a throwaway database seeded with
+synthetic fixtures, a statement counter hooked into sqlite3's trace callback,
+and an fsync/fdatasync counter preloaded under SQLite.
+"""
+import ctypes
+import os
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import migrations  # noqa: E402
+
+STAGES = ["Group Stage", "Quarter Final", "Semi Final", "Final"]
+
+
+def build_database(n_matches, n_teams=8, players_per_team=11, seed=42):
+    """Create a temp database with ``n_matches`` fixtures and return its path."""
+    rng = random.Random(seed)
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+
+    migrations.migrate(path)
+    conn = sqlite3.connect(path)
+    conn.executemany("INSERT INTO teams (name, group_name) VALUES (?, ?)",
+                     [(f"Team {i}", f"Group {'ABCD'[i % 4]}") for i in range(1, n_teams + 1)])
+    conn.executemany("INSERT INTO players (name, team_id) VALUES (?, ?)",
+                     [(f"Player {t}-{p}", t) for t in range(1, n_teams + 1) for p in range(players_per_team)])
+    conn.executemany("INSERT INTO team_ratings (team_name, year, points) VALUES (?, ?, ?)",
+                     [(f"Team {i}", 2025, round(rng.uniform(0, 10), 2)) for i in range(1, n_teams + 1)])
+
+    for i in range(n_matches):
+        team_a, team_b = rng.sample(range(1, n_teams + 1), 2)
+        score_a, score_b = rng.randint(0, 4), rng.randint(0, 4)
+        year = 2020 + i % 6
+        cur = conn.execute("""
+            INSERT INTO matches (team_a, team_b, score_a, score_b, date, venue, stage, year)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (team_a, team_b, score_a, score_b, f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+              "Lafia City Stadium", rng.choice(STAGES), str(year)))
+        match_id = cur.lastrowid
+        for team_id, score in ((team_a, score_a), (team_b, score_b)):
+            if score:
+                player_id = (team_id - 1) * players_per_team + rng.randint(1, players_per_team)
+                conn.execute("INSERT INTO match_goals (match_id, player_id, goals_scored) VALUES (?, ?, ?)",
+                             (match_id, player_id, score))
+    conn.commit()
+    conn.close()
+    return path
+
+
+class QueryCounter:
+    """Counts the SQL statements executed on connections it is attached to."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, statement):
+        self.count += 1
+
+    def attach(self, conn):
+        conn.set_trace_callback(self)
+        return conn
+
+
+# ---------- Sync counting ----------
+# SQLite calls fsync/fdatasync from C, out of Python's sight, so the counter is
+# a tiny library preloaded into the process that wraps both calls.
+SYNC_COUNTER = "sync_counter.so"
+SYNC_COUNTER_SOURCE = r"""
+#define _GNU_SOURCE
+#include <dlfcn.h>
+
+static long syncs;
+
+long sync_count(void) { return __atomic_load_n(&syncs, __ATOMIC_RELAXED); }
+
+int fsync(int fd) {
+    static int (*real)(int);
+    if (!real) real = (int (*)(int)) dlsym(RTLD_NEXT, "fsync");
+    __atomic_add_fetch(&syncs, 1, __ATOMIC_RELAXED);
+    return real(fd);
+}
+
+int fdatasync(int fd) {
+    static int (*real)(int);
+    if (!real) real = (int (*)(int)) dlsym(RTLD_NEXT, "fdatasync");
+    __atomic_add_fetch(&syncs, 1, __ATOMIC_RELAXED);
+    return real(fd);
+}
+"""
+
+
+def build_sync_counter(directory):
+    """Compile the sync counter into ``directory``; its path, or None without a C compiler."""
+    compiler = shutil.which("cc") or shutil.which("gcc")
+    if compiler is None:
+        return None
+    source, library = os.path.join(directory, "sync_counter.c"), os.path.join(directory, SYNC_COUNTER)
+    with open(source, "w") as f:
+        f.write(SYNC_COUNTER_SOURCE)
+    subprocess.run([compiler, "-shared", "-fPIC", "-O2", "-o", library, source, "-ldl"], check=True)
+    return library
+
+
+def preload_env(library):
+    """Environment for a child process with ``library`` preloaded."""
+    preload = " ".join(filter(None, [os.environ.get("LD_PRELOAD"), library]))
+    return {**os.environ, "LD_PRELOAD": preload}
+
+
+def sync_count():
+    """fsync + fdatasync calls made by this process so far, or None unless the counter is preloaded."""
+    for library in os.environ.get("LD_PRELOAD", "").split():
+        if os.path.basename(library) == SYNC_COUNTER:
+            counter = ctypes.CDLL(library).sync_count
+            counter.restype = ctypes.c_long
+            return counter()
+    return None
@@ -0,0 +1,270 @@
+"""Route benchmark: every public and admin route through the Flask test
+client against a synthetic tournament (see synthetic.py).
+
+Each route is requested ``--iterations`` times after a short warm-up and
+reported as p50/p95/p99 latency plus SQL statements per request. The
+response cache is off, so every request runs its view. Admin writes run as
+add -> edit -> delete cycles, so the database ends each round at the same
+size it started.
+
+Results are written to ``benchmarks/results/<commit>.json``. Passing an
+earlier file with ``--compare`` prints the change per route and exits
+non-zero on a regression: more statements per request, or a p95 more than
+``--threshold`` slower.
+
+    python benchmarks/harness.py [--seasons 6] [--teams 16] [--players 18] [--iterations 50]
+    python benchmarks/harness.py --compare benchmarks/results/<older commit>.json
+
+The live scores stream (/api/matches/stream) is long-lived and is not
+measured here; its polling fallback (/api/matches/changes) is.
+"""
+import argparse
+import io
+import json
+import math
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import ROOT, QueryCounter
+from synthetic import generate
+
+import admin_writes
+import app as app_module
+import db
+import leaderboards
+import standings
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+WARMUP = 3
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return 0.0
+    return values[max(math.ceil(pct / 100 * len(values)), 1) - 1]
+
+
+def git_commit():
+    try:
+        sha = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+        dirty = subprocess.call(["git", "diff", "--quiet", "HEAD", "--", "*.py", "templates"], cwd=ROOT) != 0
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+    return sha, dirty
+
+
+class Dataset:
+    """Ids and names from the synthetic database, read outside the app."""
+
+    def __init__(self, path):
+        self.path = path
+        conn = sqlite3.connect(path)
+        self.year = conn.execute("SELECT MAX(year) FROM team_ratings").fetchone()[0]
+        self.team_id, self.team_name = conn.execute("SELECT id, name FROM teams ORDER BY id LIMIT 1").fetchone()
+        self.other_team_id, self.other_name = conn.execute(
+            "SELECT id, name FROM teams ORDER BY id LIMIT 1 OFFSET 1").fetchone()
+        self.player_id = conn.execute("SELECT MIN(id) FROM players WHERE team_id = ?", (self.team_id,)).fetchone()[0]
+        self.match_id = conn.execute("SELECT MAX(id) FROM matches").fetchone()[0]
+        conn.close()
+
+    def last_id(self, table):
+        conn = sqlite3.connect(self.path)
+        try:
+            return conn.execute(f"SELECT MAX(id) FROM {table}").fetchone()[0]
+        finally:
+            conn.close()
+
+
+def import_file(data, i):
+    rows = ["team_a,team_b,score_a,score_b,date,stage,venue"]
+    rows += [f"{data.team_name},{data.other_name},{n % 3},{(n + i) % 2},{data.year}-11-{n % 28 + 1:02d},"
+             f"Group Stage,Bench Arena" for n in range(10)]
+    return (io.BytesIO("\n".join(rows).encode()), "fixtures.csv")
+
+
+def routes(data):
+    """``(name, method, path or path(i), form or form(i))`` in the order they run.
+
+    Writes come in pairs that undo each other, so iterations are comparable.
+    """
+    match_form = {
+        "team_a": data.team_id, "team_b": data.other_team_id, "score_a": 2, "score_b": 1,
+        "venue": "Bench Arena", "date": f"{data.year}-11-30", "stage": "Group Stage",
+        "scorers[]": [data.player_id], "goals_a[]": [2],
+    }
+    return [
+        # Public
+        ("index", "GET", "/", None),
+        ("user_dashboard", "GET", f"/user?year={data.year}", None),
+        ("team_summary", "GET", f"/team_summary?team={data.team_name}", None),
+        ("api_team_summaries", "GET", f"/api/team_summaries?year={data.year}", None),
+        ("matches", "GET", "/matches", None),
+        ("matches_filtered", "GET", f"/matches?year={data.year}&stage=Group Stage", None),
+        ("api_matches", "GET", "/api/matches?limit=50", None),
+        ("api_match_changes", "GET", "/api/matches/changes?since=0", None),
+        ("api_leaderboards", "GET", f"/api/leaderboards?year={data.year}", None),
+        ("api_leaderboards_stage", "GET", f"/api/leaderboards?year={data.year}&stage=Group Stage&limit=50", None),
+        ("api_tournament", "GET", f"/api/tournament?year={data.year}", None),
+        ("get_players", "GET", f"/get_players/{data.team_id}", None),
+        # Admin pages
+        ("admin_dashboard", "GET", "/admin", None),
+        ("admin_search", "GET", f"/admin?players_q=Mu&matches_q={data.team_name[:3]}", None),
+        ("api_admin_players", "GET", "/api/admin/players?q=A&limit=50", None),
+        ("api_admin_matches", "GET", f"/api/admin/matches?year={data.year}", None),
+        ("cache_stats", "GET", "/cache_stats", None),
+        ("add_player_form", "GET", "/add_player", None),
+        ("edit_player_form", "GET", f"/edit_player/{data.player_id}", None),
+        ("edit_match_form", "GET", f"/edit_match/{data.match_id}", None),
+        # Admin writes
+        ("add_team", "POST", "/add_team",
+         lambda i: {"name": f"Bench FC {i}", "year": data.year, "points": 1500}),
+        ("edit_team", "POST", lambda i: f"/edit_team/{data.last_id('teams')}",
+         lambda i: {"name": f"Bench FC {i}", "coach": "Bench Coach", "year_established": 2000}),
+        ("delete_team", "POST", lambda i: f"/delete_team/{data.last_id('teams')}", None),
+        ("add_player", "POST", "/add_player",
+         {"name": "Bench Player", "team_id": data.team_id, "goals": 0, "yellow_cards": 0, "red_cards": 0}),
+        ("edit_player", "POST", lambda i: f"/edit_player/{data.last_id('players')}",
+         {"goals": 1, "yellow_cards": 1, "red_cards": 0}),
+        ("delete_player", "GET", lambda i: f"/delete_player/{data.last_id('players')}", None),
+        ("add_match", "POST", "/add_match", match_form),
+        ("edit_match", "POST", lambda i: f"/edit_match/{data.last_id('matches')}",
+         {"team_a": data.team_id, "team_b": data.other_team_id, "score_a": 1, "score_b": 1,
+          "stage": "Group Stage", "venue": "Bench Arena", "date": f"{data.year}-11-30"}),
+        ("delete_match", "POST", lambda i: f"/delete_match/{data.last_id('matches')}", None),
+        ("bulk_import", "POST", "/admin/import", lambda i: {"kind": "fixtures", "file": import_file(data, i)}),
+    ]
+
+
+def cleanup_imports(data, first_match_id):
+    # Bulk imports only add rows; drop them so the next round sees the same data
+    conn = sqlite3.connect(data.path)
+    ids = [row[0] for row in conn.execute("SELECT id FROM matches WHERE id > ?", (first_match_id,))]
+    for match_id in ids:
+        standings.apply_match(conn, match_id, -1)
+        leaderboards.apply_match(conn, match_id, -1)
+        admin_writes.credit_scorers(conn, match_id, -1)
+    conn.execute("DELETE FROM match_goals WHERE match_id > ?", (first_match_id,))
+    conn.execute("DELETE FROM matches WHERE id > ?", (first_match_id,))
+    conn.commit()
+    conn.close()
+
+
+def run(args):
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    counts = generate(path, args.seasons, args.teams, args.players, seed=args.seed)
+    data = Dataset(path)
+
+    app = app_module.app
+    db.close_pool(app)
+    app.config["DATABASE"] = path
+    app_module.response_cache.max_entries = 0  # time the views, not cache hits
+    counter = QueryCounter()
+    app.extensions["db_wrapper"] = counter.attach
+
+    client = app.test_client()
+    client.post("/login", data={"username": "admin", "password": "1234"})
+
+    samples = {name: {"times": [], "queries": [], "statuses": set()} for name, *_ in routes(data)}
+    for i in range(WARMUP + args.iterations):
+        for name, method, target, form in routes(data):
+            url = target(i) if callable(target) else target
+            body = form(i) if callable(form) else form
+            counter.count = 0
+            start = time.perf_counter()
+            response = client.open(url, method=method, data=body)
+            response.get_data()  # include streamed bodies
+            elapsed = time.perf_counter() - start
+            response.close()
+            if i >= WARMUP:
+                samples[name]["times"].append(elapsed * 1000)
+                samples[name]["queries"].append(counter.count)
+                samples[name]["statuses"].add(response.status_code)
+        cleanup_imports(data, data.match_id)
+    app.extensions.pop("db_wrapper", None)
+    db.close_pool(app)
+
+    results = {}
+    for name, s in samples.items():
+        times = sorted(s["times"])
+        results[name] = {
+            "p50_ms": round(percentile(times, 50), 3),
+            "p95_ms": round(percentile(times, 95), 3),
+            "p99_ms": round(percentile(times, 99), 3),
+            "queries": round(sum(s["queries"]) / len(s["queries"]), 2),
+            "status": sorted(s["statuses"]),
+        }
+    sha, dirty = git_commit()
+    return {
+        "commit": sha,
+        "dirty": dirty,
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "machine": platform.machine(),
+        "dataset": dict(counts, seed=args.seed),
+        "iterations": args.iterations,
+        "routes": results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Print the change per route; return the names of routes that regressed."""
+    regressed = []
+    print(f"\ncompared with {baseline['commit']}{'+' if baseline.get('dirty') else ''}")
+    if baseline.get("dataset") != current["dataset"]:
+        print(f"⚠️ different dataset: {baseline.get('dataset')} then, {current['dataset']} now")
+    print(f"{'route':<24} {'p95 before':>10} {'p95 now':>9} {'change':>8} {'queries':>12}")
+    for name, now in current["routes"].items():
+        before = baseline["routes"].get(name)
+        if before is None:
+            print(f"{name:<24} {'new':>10}")
+            continue
+        change = now["p95_ms"] / before["p95_ms"] - 1 if before["p95_ms"] else 0.0
+        slower = change > threshold
+        more_queries = now["queries"] > before["queries"]
+        if slower or more_queries:
+            regressed.append(name)
+        flag = " ❌" if slower or more_queries else ""
+        print(f"{name:<24} {before['p95_ms']:>10.2f} {now['p95_ms']:>9.2f} {change:>+8.0%} "
+              f"{before['queries']:>5g} -> {now['queries']:<5g}{flag}")
+    return regressed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seasons", type=int, default=6)
+    parser.add_argument("--teams", type=int, default=16)
+    parser.add_argument("--players", type=int, default=18)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--output", help="where to write the JSON (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", metavar="BASELINE_JSON")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed p95 slowdown (default 0.25)")
+    args = parser.parse_args()
+
+    report = run(args)
+    print(f"{'route':<24} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8}  status")
+    for name, r in report["routes"].items():
+        print(f"{name:<24} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['queries']:>8g}  "
+              f"{','.join(map(str, r['status']))}")
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{report['commit']}{'-dirty' if report['dirty'] else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nresults written to {os.path.relpath(output)}")
+
+    failed = [name for name, r in report["routes"].items() if any(code >= 500 for code in r["status"])]
+    if args.compare:
+        with open(args.compare) as f:
+            failed += compare(report, json.load(f), args.threshold)
+    if failed:
+        sys.exit(f"❌ {', '.join(failed)}")
+    print("✅ all routes answered without a server error")
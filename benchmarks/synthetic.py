@@ -0,0 +1,224 @@
+"""Synthetic tournament data: N seasons x M teams x K players.
+
+Each season is played like the real cup: teams are drawn into groups of
+four for a single round robin, the best group finishers go through to
+straight knockouts (Round of N / Quarter Final / Semi Final / Final), and
+knockout draws are settled in extra time. Scores come from a Poisson model
+driven by each team's strength, scorers are picked from the team's squad
+weighted towards attackers, and end-of-season ``team_ratings`` are Elo
+ratings carried over from season to season. The derived tables
+(``team_standings``, the leaderboards, ``rating_charts``) are rebuilt at
+the end, so the database looks exactly like one the admin pages produced.
+
+The same seed always produces the same database.
+
+    python benchmarks/synthetic.py out.db [--seasons 6] [--teams 16] [--players 18] [--seed 42]
+"""
+import argparse
+import datetime
+import math
+import os
+import random
+import sqlite3
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import charts  # noqa: E402
+import leaderboards  # noqa: E402
+import migrations  # noqa: E402
+import standings  # noqa: E402
+
+CITIES = ["Lafia", "Kwandare", "Keffi", "Akwanga", "Doma", "Nasarawa", "Karu", "Awe", "Obi", "Wamba",
+          "Toto", "Kokona", "Jos", "Makurdi", "Abuja", "Kaduna", "Minna", "Lokoja", "Ilorin", "Kano"]
+SUFFIXES = ["Stars FC", "United", "Rangers", "Golden Boys FC", "City", "Warriors", "Tigers", "Strikers"]
+FIRST_NAMES = ["Musa", "Ibrahim", "Abdullahi", "Sani", "Emeka", "Chinedu", "Tunde", "Yusuf", "Kamal",
+               "Samuel", "David", "Aliyu", "Bello", "Daniel", "Joseph", "Usman", "Haruna", "Peter"]
+LAST_NAMES = ["Idris", "Gosho", "Ohitoto", "Musa", "Okafor", "Adeyemi", "Bala", "Danjuma", "Eze",
+              "Garba", "Ibrahim", "Lawal", "Nwosu", "Ogunleye", "Suleiman", "Yakubu", "Abubakar"]
+VENUES = ["Lafia City Stadium", "Kwandare Field", "Keffi Township Stadium", "Akwanga Mini Stadium"]
+KNOCKOUT_STAGES = {2: "Final", 4: "Semi Final", 8: "Quarter Final"}
+
+BASE_GOALS = 1.35
+ELO_K = 24
+
+
+def _poisson(rng, lam):
+    # Knuth's method; lambdas here are small
+    limit, k, p = math.exp(-lam), 0, 1.0
+    while True:
+        p *= rng.random()
+        if p <= limit:
+            return k
+        k += 1
+
+
+def _team_names(rng, n):
+    names = set()
+    while len(names) < n:
+        names.add(f"{rng.choice(CITIES)} {rng.choice(SUFFIXES)}")
+        if len(names) < n and len(names) >= len(CITIES) * len(SUFFIXES):
+            names.add(f"Team {len(names) + 1}")
+    return sorted(names)
+
+
+class _Season:
+    """Plays one season and collects the rows to insert."""
+
+    def __init__(self, rng, year, teams, squads, strength, elo):
+        self.rng = rng
+        self.year = year
+        self.teams = teams
+        self.squads = squads
+        self.strength = strength
+        self.elo = elo
+        self.matches = []
+        self.goals = []
+        self.opening_day = datetime.date(year, 3, 1)
+
+    def _scorers(self, team_id, goals):
+        squad = self.squads[team_id]
+        # Later squad numbers are the attackers
+        weights = [1 + 3 * i / len(squad) for i in range(len(squad))]
+        tally = {}
+        for player_id in self.rng.choices(squad, weights, k=goals):
+            tally[player_id] = tally.get(player_id, 0) + 1
+        return tally
+
+    def play(self, match_id, team_a, team_b, stage, matchday):
+        rng = self.rng
+        ratio = self.strength[team_a] / self.strength[team_b]
+        score_a = _poisson(rng, BASE_GOALS * math.sqrt(ratio))
+        score_b = _poisson(rng, BASE_GOALS / math.sqrt(ratio))
+        if stage != "Group Stage" and score_a == score_b:
+            if rng.random() < ratio / (1 + ratio):
+                score_a += 1
+            else:
+                score_b += 1
+
+        self.matches.append((
+            match_id, team_a, team_b, score_a, score_b,
+            _poisson(rng, 1.6), _poisson(rng, 1.6), int(rng.random() < 0.08), int(rng.random() < 0.08),
+            rng.choice(VENUES), (self.opening_day + datetime.timedelta(days=matchday)).isoformat(),
+            stage, str(self.year),
+        ))
+        for team_id, goals in ((team_a, score_a), (team_b, score_b)):
+            for player_id, scored in self._scorers(team_id, goals).items():
+                self.goals.append((match_id, player_id, scored))
+
+        expected = 1 / (1 + 10 ** ((self.elo[team_b] - self.elo[team_a]) / 400))
+        actual = 1.0 if score_a > score_b else 0.5 if score_a == score_b else 0.0
+        self.elo[team_a] += ELO_K * (actual - expected)
+        self.elo[team_b] -= ELO_K * (actual - expected)
+        return score_a, score_b
+
+    def run(self, next_id):
+        rng = self.rng
+        drawn = self.teams[:]
+        rng.shuffle(drawn)
+        groups = [drawn[i:i + 4] for i in range(0, len(drawn), 4)]
+
+        qualified = []
+        for group in groups:
+            table = {team_id: [0, 0, 0] for team_id in group}  # points, goal difference, goals for
+            # Every group plays on the same matchdays
+            pairs = [(team_a, team_b) for i, team_a in enumerate(group) for team_b in group[i + 1:]]
+            for matchday, (team_a, team_b) in enumerate(pairs):
+                score_a, score_b = self.play(next_id, team_a, team_b, "Group Stage", matchday)
+                next_id += 1
+                for team_id, gf, ga in ((team_a, score_a, score_b), (team_b, score_b, score_a)):
+                    table[team_id][0] += 3 if gf > ga else 1 if gf == ga else 0
+                    table[team_id][1] += gf - ga
+                    table[team_id][2] += gf
+            ranked = sorted(group, key=lambda t: (table[t], rng.random()), reverse=True)
+            qualified.extend((table[t], t) for t in ranked[:2])
+
+        bracket = 2 ** int(math.log2(len(qualified))) if len(qualified) > 1 else 0
+        alive = [t for _, t in sorted(qualified, reverse=True)[:bracket]]
+        matchday = 10
+        while len(alive) > 1:
+            matchday += 4
+            stage = KNOCKOUT_STAGES.get(len(alive), f"Round of {len(alive)}")
+            winners = []
+            for i in range(len(alive) // 2):
+                team_a, team_b = alive[i], alive[-1 - i]  # best plays worst
+                score_a, score_b = self.play(next_id, team_a, team_b, stage, matchday)
+                next_id += 1
+                winners.append(team_a if score_a > score_b else team_b)
+            alive = winners
+        return next_id
+
+
+def generate(path, seasons=6, teams=16, players=18, start_year=None, seed=42):
+    """Create (or overwrite) a database at ``path``; returns row counts."""
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    rng = random.Random(seed)
+    start_year = start_year or 2026 - seasons
+
+    migrations.migrate(path)
+    conn = sqlite3.connect(path)
+    names = _team_names(rng, teams)
+    conn.executemany("INSERT INTO teams (id, name, group_name, coach, year_established) VALUES (?, ?, ?, ?, ?)",
+                     [(i, name, f"Group {chr(65 + (i - 1) // 4)}",
+                       f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", rng.randint(1960, 2015))
+                      for i, name in enumerate(names, start=1)])
+    team_ids = list(range(1, teams + 1))
+
+    squads, player_rows = {}, []
+    for team_id in team_ids:
+        squads[team_id] = []
+        for _ in range(players):
+            player_id = len(player_rows) + 1
+            squads[team_id].append(player_id)
+            player_rows.append((player_id, f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", team_id))
+    conn.executemany("INSERT INTO players (id, name, team_id) VALUES (?, ?, ?)", player_rows)
+
+    strength = {team_id: rng.lognormvariate(0, 0.35) for team_id in team_ids}
+    elo = {team_id: 1500.0 for team_id in team_ids}
+    next_id, match_count, goal_count = 1, 0, 0
+    for year in range(start_year, start_year + seasons):
+        # Squads improve and decline a little between seasons
+        for team_id in team_ids:
+            strength[team_id] *= rng.lognormvariate(0, 0.1)
+        season = _Season(rng, year, team_ids, squads, strength, elo)
+        next_id = season.run(next_id)
+        conn.executemany("""
+            INSERT INTO matches (id, team_a, team_b, score_a, score_b, yellow_a, yellow_b, red_a, red_b,
+                                 venue, date, stage, year)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, season.matches)
+        conn.executemany("INSERT INTO match_goals (match_id, player_id, goals_scored) VALUES (?, ?, ?)",
+                         season.goals)
+        conn.executemany("INSERT INTO team_ratings (team_name, year, points) VALUES (?, ?, ?)",
+                         [(names[team_id - 1], year, round(elo[team_id], 1)) for team_id in team_ids])
+        match_count += len(season.matches)
+        goal_count += len(season.goals)
+
+    conn.execute("""
+        UPDATE players SET goals = COALESCE(
+            (SELECT SUM(goals_scored) FROM match_goals WHERE player_id = players.id), 0)
+    """)
+    standings.rebuild(conn)
+    leaderboards.rebuild(conn)
+    charts.rebuild(conn)
+    conn.commit()
+    conn.close()
+    return {"seasons": seasons, "teams": teams, "players": len(player_rows),
+            "matches": match_count, "match_goals": goal_count}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic Ultimate Cup database.")
+    parser.add_argument("database")
+    parser.add_argument("--seasons", type=int, default=6)
+    parser.add_argument("--teams", type=int, default=16)
+    parser.add_argument("--players", type=int, default=18)
+    parser.add_argument("--start-year", type=int)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    counts = generate(args.database, args.seasons, args.teams, args.players, args.start_year, args.seed)
+    print("✅ " + ", ".join(f"{value} {name}" for name, value in counts.items()))
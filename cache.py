@@ -0,0 +1,216 @@
+"""In-process response cache and conditional GET support for the public pages.
+
+Entries are keyed by route and query string and tagged with the tables the
+view reads. Those tables have version counters in SQLite (``data_versions``),
+which admin writes bump inside their own transaction with
+``bump_versions()``. An entry is only served while the versions it was built
+against are still current, so a write made through any gunicorn worker
+invalidates the cache in every other worker too.
+
+The same counters, plus the time each was last bumped, give ``conditional()``
+a cheap ETag / Last-Modified validator for answering revalidations with 304
+before the view runs at all. The ETag also carries the build version
+(assets.py), so a deploy with new templates or assets invalidates it.
+Versions are read through ``get_read_db()``, the same database the public
+views read, so with ``DB_READ_MODE=snapshot`` (see db.py) an entry follows
+the snapshot it was built from.
+
+``SeasonCache`` applies the same idea to values computed per season (group
+tables, analytics): an entry is reused until the versions change.
+"""
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from flask import current_app, g, make_response, request
+
+import assets
+from db import get_read_db
+
+
+def _version_rows(conn):
+    # Read once per request and shared by every decorator on the view
+    if "data_versions" not in g:
+        g.data_versions = {row[0]: (row[1], row[2]) for row in conn.execute(
+            "SELECT table_name, version, updated_at FROM data_versions")}
+    return g.data_versions
+
+
+def current_versions(conn, tables):
+    rows = _version_rows(conn)
+    return tuple(rows.get(table, (0, 0))[0] for table in tables)
+
+
+def last_modified(conn, tables):
+    rows = _version_rows(conn)
+    timestamp = max((rows.get(table, (0, 0))[1] for table in tables), default=0)
+    return datetime.fromtimestamp(timestamp, timezone.utc) if timestamp else None
+
+
+def bump_versions(conn, *tables):
+    """Mark ``tables`` as changed; call inside the write's transaction."""
+    for table in tables:
+        conn.execute("""
+            INSERT INTO data_versions (table_name, version, updated_at)
+            VALUES (?, 1, CAST(strftime('%s', 'now') AS INTEGER))
+            ON CONFLICT (table_name) DO UPDATE SET
+                version = version + 1,
+                updated_at = excluded.updated_at
+        """, (table,))
+
+
+class SeasonCache:
+    """Per-season results of ``compute(conn, year)``, keyed by year and the data versions they were built from."""
+
+    def __init__(self, compute, max_entries=32):
+        self.compute = compute
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, conn, year, versions):
+        key = (year, versions)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        season = self.compute(conn, year)
+        with self._lock:
+            self._entries[key] = season
+            # Older versions of the same season are dead weight once superseded
+            for stale in [k for k in self._entries if k[0] == year and k != key]:
+                del self._entries[stale]
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return season
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class ResponseCache:
+    """Size-bounded LRU of rendered responses with hit/miss/eviction counters."""
+
+    def __init__(self, max_entries=256, max_bytes=32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _get(self, key, versions):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == versions:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            if entry is not None:
+                self._remove(key)
+                self.invalidations += 1
+            self.misses += 1
+            return None
+
+    def _put(self, key, versions, response):
+        body = response.get_data()
+        if len(body) > self.max_bytes:
+            return
+        headers = [(name, value) for name, value in response.headers
+                   if name.lower() not in ("set-cookie", "content-length")]
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (versions, response.status_code, headers, body)
+            self.size_bytes += len(body)
+            while len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        self.size_bytes -= len(self._entries.pop(key)[3])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.size_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def cached(self, *tables):
+        """Cache a view's 200 responses until one of ``tables`` or the build version changes."""
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                key = (request.endpoint, request.path, tuple(sorted(request.args.items(multi=True))))
+                # A page with no tables still changes with the templates and assets
+                versions = (assets.build_version(current_app),)
+                if tables:
+                    versions += current_versions(get_read_db(), tables)
+
+                entry = self._get(key, versions)
+                if entry is not None:
+                    _, status, headers, body = entry
+                    return make_response(body, status, headers)
+
+                response = make_response(view(*args, **kwargs))
+                if response.status_code == 200 and not response.is_streamed:
+                    self._put(key, versions, response)
+                return response
+            return wrapper
+        return decorator
+
+
+def conditional(*tables):
+    """Answer If-None-Match / If-Modified-Since with 304 while ``tables`` are
+    unchanged, and stamp ETag, Last-Modified and Cache-Control on 200s."""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            conn = get_read_db()
+            versions = current_versions(conn, tables)
+            modified = last_modified(conn, tables)
+            build = assets.build_version(current_app)
+            etag = hashlib.sha1(repr((build, tables, versions)).encode()).hexdigest()
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains(etag)
+            elif request.if_modified_since and modified:
+                not_modified = modified <= request.if_modified_since
+            else:
+                not_modified = False
+
+            response = make_response("", 304) if not_modified else make_response(view(*args, **kwargs))
+            if response.status_code in (200, 304):
+                response.set_etag(etag)
+                if modified:
+                    response.last_modified = modified
+                response.cache_control.public = True
+                response.cache_control.max_age = current_app.config["PUBLIC_MAX_AGE"]
+                response.cache_control.must_revalidate = True
+            return response
+        return wrapper
+    return decorator
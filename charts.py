@@ -0,0 +1,119 @@
+"""Pre-rendered SVG ratings charts, one row per season.
+
+The dashboard used to build a Plotly figure on every request and ship it
+with the full plotly.js bundle. The chart is now a small static SVG,
+rendered when a season's ratings change and stored in ``rating_charts``.
+Writes to ``team_ratings`` call ``refresh(conn, year)`` inside their own
+transaction, the same way match writes maintain ``team_standings``.
+
+    python charts.py rebuild [database]
+"""
+import html
+import sqlite3
+import sys
+
+# Plotly's default qualitative palette, so bars keep the colours px.bar gave them
+COLORS = ["#636EFA", "#EF553B", "#00CC96", "#AB63FA", "#FFA15A",
+          "#19D3F3", "#FF6692", "#B6E880", "#FF97FF", "#FECB52"]
+
+WIDTH, HEIGHT = 800, 440
+MARGIN_TOP, MARGIN_RIGHT, MARGIN_BOTTOM, MARGIN_LEFT = 60, 20, 110, 50
+GRID_LINES = 5
+
+CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS rating_charts (
+        year INTEGER PRIMARY KEY,
+        svg TEXT NOT NULL
+    )
+"""
+
+RATINGS_QUERY = "SELECT team_name, points FROM team_ratings WHERE year = ? ORDER BY points DESC"
+
+
+def _number(value):
+    return f"{value:g}" if isinstance(value, float) else str(value)
+
+
+def render_svg(ratings, year):
+    """SVG bar chart of ``(team_name, points)`` pairs, highest first."""
+    title = html.escape(f"{year} Ultimate Cup Team Ratings")
+    plot_w = WIDTH - MARGIN_LEFT - MARGIN_RIGHT
+    plot_h = HEIGHT - MARGIN_TOP - MARGIN_BOTTOM
+    values = [points or 0 for _, points in ratings]
+    low = min(0, min(values, default=0))
+    high = max(values, default=0) * 1.15 or 1
+    if high <= low:
+        high = low + 1
+
+    def y(value):
+        return MARGIN_TOP + plot_h * (high - value) / (high - low)
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {WIDTH} {HEIGHT}" width="100%" '
+        f'role="img" aria-label="{title}" font-family="Poppins, Arial, sans-serif" font-size="12">',
+        f'<text x="{WIDTH / 2:.0f}" y="30" text-anchor="middle" font-size="18" fill="#333">{title}</text>',
+    ]
+    for i in range(GRID_LINES + 1):
+        value = low + (high - low) * i / GRID_LINES
+        gy = y(value)
+        parts.append(f'<line x1="{MARGIN_LEFT}" x2="{WIDTH - MARGIN_RIGHT}" y1="{gy:.1f}" y2="{gy:.1f}" stroke="#e5e5e5"/>')
+        parts.append(f'<text x="{MARGIN_LEFT - 6}" y="{gy + 4:.1f}" text-anchor="end" fill="#666">{value:.3g}</text>')
+
+    slot = plot_w / max(len(ratings), 1)
+    bar_w = slot * 0.7
+    zero = y(0)
+    for i, (team_name, points) in enumerate(ratings):
+        name = html.escape(team_name or "")
+        value = points or 0
+        x = MARGIN_LEFT + slot * i + (slot - bar_w) / 2
+        top, bottom = sorted((y(value), zero))
+        cx = x + bar_w / 2
+        parts.append(f'<rect x="{x:.1f}" y="{top:.1f}" width="{bar_w:.1f}" height="{bottom - top:.1f}" '
+                     f'fill="{COLORS[i % len(COLORS)]}"><title>{name}: {_number(value)}</title></rect>')
+        parts.append(f'<text x="{cx:.1f}" y="{top - 5:.1f}" text-anchor="middle" fill="#333">{_number(value)}</text>')
+        parts.append(f'<text x="{cx:.1f}" y="{HEIGHT - MARGIN_BOTTOM + 14}" text-anchor="end" fill="#444" '
+                     f'transform="rotate(-35 {cx:.1f} {HEIGHT - MARGIN_BOTTOM + 14})">{name}</text>')
+    parts.append("</svg>")
+    return "".join(parts)
+
+
+def render_year(conn, year):
+    return render_svg([tuple(row) for row in conn.execute(RATINGS_QUERY, (year,))], year)
+
+
+def refresh(conn, year):
+    """Re-render one season's chart; call inside the ratings write's transaction."""
+    if conn.execute("SELECT 1 FROM team_ratings WHERE year = ? LIMIT 1", (year,)).fetchone():
+        conn.execute("INSERT OR REPLACE INTO rating_charts (year, svg) VALUES (?, ?)",
+                     (year, render_year(conn, year)))
+    else:
+        conn.execute("DELETE FROM rating_charts WHERE year = ?", (year,))
+
+
+def get_chart(conn, year):
+    """Stored SVG for ``year``, rendering it on the fly if it was never stored."""
+    row = conn.execute("SELECT svg FROM rating_charts WHERE year = ?", (year,)).fetchone()
+    return row[0] if row else render_year(conn, year)
+
+
+def rebuild(conn):
+    """Re-render every season; the caller commits."""
+    conn.execute("DELETE FROM rating_charts")
+    for (year,) in conn.execute("SELECT DISTINCT year FROM team_ratings WHERE year IS NOT NULL").fetchall():
+        refresh(conn, year)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "rebuild":
+        sys.exit(__doc__)
+
+    from migrations import migrate
+
+    database = sys.argv[2] if len(sys.argv) > 2 else "ultimate_cup.db"
+    migrate(database)
+    conn = sqlite3.connect(database)
+    rebuild(conn)
+    conn.commit()
+    count = conn.execute("SELECT COUNT(*) FROM rating_charts").fetchone()[0]
+    print(f"✅ Rendered {count} ratings charts.")
+    conn.close()
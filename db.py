@@ -0,0 +1,320 @@
+"""SQLite connection handling for the Ultimate Cup app.
+
+Each gunicorn worker keeps a small pool of open connections, tuned once when
+they are created. A request borrows one the first time it calls ``get_db()``
+and hands it back in ``teardown_appcontext``.
+
+Public pages read through ``get_read_db()`` instead, and ``DB_READ_MODE``
+decides what that is:
+
+* ``primary`` (default): the same connection as ``get_db()``;
+* ``readonly``: a separate pool opened with a ``mode=ro`` URI, so public
+  pages cannot write. In WAL mode these readers never wait for a writer;
+* ``snapshot``: a private copy of the database per worker, made with the
+  SQLite online backup API and replaced every ``DB_SNAPSHOT_SECONDS``.
+  Public pages never touch the primary at all, at the cost of being up to
+  one interval behind. A refresh writes a new copy and switches to it, so
+  reads already running on the old copy are never held up.
+
+Admin pages and every write keep using ``get_db()`` on the primary.
+"""
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+from urllib.parse import quote, urlencode
+
+from flask import current_app, g
+
+import migrations
+
+DEFAULTS = {
+    "DATABASE": "ultimate_cup.db",
+    "DB_POOL_SIZE": 8,
+    "DB_CACHE_SIZE_KB": 8192,
+    "DB_MMAP_SIZE": 64 * 1024 * 1024,
+    "DB_STATEMENT_CACHE": 256,
+    "DB_BUSY_TIMEOUT_MS": 5000,
+    "DB_MIGRATE": True,
+    "DB_READ_MODE": os.environ.get("ULTIMATE_CUP_READ_MODE", "primary"),
+    "DB_SNAPSHOT_SECONDS": float(os.environ.get("ULTIMATE_CUP_SNAPSHOT_SECONDS", 30)),
+    "DB_SNAPSHOT_DIR": os.environ.get("ULTIMATE_CUP_SNAPSHOT_DIR") or None,  # None: the system temp dir
+}
+READ_MODES = ("primary", "readonly", "snapshot")
+
+
+def read_only_uri(path, **params):
+    return f"file:{quote(os.path.abspath(path))}?{urlencode({'mode': 'ro', **params})}"
+
+
+class ConnectionPool:
+    """Thread-safe pool of SQLite connections owned by one worker process."""
+
+    def __init__(self, database, size, cache_size_kb, mmap_size, statement_cache, busy_timeout_ms,
+                 read_only=False):
+        self.database = database  # a file: URI when read_only
+        self.size = size
+        self.cache_size_kb = cache_size_kb
+        self.mmap_size = mmap_size
+        self.statement_cache = statement_cache
+        self.busy_timeout_ms = busy_timeout_ms
+        self.read_only = read_only
+        self.retired = False
+        self.pid = os.getpid()
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.database,
+            check_same_thread=False,
+            cached_statements=self.statement_cache,
+            uri=self.read_only,
+        )
+        conn.row_factory = sqlite3.Row
+        if self.read_only:
+            conn.execute("PRAGMA query_only = ON")
+        else:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA cache_size = -{int(self.cache_size_kb)}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        return conn
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def release(self, conn):
+        # Never hand a half-finished transaction to the next request.
+        if conn.in_transaction:
+            conn.rollback()
+        if self.retired:
+            conn.close()
+            return
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close_all(self):
+        with self._lock:
+            while True:
+                try:
+                    self._idle.get_nowait().close()
+                except queue.Empty:
+                    break
+
+    def retire(self):
+        """Close idle connections now and borrowed ones as they come back."""
+        self.retired = True
+        self.close_all()
+
+
+class Snapshot:
+    """One worker's private copy of the database, replaced every ``interval`` seconds.
+
+    ``make_pool(uri)`` returns a read-only ``ConnectionPool`` for a copy.
+    """
+
+    def __init__(self, database, directory, interval, make_pool):
+        self.database = database
+        self.directory = directory or tempfile.gettempdir()
+        self.interval = interval
+        self.make_pool = make_pool
+        self.pid = os.getpid()
+        self.pool = None
+        self.path = None
+        self.refreshed_at = None
+        self.refreshes = 0
+        self.closed = False
+        self._retired_path = None
+        self._lock = threading.Lock()
+        self._first_copy = threading.Lock()
+
+    def _copy(self, path):
+        source = sqlite3.connect(self.database)
+        target = sqlite3.connect(path)
+        try:
+            source.backup(target)
+            # The copy never changes, so it needs no WAL and no locking once open
+            target.execute("PRAGMA journal_mode = DELETE")
+        finally:
+            target.close()
+            source.close()
+
+    def refresh(self):
+        fd, path = tempfile.mkstemp(prefix=f"ultimate_cup-snapshot-{self.pid}-", suffix=".db", dir=self.directory)
+        os.close(fd)
+        try:
+            self._copy(path)
+        except Exception:
+            _remove(path)
+            raise
+        pool = self.make_pool(read_only_uri(path, immutable=1))
+        with self._lock:
+            old_pool, old_path = self.pool, self.path
+            self.pool, self.path = pool, path
+            self.refreshed_at = time.time()
+            self.refreshes += 1
+        if old_pool is not None:
+            old_pool.retire()
+            # Keep the old file one more interval, for a request that took the
+            # old pool just before the swap and hasn't connected yet
+            if self._retired_path:
+                _remove(self._retired_path)
+            self._retired_path = old_path
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            if self.closed:
+                return
+            try:
+                self.refresh()
+            except Exception as e:  # keep serving the last good copy
+                print(f"❌ snapshot refresh: {e!r}")
+
+    def get_pool(self):
+        if self.pool is None:
+            with self._first_copy:
+                if self.pool is None:
+                    self.refresh()
+                    threading.Thread(target=self._run, name="db-snapshot", daemon=True).start()
+        return self.pool
+
+    def close(self):
+        self.closed = True
+        with self._lock:
+            pool, path, self.pool = self.pool, self.path, None
+        if pool is not None:
+            pool.retire()
+            _remove(path)
+        if self._retired_path:
+            _remove(self._retired_path)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass  # still open somewhere (Windows); the temp dir is cleaned eventually
+
+
+_pool_lock = threading.Lock()
+
+
+def get_pool(app=None):
+    """Return the pool for ``app``, creating it (and migrating the schema) on
+    first use in this process."""
+    app = app or current_app._get_current_object()
+    pool = app.extensions.get("sqlite_pool")
+    # A pool inherited across fork (gunicorn --preload) must not be shared.
+    if pool is None or pool.pid != os.getpid():
+        with _pool_lock:
+            pool = app.extensions.get("sqlite_pool")
+            if pool is None or pool.pid != os.getpid():
+                if app.config["DB_MIGRATE"]:
+                    migrations.migrate(app.config["DATABASE"])
+                pool = _new_pool(app, app.config["DATABASE"])
+                app.extensions["sqlite_pool"] = pool
+    return pool
+
+
+def _new_pool(app, database, read_only=False):
+    return ConnectionPool(
+        database,
+        app.config["DB_POOL_SIZE"],
+        app.config["DB_CACHE_SIZE_KB"],
+        app.config["DB_MMAP_SIZE"],
+        app.config["DB_STATEMENT_CACHE"],
+        app.config["DB_BUSY_TIMEOUT_MS"],
+        read_only=read_only,
+    )
+
+
+def get_read_pool(app=None):
+    """Pool ``get_read_db()`` borrows from, per ``DB_READ_MODE``."""
+    app = app or current_app._get_current_object()
+    mode = app.config["DB_READ_MODE"]
+    primary = get_pool(app)  # also brings the schema up to date before anything reads it
+    if mode == "primary":
+        return primary
+    if mode == "readonly":
+        pool = app.extensions.get("sqlite_read_pool")
+        if pool is None or pool.pid != os.getpid():
+            with _pool_lock:
+                pool = app.extensions.get("sqlite_read_pool")
+                if pool is None or pool.pid != os.getpid():
+                    pool = _new_pool(app, read_only_uri(app.config["DATABASE"]), read_only=True)
+                    app.extensions["sqlite_read_pool"] = pool
+        return pool
+    snapshot = app.extensions.get("sqlite_snapshot")
+    if snapshot is None or snapshot.pid != os.getpid():
+        with _pool_lock:
+            snapshot = app.extensions.get("sqlite_snapshot")
+            if snapshot is None or snapshot.pid != os.getpid():
+                snapshot = Snapshot(app.config["DATABASE"], app.config["DB_SNAPSHOT_DIR"],
+                                    app.config["DB_SNAPSHOT_SECONDS"],
+                                    lambda uri: _new_pool(app, uri, read_only=True))
+                app.extensions["sqlite_snapshot"] = snapshot
+    return snapshot.get_pool()
+
+
+def close_pool(app):
+    """Close every idle connection and drop the pool (e.g. after changing DATABASE)."""
+    pool = app.extensions.pop("sqlite_pool", None)
+    if pool is not None:
+        pool.close_all()
+    read_pool = app.extensions.pop("sqlite_read_pool", None)
+    if read_pool is not None:
+        read_pool.close_all()
+    snapshot = app.extensions.pop("sqlite_snapshot", None)
+    if snapshot is not None:
+        snapshot.close()
+
+
+def get_db():
+    """Connection bound to the current app context; returned to the pool on teardown."""
+    if "db" not in g:
+        conn = get_pool().acquire()
+        # instrumentation.py swaps in a timing proxy when metrics are enabled
+        wrap = current_app.extensions.get("db_wrapper")
+        g.db = wrap(conn) if wrap else conn
+    return g.db
+
+
+def get_read_db():
+    """Connection for public pages; see ``DB_READ_MODE``. Never write through it."""
+    if current_app.config["DB_READ_MODE"] == "primary":
+        return get_db()
+    if "read_db" not in g:
+        pool = get_read_pool()
+        conn = pool.acquire()
+        g.read_db_pool = pool  # a snapshot refresh may swap pools before teardown
+        wrap = current_app.extensions.get("db_wrapper")
+        g.read_db = wrap(conn) if wrap else conn
+    return g.read_db
+
+
+def release_db(exc=None):
+    conn = g.pop("db", None)
+    if conn is not None:
+        get_pool().release(getattr(conn, "raw", conn))
+    read_conn = g.pop("read_db", None)
+    if read_conn is not None:
+        g.pop("read_db_pool").release(getattr(read_conn, "raw", read_conn))
+
+
+def init_app(app):
+    for key, value in DEFAULTS.items():
+        app.config.setdefault(key, value)
+    if app.config["DB_READ_MODE"] not in READ_MODES:
+        raise ValueError(f"DB_READ_MODE must be one of {', '.join(READ_MODES)}")
+    app.teardown_appcontext(release_db)
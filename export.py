@@ -0,0 +1,214 @@
+"""Streaming export of fixtures (with scorers), players and team ratings.
+
+Each export is one query read with ``fetchmany(CHUNK_SIZE)``. Every chunk is
+encoded and handed on before the next is fetched, so memory stays bounded
+by the chunk size however many seasons are exported.
+
+Fixture and player files use the columns importer.py reads (scorers as
+"Player Name:2; Other Player"), so a CSV or JSON Lines export can be imported
+back as it is. Fixtures also carry ``year``; ratings are team, year, points.
+
+Parquet needs pyarrow, which is imported only when a Parquet export is
+asked for. Each chunk is written as one row group.
+
+    python export.py fixtures|players|ratings [--year 2025 ...] [--format csv|jsonl|parquet]
+                     [--database ultimate_cup.db] [--output FILE]
+"""
+import argparse
+import csv
+import io
+import json
+import sqlite3
+import sys
+
+CHUNK_SIZE = 500
+FORMATS = {"csv": "text/csv", "jsonl": "application/x-ndjson", "parquet": "application/vnd.apache.parquet"}
+
+# Matches store the season as text, team ratings as an integer
+_SEASONS = "SELECT CAST(value AS TEXT) FROM json_each(:years)"
+
+_SCORERS = """
+    (SELECT group_concat(name || ':' || goals, '; ') FROM (
+        SELECT p.name, SUM(COALESCE(mg.goals_scored, 1)) AS goals
+        FROM match_goals mg JOIN players p ON p.id = mg.player_id
+        WHERE mg.match_id = m.id AND p.team_id = m.{team}
+        GROUP BY p.id ORDER BY p.name
+    ))
+"""
+
+# kind -> (columns with their Parquet types, query, filter on the chosen seasons).
+# The filter is added only when seasons are given, so the planner can seek by year.
+EXPORTS = {
+    "fixtures": ((("year", "string"), ("date", "string"), ("stage", "string"), ("venue", "string"),
+                  ("team_a", "string"), ("team_b", "string"), ("score_a", "int64"), ("score_b", "int64"),
+                  ("yellow_a", "int64"), ("yellow_b", "int64"), ("red_a", "int64"), ("red_b", "int64"),
+                  ("scorers_a", "string"), ("scorers_b", "string")), f"""
+        SELECT m.year, m.date, m.stage, m.venue, ta.name, tb.name, m.score_a, m.score_b,
+               m.yellow_a, m.yellow_b, m.red_a, m.red_b,
+               {_SCORERS.format(team="team_a")}, {_SCORERS.format(team="team_b")}
+        FROM matches m
+        LEFT JOIN teams ta ON ta.id = m.team_a
+        LEFT JOIN teams tb ON tb.id = m.team_b
+        {{where}}
+        ORDER BY m.year, m.date, m.id
+    """, f"m.year IN ({_SEASONS})"),
+    # For chosen seasons, the squads of the teams that played in them
+    "players": ((("name", "string"), ("team", "string"), ("goals", "int64"),
+                 ("yellow_cards", "int64"), ("red_cards", "int64")), f"""
+        SELECT p.name, t.name, p.goals, p.yellow_cards, p.red_cards
+        FROM players p
+        LEFT JOIN teams t ON t.id = p.team_id
+        {{where}}
+        ORDER BY t.name, p.name, p.id
+    """, f"""p.team_id IN (
+            SELECT team_a FROM matches WHERE year IN ({_SEASONS})
+            UNION SELECT team_b FROM matches WHERE year IN ({_SEASONS})
+        )"""),
+    "ratings": ((("team", "string"), ("year", "int64"), ("points", "double")), """
+        SELECT team_name, year, points
+        FROM team_ratings
+        {where}
+        ORDER BY year, points DESC, team_name
+    """, "year IN (SELECT value FROM json_each(:years))"),
+}
+
+
+def columns(kind):
+    return [name for name, _ in EXPORTS[kind][0]]
+
+
+def filename(kind, fmt, years=()):
+    seasons = "".join(f"-{year}" for year in years)
+    return f"ultimate_cup-{kind}{seasons}.{fmt}"
+
+
+def parquet_available():
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def query(kind, years=()):
+    """The export's SQL, filtered on the seasons only when ``years`` are given."""
+    _, sql, season_filter = EXPORTS[kind]
+    return sql.format(where=f"WHERE {season_filter}" if years else "")
+
+
+def chunks(conn, kind, years=(), chunk_size=CHUNK_SIZE):
+    """Yield lists of row tuples, ``chunk_size`` at a time; ``years`` empty means every season."""
+    years = [int(year) for year in years]
+    cursor = conn.execute(query(kind, years), {"years": json.dumps(years)} if years else {})
+    try:
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield [tuple(row) for row in rows]
+    finally:
+        cursor.close()
+
+
+# ---------- Encoders ----------
+def _csv(kind, row_chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns(kind))
+    for rows in row_chunks:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _jsonl(kind, row_chunks):
+    names = columns(kind)
+    for rows in row_chunks:
+        yield "".join(json.dumps(dict(zip(names, row))) + "\n" for row in rows)
+
+
+class _Sink:
+    """Write-only file for ParquetWriter; ``take`` hands over what was written so far."""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.buffer += data
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def writable(self):
+        return True
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self):
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        return data
+
+
+def _parquet(kind, row_chunks):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(name, getattr(pa, type_)()) for name, type_ in EXPORTS[kind][0]])
+    sink = _Sink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for rows in row_chunks:
+            writer.write_table(pa.Table.from_pylist([dict(zip(schema.names, row)) for row in rows], schema=schema))
+            yield sink.take()
+    finally:
+        writer.close()
+    yield sink.take()
+
+
+ENCODERS = {"csv": _csv, "jsonl": _jsonl, "parquet": _parquet}
+
+
+def stream(conn, kind, fmt, years=(), chunk_size=CHUNK_SIZE):
+    """Yield the export piece by piece: ``str`` for CSV and JSON Lines, ``bytes`` for Parquet."""
+    if fmt == "parquet" and not parquet_available():
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+    return ENCODERS[fmt](kind, chunks(conn, kind, years, chunk_size))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export fixtures, players or team ratings.")
+    parser.add_argument("kind", choices=sorted(EXPORTS))
+    parser.add_argument("--year", type=int, action="append", default=[], help="repeat for several seasons")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="csv")
+    parser.add_argument("--database", default="ultimate_cup.db")
+    parser.add_argument("--output", help="defaults to stdout (CSV and JSON Lines only)")
+    args = parser.parse_args()
+
+    if args.format == "parquet" and not args.output:
+        parser.error("--output is required for Parquet")
+    try:
+        pieces = stream(sqlite3.connect(args.database), args.kind, args.format, args.year)
+    except RuntimeError as e:
+        sys.exit(f"❌ {e}")
+
+    if args.output is None:
+        sys.stdout.writelines(pieces)
+        sys.exit(0)
+    if args.format == "parquet":
+        out = open(args.output, "wb")
+    else:
+        out = open(args.output, "w", encoding="utf-8", newline="")
+    with out:
+        out.writelines(pieces)
+    print(f"✅ Exported {args.kind} to {args.output}", file=sys.stderr)
@@ -0,0 +1,298 @@
+"""Bulk import of fixtures and players from CSV or JSON Lines.
+
+Rows are streamed from the file, validated, and resolved against in-memory
+name -> id maps built once per import. Accepted rows are written with
+``executemany`` in chunked transactions, so memory stays bounded by the
+chunk size however long the file is. Rejected rows are reported by line
+number and never stop the rest of the import. A failure that does stop it
+(a file that isn't UTF-8, a database error) rolls back only the chunk in
+progress: the report keeps what was committed before, plus the error.
+
+Files are CSV (``.csv``) or JSON Lines (``.jsonl``, ``.ndjson``), one object
+per line. A ``.json`` file is refused rather than guessed at: a JSON array
+can't be read a row at a time.
+
+Fixture columns: team_a, team_b, score_a, score_b, date (YYYY-MM-DD), stage,
+venue, and optionally yellow_a, yellow_b, red_a, red_b, scorers_a and
+scorers_b. Scorers are written as "Player Name:2; Other Player", where a
+missing count means one goal.
+
+Player columns: name, team, and optionally goals, yellow_cards, red_cards.
+
+    python importer.py fixtures|players FILE [--database ultimate_cup.db] [--chunk-size 500]
+"""
+import argparse
+import csv
+import io
+import json
+import sqlite3
+import sys
+from datetime import date as Date
+
+import admin_writes
+import cache
+import leaderboards
+import live
+import standings
+
+CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+# Failures that stop an import part-way; the first two mean the file itself is bad
+BAD_FILE_ERRORS = (UnicodeError, csv.Error)
+STOPPING_ERRORS = BAD_FILE_ERRORS + (sqlite3.Error, RuntimeError)
+
+
+class RowError(ValueError):
+    pass
+
+
+def read_rows(stream, fmt):
+    """Yield ``(line_number, dict)`` from a text stream of CSV or JSON Lines."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == "jsonl":
+        for line_number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield line_number, RowError(f"invalid JSON: {e}")
+                continue
+            yield line_number, row if isinstance(row, dict) else RowError("expected a JSON object")
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+
+def detect_format(filename):
+    """``"csv"`` or ``"jsonl"`` from the file's extension; None for anything else."""
+    for extension, fmt in FORMATS.items():
+        if filename.lower().endswith(extension):
+            return fmt
+    return None
+
+
+class ImportReport:
+    def __init__(self):
+        self.inserted = 0
+        self.error_count = 0
+        self.errors = []
+        self.stopped = None
+        self.bad_file = False
+
+    def error(self, line_number, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": line_number, "error": message})
+
+    def stop(self, exc):
+        self.stopped = f"import stopped after {self.inserted} rows: {exc}"
+        self.bad_file = isinstance(exc, BAD_FILE_ERRORS)
+
+    def as_dict(self):
+        return {"inserted": self.inserted, "error_count": self.error_count, "errors": self.errors,
+                "stopped": self.stopped}
+
+
+def _text(row, field, required=True):
+    value = row.get(field)
+    value = str(value).strip() if value is not None else ""
+    if required and not value:
+        raise RowError(f"missing {field}")
+    return value or None
+
+
+def _count(row, field, default=0):
+    value = row.get(field)
+    if value is None or str(value).strip() == "":
+        return default
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise RowError(f"{field} must be a whole number")
+    if number < 0:
+        raise RowError(f"{field} cannot be negative")
+    return number
+
+
+def _team_ids(conn):
+    return {name.strip().lower(): team_id for team_id, name in conn.execute("SELECT id, name FROM teams")}
+
+
+def _player_ids(conn):
+    return {(team_id, name.strip().lower()): player_id
+            for player_id, team_id, name in conn.execute("SELECT id, team_id, name FROM players")}
+
+
+def _resolve_team(team_ids, name):
+    team_id = team_ids.get(name.lower())
+    if team_id is None:
+        raise RowError(f"unknown team '{name}'")
+    return team_id
+
+
+def _parse_scorers(value, team_id, player_ids):
+    scorers = []
+    for entry in filter(None, (part.strip() for part in (value or "").split(";"))):
+        name, _, goals = entry.partition(":")
+        player_id = player_ids.get((team_id, name.strip().lower()))
+        if player_id is None:
+            raise RowError(f"unknown scorer '{name.strip()}'")
+        try:
+            goals = int(goals) if goals.strip() else 1
+        except ValueError:
+            raise RowError(f"bad goal count for '{name.strip()}'")
+        scorers.append((player_id, goals))
+    return scorers
+
+
+def _next_id(conn, table):
+    # AUTOINCREMENT hands out max(sqlite_sequence.seq, max(rowid)) + 1
+    seq = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone()
+    max_id = conn.execute(f"SELECT MAX(id) FROM {table}").fetchone()[0]
+    return max(seq[0] if seq else 0, max_id or 0) + 1
+
+
+def _chunks(rows, report, parse, chunk_size):
+    chunk = []
+    for line_number, row in rows:
+        try:
+            if isinstance(row, RowError):
+                raise row
+            chunk.append(parse(row))
+        except RowError as e:
+            report.error(line_number, str(e))
+            continue
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def import_fixtures(conn, rows, chunk_size=CHUNK_SIZE, report=None):
+    """Insert fixtures (and their scorers) from ``(line_number, dict)`` rows."""
+    report = ImportReport() if report is None else report
+    team_ids = _team_ids(conn)
+    player_ids = _player_ids(conn)
+
+    def parse(row):
+        team_a = _resolve_team(team_ids, _text(row, "team_a"))
+        team_b = _resolve_team(team_ids, _text(row, "team_b"))
+        if team_a == team_b:
+            raise RowError("team_a and team_b are the same team")
+        match_date = _text(row, "date")
+        try:
+            Date.fromisoformat(match_date)
+        except ValueError:
+            raise RowError("date must be YYYY-MM-DD")
+        match = (team_a, team_b, _count(row, "score_a"), _count(row, "score_b"),
+                 _count(row, "yellow_a"), _count(row, "yellow_b"), _count(row, "red_a"), _count(row, "red_b"),
+                 _text(row, "venue", required=False), match_date, _text(row, "stage"), match_date[:4])
+        scorers = (_parse_scorers(row.get("scorers_a"), team_a, player_ids)
+                   + _parse_scorers(row.get("scorers_b"), team_b, player_ids))
+        return match, scorers
+
+    for chunk in _chunks(rows, report, parse, chunk_size):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            first_id = _next_id(conn, "matches")
+            conn.executemany("""
+                INSERT INTO matches (team_a, team_b, score_a, score_b, yellow_a, yellow_b, red_a, red_b, venue, date, stage, year)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [match for match, _ in chunk])
+            last_id = first_id + len(chunk) - 1
+            if conn.execute("SELECT MAX(id) FROM matches").fetchone()[0] != last_id:
+                raise RuntimeError("match ids were not assigned sequentially")
+
+            conn.executemany("""
+                INSERT INTO match_goals (match_id, player_id, goals_scored) VALUES (?, ?, ?)
+            """, [(first_id + i, player_id, goals)
+                  for i, (_, scorers) in enumerate(chunk)
+                  for player_id, goals in scorers])
+            standings.apply_match_range(conn, first_id, last_id)
+            leaderboards.apply_match_range(conn, first_id, last_id)
+            admin_writes.credit_scorer_range(conn, first_id, last_id)
+            live.log_change_range(conn, first_id, last_id)
+            cache.bump_versions(conn, "matches", "match_goals", "players")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        report.inserted += len(chunk)
+    return report
+
+
+def import_players(conn, rows, chunk_size=CHUNK_SIZE, report=None):
+    """Insert players from ``(line_number, dict)`` rows."""
+    report = ImportReport() if report is None else report
+    team_ids = _team_ids(conn)
+
+    def parse(row):
+        return (_text(row, "name"), _resolve_team(team_ids, _text(row, "team")),
+                _count(row, "goals"), _count(row, "yellow_cards"), _count(row, "red_cards"))
+
+    for chunk in _chunks(rows, report, parse, chunk_size):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("""
+                INSERT INTO players (name, team_id, goals, yellow_cards, red_cards)
+                VALUES (?, ?, ?, ?, ?)
+            """, chunk)
+            cache.bump_versions(conn, "players")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        report.inserted += len(chunk)
+    return report
+
+
+IMPORTERS = {"fixtures": import_fixtures, "players": import_players}
+
+
+def run_import(conn, kind, stream, fmt, chunk_size=CHUNK_SIZE):
+    """Import a text stream; ``conn`` must not have a transaction open.
+
+    A failure part-way is recorded on the report (``stopped``) rather than
+    raised, so the caller still learns how many rows were committed.
+    """
+    report = ImportReport()
+    try:
+        IMPORTERS[kind](conn, read_rows(stream, fmt), chunk_size, report)
+    except STOPPING_ERRORS as e:
+        report.stop(e)
+    return report
+
+
+if __name__ == "__main__":
+    from migrations import migrate
+
+    parser = argparse.ArgumentParser(description="Bulk import fixtures or players.")
+    parser.add_argument("kind", choices=sorted(IMPORTERS))
+    parser.add_argument("file")
+    parser.add_argument("--database", default="ultimate_cup.db")
+    parser.add_argument("--format", choices=("csv", "jsonl"))
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+    fmt = args.format or detect_format(args.file)
+    if fmt is None:
+        parser.error("FILE must be .csv, .jsonl or .ndjson (or pass --format)")
+
+    migrate(args.database)
+    conn = sqlite3.connect(args.database, isolation_level=None)
+    with io.open(args.file, encoding="utf-8", newline="") as stream:
+        report = run_import(conn, args.kind, stream, fmt, args.chunk_size)
+    conn.close()
+
+    for error in report.errors:
+        print(f"❌ row {error['row']}: {error['error']}")
+    if report.stopped:
+        print(f"❌ {report.stopped}")
+    print(f"✅ Imported {report.inserted} {args.kind}; {report.error_count} rows rejected.")
+    sys.exit(1 if report.error_count or report.stopped else 0)
@@ -1,42 +1,12 @@
 import sqlite3
 
-# Connect (creates file if it doesn’t exist)
+from migrations import migrate
+
+# Create or upgrade the schema, then connect
+migrate("ultimate_cup.db")
 conn = sqlite3.connect("ultimate_cup.db")
 cursor = conn.cursor()
 
-# ---------- Create Teams Table ----------
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS teams (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    name TEXT NOT NULL UNIQUE
-)
-""")
-
-# ---------- Create Matches Table ----------
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS matches (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    team_a INTEGER,
-    team_b INTEGER,
-    score_a INTEGER DEFAULT 0,
-    score_b INTEGER DEFAULT 0,
-    date TEXT,
-    venue TEXT,
-    FOREIGN KEY (team_a) REFERENCES teams(id),
-    FOREIGN KEY (team_b) REFERENCES teams(id)
-)
-""")
-
-# ---------- Create Team Ratings Table ----------
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS team_ratings (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    year INTEGER,
-    team_name TEXT,
-    points REAL
-)
-""")
-
 # ---------- Seed Example Data ----------
 teams = [
     ("Future Legends FC",),
@@ -1,21 +1,11 @@
 import sqlite3
 
+from migrations import migrate
+
+migrate("ultimate_cup.db")
 conn = sqlite3.connect("ultimate_cup.db")
 cursor = conn.cursor()
 
-# Create the players table
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS players (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    name TEXT NOT NULL,
-    team_id INTEGER,
-    goals INTEGER DEFAULT 0,
-    yellow_cards INTEGER DEFAULT 0,
-    red_cards INTEGER DEFAULT 0,
-    FOREIGN KEY (team_id) REFERENCES teams(id)
-)
-""")
-
 # Add some sample players (optional)
 players = [
     ("John Smith", 1, 3, 1, 0),
@@ -1,20 +1,15 @@
 import sqlite3
 
-# Connect to the database (or create it if not found)
+from migrations import migrate
+
+# Create or upgrade the schema, then connect
+migrate("ultimate_cup.db")
 conn = sqlite3.connect("ultimate_cup.db")
 cursor = conn.cursor()
 
 # --------------------------
-# 1️⃣ Create Teams Table
+# 1️⃣ Teams
 # --------------------------
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS teams (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    name TEXT NOT NULL,
-    group_name TEXT
-)
-""")
-
 # Sample Teams
 teams = [
     ("Lafia Stars FC", "Group A"),
@@ -26,27 +21,15 @@ teams = [
     ("Greater Tomorrow FC", "Group C"),
     ("Maria Assumpta FC", "Group C"),
 ]
-cursor.executemany("INSERT INTO teams (name, group_name) VALUES (?, ?)", teams)
+cursor.executemany("INSERT OR IGNORE INTO teams (name, group_name) VALUES (?, ?)", teams)
+# Team names are unique; the samples below refer to teams by their place in the list
+team_ids = dict(cursor.execute("SELECT name, id FROM teams").fetchall())
+team_id = {number: team_ids[name] for number, (name, _) in enumerate(teams, start=1)}
 
 
 # --------------------------
-# 2️⃣ Create Matches Table
+# 2️⃣ Matches
 # --------------------------
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS matches (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    team_a INTEGER,
-    team_b INTEGER,
-    score_a INTEGER,
-    score_b INTEGER,
-    date TEXT,
-    venue TEXT,
-    stage TEXT,
-    FOREIGN KEY (team_a) REFERENCES teams(id),
-    FOREIGN KEY (team_b) REFERENCES teams(id)
-)
-""")
-
 # Sample Matches
 matches = [
     (1, 2, 3, 1, "2025-10-01", "Lafia City Stadium", "Group Stage"),
@@ -59,24 +42,12 @@ matches = [
 cursor.executemany("""
 INSERT INTO matches (team_a, team_b, score_a, score_b, date, venue, stage)
 VALUES (?, ?, ?, ?, ?, ?, ?)
-""", matches)
+""", [(team_id[a], team_id[b], *rest) for a, b, *rest in matches])
 
 
 # --------------------------
-# 3️⃣ Create Players Table
+# 3️⃣ Players
 # --------------------------
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS players (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    name TEXT NOT NULL,
-    team_id INTEGER,
-    goals INTEGER DEFAULT 0,
-    yellow_cards INTEGER DEFAULT 0,
-    red_cards INTEGER DEFAULT 0,
-    FOREIGN KEY (team_id) REFERENCES teams(id)
-)
-""")
-
 # Sample Players
 players = [
     ("John Musa", 1, 4, 1, 0),
@@ -92,20 +63,12 @@ players = [
 cursor.executemany("""
 INSERT INTO players (name, team_id, goals, yellow_cards, red_cards)
 VALUES (?, ?, ?, ?, ?)
-""", players)
+""", [(name, team_id[team], *rest) for name, team, *rest in players])
 
 
 # --------------------------
-# 4️⃣ Create Team Ratings Table
+# 4️⃣ Team Ratings
 # --------------------------
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS team_ratings (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    team_name TEXT,
-    points REAL,
-    year INTEGER
-)
-""")
 
 ratings = [
     ("Lafia Stars FC", 4.5, 2025),
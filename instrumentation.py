@@ -0,0 +1,320 @@
+"""Opt-in request instrumentation, a Prometheus ``/metrics`` endpoint and a
+sampling profiler for slow requests.
+
+Nothing here runs unless it is switched on, so the default request path is
+unchanged:
+
+* ``ULTIMATE_CUP_METRICS=1`` (or ``METRICS_ENABLED``) records per-route
+  latency histograms, SQL statement counts and time (through a timing
+  wrapper around the ``get_db()`` connection) and Jinja render time, and
+  serves them at ``/metrics`` in the Prometheus text format. Metrics are per
+  worker process; label scrapes by instance if you run several workers.
+* ``ULTIMATE_CUP_PROFILE_SLOW_MS=250`` (or ``PROFILE_SLOW_MS``) samples the
+  stack of every in-flight request every ``PROFILE_INTERVAL_MS`` and, for
+  requests slower than the threshold, writes the samples in collapsed-stack
+  format to ``PROFILE_DIR`` (load them in speedscope or flamegraph.pl).
+"""
+import bisect
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from flask import Response, before_render_template, g, request, template_rendered
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+DEFAULTS = {
+    "METRICS_ENABLED": os.environ.get("ULTIMATE_CUP_METRICS", "") not in ("", "0"),
+    "PROFILE_SLOW_MS": int(os.environ.get("ULTIMATE_CUP_PROFILE_SLOW_MS", 0)),
+    "PROFILE_INTERVAL_MS": 5,
+    "PROFILE_DIR": os.environ.get("ULTIMATE_CUP_PROFILE_DIR", "profiles"),
+}
+
+
+# ---------- Metrics ----------
+class Histogram:
+    def __init__(self, name, help_text, labels, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted(self._series.items())
+            items = [(labels, (list(counts), total, count)) for labels, (counts, total, count) in items]
+        for label_values, (counts, total, count) in items:
+            base = _labels(self.labels, label_values)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labels + ('le',), label_values + (le,))} {cumulative}")
+            lines.append(f"{self.name}_sum{base} {total:.6f}")
+            lines.append(f"{self.name}_count{base} {count}")
+        return lines
+
+
+class CounterMetric:
+    def __init__(self, name, help_text, labels):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self._values = Counter()
+        self._lock = threading.Lock()
+
+    def inc(self, amount, *label_values):
+        with self._lock:
+            self._values[label_values] += amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines.extend(f"{self.name}{_labels(self.labels, values)} {value}" for values, value in items)
+        return lines
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in values)
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(names, escaped)) + "}"
+
+
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "Request latency by route.", ("endpoint", "method", "status"))
+SQL_STATEMENTS = CounterMetric("db_statements_total", "SQL statements executed, by route.", ("endpoint",))
+SQL_TIME = Histogram("db_request_seconds", "Time spent in SQLite per request, by route.", ("endpoint",))
+SQL_PER_REQUEST = Histogram("db_statements_per_request", "SQL statements per request, by route.", ("endpoint",),
+                            buckets=(1, 2, 5, 10, 20, 50, 100, 500))
+TEMPLATE_RENDER = Histogram("template_render_seconds", "Jinja render time by template.", ("template",))
+
+METRICS = [REQUEST_LATENCY, SQL_STATEMENTS, SQL_TIME, SQL_PER_REQUEST, TEMPLATE_RENDER]
+_collectors = []
+
+
+def register_collector(collect):
+    """Add gauges computed at scrape time: ``collect()`` yields ``(name, help, value)``."""
+    _collectors.append(collect)
+
+
+def render_metrics():
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    for collect in _collectors:
+        for name, help_text, value in collect():
+            lines.extend((f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {value}"))
+    return "\n".join(lines) + "\n"
+
+
+# ---------- SQL timing ----------
+class _Timer:
+    __slots__ = ("statements", "seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+
+
+class TimedCursor:
+    """Cursor proxy that adds execute and fetch time to the request's total."""
+
+    def __init__(self, cursor, timer):
+        self._cursor = cursor
+        self._timer = timer
+
+    def _timed(self, method, *args):
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            self._timer.seconds += time.perf_counter() - start
+
+    def execute(self, *args):
+        self._timer.statements += 1
+        self._timed(self._cursor.execute, *args)
+        return self
+
+    def executemany(self, *args):
+        self._timer.statements += 1
+        self._timed(self._cursor.executemany, *args)
+        return self
+
+    def fetchone(self):
+        return self._timed(self._cursor.fetchone)
+
+    def fetchmany(self, *args):
+        return self._timed(self._cursor.fetchmany, *args)
+
+    def fetchall(self):
+        return self._timed(self._cursor.fetchall)
+
+    def __iter__(self):
+        # SQLite does most of a query's work while rows are stepped through
+        while True:
+            row = self._timed(self._cursor.fetchone)
+            if row is None:
+                return
+            yield row
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class TimedConnection:
+    """Connection proxy handed out by ``get_db()`` while metrics are on."""
+
+    def __init__(self, conn, timer):
+        self.raw = conn
+        self._timer = timer
+
+    def cursor(self, *args):
+        return TimedCursor(self.raw.cursor(*args), self._timer)
+
+    def execute(self, *args):
+        return self.cursor().execute(*args)
+
+    def executemany(self, *args):
+        return self.cursor().executemany(*args)
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+
+def wrap_connection(conn):
+    if "sql_timer" not in g:
+        g.sql_timer = _Timer()
+    return TimedConnection(conn, g.sql_timer)
+
+
+# ---------- Sampling profiler ----------
+class SamplingProfiler:
+    """One thread sampling the stacks of every request currently in flight."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._active = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def _ensure_thread(self):
+        if self._pid != os.getpid():  # threads don't survive a fork
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+            self._thread.start()
+
+    def begin(self):
+        samples = Counter()
+        with self._lock:
+            self._ensure_thread()
+            self._active[threading.get_ident()] = samples
+        return samples
+
+    def end(self):
+        with self._lock:
+            return self._active.pop(threading.get_ident(), Counter())
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                active = list(self._active.items())
+            if not active:
+                continue
+            frames = sys._current_frames()
+            for thread_id, samples in active:
+                frame = frames.get(thread_id)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                if stack:
+                    samples[";".join(reversed(stack))] += 1
+
+
+def dump_profile(directory, endpoint, duration, samples):
+    os.makedirs(directory, exist_ok=True)
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}-{endpoint or 'unknown'}-{duration * 1000:.0f}ms.folded"
+    path = os.path.join(directory, name.replace("/", "_"))
+    with open(path, "w") as f:
+        for stack, count in samples.most_common():
+            f.write(f"{stack} {count}\n")
+    return path
+
+
+# ---------- Wiring ----------
+def init_app(app):
+    for key, value in DEFAULTS.items():
+        app.config.setdefault(key, value)
+    metrics_on = app.config["METRICS_ENABLED"]
+    slow_ms = app.config["PROFILE_SLOW_MS"]
+    if not metrics_on and not slow_ms:
+        return
+
+    profiler = SamplingProfiler(app.config["PROFILE_INTERVAL_MS"] / 1000) if slow_ms else None
+    if metrics_on:
+        app.extensions["db_wrapper"] = wrap_connection
+
+    @app.before_request
+    def start_timing():
+        g.request_started = time.perf_counter()
+        if profiler:
+            g.profile_samples = profiler.begin()
+
+    @app.teardown_request
+    def record_request(exc=None):
+        started = g.pop("request_started", None)
+        if started is None:
+            return
+        duration = time.perf_counter() - started
+        endpoint = request.endpoint or "unmatched"
+        if metrics_on:
+            status = g.pop("response_status", 500 if exc else 200)
+            REQUEST_LATENCY.observe(duration, endpoint, request.method, str(status))
+            timer = g.get("sql_timer")
+            if timer is not None:
+                SQL_STATEMENTS.inc(timer.statements, endpoint)
+                SQL_TIME.observe(timer.seconds, endpoint)
+                SQL_PER_REQUEST.observe(timer.statements, endpoint)
+        if profiler:
+            samples = profiler.end()
+            if duration * 1000 >= slow_ms and samples:
+                dump_profile(app.config["PROFILE_DIR"], endpoint, duration, samples)
+
+    @app.after_request
+    def remember_status(response):
+        g.response_status = response.status_code
+        return response
+
+    if metrics_on:
+        def render_started(sender, template, context, **extra):
+            g.setdefault("render_started", []).append(time.perf_counter())
+
+        def render_finished(sender, template, context, **extra):
+            starts = g.get("render_started")
+            if starts:
+                TEMPLATE_RENDER.observe(time.perf_counter() - starts.pop(), template.name or "string")
+
+        before_render_template.connect(render_started, app, weak=False)
+        template_rendered.connect(render_finished, app, weak=False)
+
+        @app.route("/metrics")
+        def metrics():
+            return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
@@ -0,0 +1,225 @@
+"""Materialised season leaderboards: top scorers and team discipline.
+
+Two summary tables hold running totals per season and stage. Each season
+also has an all-stages row with ``stage = ''``:
+
+* ``season_scorers``: one row per (player, season, stage) with goals and
+  matches scored in, built from ``match_goals``;
+* ``season_discipline``: one row per (team, season, stage) with yellow and
+  red cards from the fixtures' card columns, plus fair-play card points
+  (yellow 1, red 3).
+
+Like ``team_standings`` (see standings.py), the tables are kept current by
+the fixture writes. Call ``apply_match(conn, match_id)`` once the fixture
+and its scorers are written. Call ``apply_match(conn, match_id, -1)``
+before either changes or is deleted, in the same transaction. Top-N reads
+walk a ``(year, stage, total DESC)`` index and stop after ``limit`` rows,
+so they never touch the goals history.
+
+Fixtures without a season are not counted.
+
+    python leaderboards.py rebuild [database]
+    python leaderboards.py check [database]
+"""
+import sqlite3
+import sys
+
+ALL_STAGES = ""
+FAIR_PLAY_RED = 3  # a red card weighs three yellows
+
+CREATE_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS season_scorers (
+        player_id INTEGER NOT NULL,
+        year INTEGER NOT NULL,
+        stage TEXT NOT NULL,
+        goals INTEGER NOT NULL DEFAULT 0,
+        matches INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (player_id, year, stage),
+        FOREIGN KEY (player_id) REFERENCES players(id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS season_discipline (
+        team_id INTEGER NOT NULL,
+        year INTEGER NOT NULL,
+        stage TEXT NOT NULL,
+        matches INTEGER NOT NULL DEFAULT 0,
+        yellow INTEGER NOT NULL DEFAULT 0,
+        red INTEGER NOT NULL DEFAULT 0,
+        card_points INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (team_id, year, stage),
+        FOREIGN KEY (team_id) REFERENCES teams(id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_season_scorers_top ON season_scorers (year, stage, goals DESC, matches, player_id)",
+    "CREATE INDEX IF NOT EXISTS idx_season_discipline_top "
+    "ON season_discipline (year, stage, card_points DESC, red DESC, team_id)",
+)
+
+
+def _scoped(per_match):
+    """Each row of ``per_match`` once under its stage and once under ALL_STAGES."""
+    return f"""
+        SELECT *, stage AS scope FROM ({per_match}) WHERE stage IS NOT NULL AND stage <> ''
+        UNION ALL
+        SELECT *, '{ALL_STAGES}' FROM ({per_match})
+    """
+
+
+def _scorer_rows(condition="1"):
+    return _scoped(f"""
+        SELECT mg.player_id, CAST(m.year AS INTEGER) AS year, m.stage,
+               SUM(COALESCE(mg.goals_scored, 1)) AS goals
+        FROM matches m
+        JOIN match_goals mg ON mg.match_id = m.id
+        WHERE m.year IS NOT NULL AND {condition}
+        GROUP BY m.id, mg.player_id
+    """)
+
+
+def _card_rows(condition="1"):
+    return _scoped(f"""
+        SELECT team_a AS team_id, CAST(year AS INTEGER) AS year, stage,
+               COALESCE(yellow_a, 0) AS yellow, COALESCE(red_a, 0) AS red
+        FROM matches m
+        WHERE year IS NOT NULL AND {condition}
+        UNION ALL
+        SELECT team_b, CAST(year AS INTEGER), stage, COALESCE(yellow_b, 0), COALESCE(red_b, 0)
+        FROM matches m
+        WHERE year IS NOT NULL AND {condition}
+    """)
+
+
+def _scorer_totals(condition="1", sign=":sign"):
+    return f"""
+        SELECT player_id, year, scope, {sign} * SUM(goals), {sign} * COUNT(*)
+        FROM ({_scorer_rows(condition)})
+        GROUP BY player_id, year, scope
+    """
+
+
+def _card_totals(condition="1", sign=":sign"):
+    return f"""
+        SELECT team_id, year, scope, {sign} * COUNT(*), {sign} * SUM(yellow), {sign} * SUM(red),
+               {sign} * SUM(yellow + {FAIR_PLAY_RED} * red)
+        FROM ({_card_rows(condition)})
+        GROUP BY team_id, year, scope
+    """
+
+
+def _apply(conn, condition, params, sign):
+    params = {"sign": sign, **params}
+    conn.execute(f"""
+        INSERT INTO season_scorers (player_id, year, stage, goals, matches)
+        {_scorer_totals(condition)}
+        ON CONFLICT (player_id, year, stage) DO UPDATE SET
+            goals = goals + excluded.goals,
+            matches = matches + excluded.matches
+    """, params)
+    conn.execute(f"""
+        INSERT INTO season_discipline (team_id, year, stage, matches, yellow, red, card_points)
+        {_card_totals(condition)}
+        ON CONFLICT (team_id, year, stage) DO UPDATE SET
+            matches = matches + excluded.matches,
+            yellow = yellow + excluded.yellow,
+            red = red + excluded.red,
+            card_points = card_points + excluded.card_points
+    """, params)
+    if sign < 0:
+        conn.execute("DELETE FROM season_scorers WHERE matches <= 0")
+        conn.execute("DELETE FROM season_discipline WHERE matches <= 0")
+
+
+def apply_match(conn, match_id, sign=1):
+    """Add (``sign=1``) or remove (``sign=-1``) one fixture's goals and cards."""
+    _apply(conn, "m.id = :match_id", {"match_id": match_id}, sign)
+
+
+def apply_match_range(conn, first_id, last_id, sign=1):
+    """Same as ``apply_match`` for every fixture with ``first_id <= id <= last_id``."""
+    _apply(conn, "m.id BETWEEN :first_id AND :last_id", {"first_id": first_id, "last_id": last_id}, sign)
+
+
+def rebuild(conn):
+    """Recompute both tables from ``matches`` and ``match_goals``; the caller commits."""
+    conn.execute("DELETE FROM season_scorers")
+    conn.execute("DELETE FROM season_discipline")
+    conn.execute(f"INSERT INTO season_scorers (player_id, year, stage, goals, matches) {_scorer_totals(sign='1')}")
+    conn.execute(f"""
+        INSERT INTO season_discipline (team_id, year, stage, matches, yellow, red, card_points)
+        {_card_totals(sign='1')}
+    """)
+
+
+def check(conn):
+    """Rows of either table that differ from a fresh aggregate: ``(table, key, expected, actual)``."""
+    mismatches = []
+    for table, totals in (("season_scorers", _scorer_totals(sign="1")),
+                          ("season_discipline", _card_totals(sign="1"))):
+        expected = {row[:3]: row[3:] for row in conn.execute(totals)}
+        actual = {row[:3]: row[3:] for row in conn.execute(f"SELECT * FROM {table}")}
+        mismatches.extend((table, key, expected.get(key), actual.get(key))
+                          for key in sorted(expected.keys() | actual.keys())
+                          if expected.get(key) != actual.get(key))
+    return mismatches
+
+
+# ---------- Reads ----------
+TOP_SCORERS_QUERY = """
+    SELECT p.id AS player_id, p.name AS player, t.name AS team, s.goals, s.matches
+    FROM season_scorers s
+    JOIN players p ON p.id = s.player_id
+    LEFT JOIN teams t ON t.id = p.team_id
+    WHERE s.year = ? AND s.stage = ?
+    ORDER BY s.goals DESC, s.matches, s.player_id
+    LIMIT ?
+"""
+
+DISCIPLINE_QUERY = """
+    SELECT t.id AS team_id, t.name AS team, d.matches, d.yellow, d.red, d.card_points
+    FROM season_discipline d
+    JOIN teams t ON t.id = d.team_id
+    WHERE d.year = ? AND d.stage = ?
+    ORDER BY d.card_points DESC, d.red DESC, d.team_id
+    LIMIT ?
+"""
+
+
+def seasons(conn):
+    return [row[0] for row in conn.execute(
+        "SELECT DISTINCT year FROM season_discipline ORDER BY year DESC")]
+
+
+def top_scorers(conn, year, stage=ALL_STAGES, limit=10):
+    return [dict(row) for row in conn.execute(TOP_SCORERS_QUERY, (year, stage or ALL_STAGES, limit))]
+
+
+def discipline(conn, year, stage=ALL_STAGES, limit=10):
+    """Teams with the most card points first."""
+    return [dict(row) for row in conn.execute(DISCIPLINE_QUERY, (year, stage or ALL_STAGES, limit))]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in ("rebuild", "check"):
+        sys.exit(__doc__)
+
+    from migrations import migrate
+
+    database = sys.argv[2] if len(sys.argv) > 2 else "ultimate_cup.db"
+    migrate(database)
+    conn = sqlite3.connect(database)
+
+    if sys.argv[1] == "rebuild":
+        rebuild(conn)
+        conn.commit()
+        count = conn.execute("SELECT COUNT(*) FROM season_scorers").fetchone()[0]
+        print(f"✅ Rebuilt {count} scorer rows.")
+    else:
+        mismatches = check(conn)
+        for table, key, expected, actual in mismatches:
+            print(f"❌ {table} {key}: expected {expected}, found {actual}")
+        if mismatches:
+            sys.exit(1)
+        print("✅ Leaderboards match the matches and match_goals tables.")
+    conn.close()
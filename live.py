@@ -0,0 +1,239 @@
+"""Live fixture updates pushed to the matches page over Server-Sent Events.
+
+Every admin write to a fixture appends a row to ``match_changes`` with
+``log_change()``, inside the write's own transaction. Each worker process
+runs one ``Broadcaster`` thread. It reads new rows from that change log (a
+primary-key range query once per ``POLL_INTERVAL``, or straight away after
+a local write calls ``notify()``), loads the changed fixtures in a single
+batch and fans the events out to every connected client. The database cost
+stays the same however many fans are watching.
+
+Event ids are change-log ids, so a reconnecting ``EventSource`` sends
+``Last-Event-ID`` and is replayed whatever it missed from the log.
+
+Every open stream holds a thread, so each worker caps how many it serves
+(``event_stream(limit=...)``). Pages that can't stream poll ``changes()``
+for the same events instead.
+"""
+import json
+import os
+import queue
+import threading
+import time
+
+KEEP_CHANGES = 1000
+POLL_INTERVAL = 1.0
+HEARTBEAT_SECONDS = 15
+SUBSCRIBER_BUFFER = 256
+
+CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS match_changes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        match_id INTEGER NOT NULL,
+        deleted INTEGER NOT NULL DEFAULT 0,
+        created_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER))
+    )
+"""
+
+
+def log_change(conn, match_id, deleted=False):
+    """Record that a fixture changed; call inside the write's transaction."""
+    cur = conn.execute("INSERT INTO match_changes (match_id, deleted) VALUES (?, ?)", (match_id, int(deleted)))
+    conn.execute("DELETE FROM match_changes WHERE id <= ?", (cur.lastrowid - KEEP_CHANGES,))
+
+
+def log_change_range(conn, first_id, last_id):
+    """Same as ``log_change`` for every fixture with ``first_id <= id <= last_id`` (bulk imports)."""
+    conn.execute("""
+        INSERT INTO match_changes (match_id, deleted)
+        SELECT id, 0 FROM matches WHERE id BETWEEN ? AND ? ORDER BY id
+    """, (first_id, last_id))
+    conn.execute("DELETE FROM match_changes WHERE id <= ?", (latest_change(conn) - KEEP_CHANGES,))
+
+
+def latest_change(conn):
+    return conn.execute("SELECT COALESCE(MAX(id), 0) FROM match_changes").fetchone()[0]
+
+
+class StreamLimit(Exception):
+    """The worker already serves its maximum number of live streams."""
+
+
+def changes(conn, load_matches, after, until=None):
+    """``(change_id, fixture)`` for each change after ``after`` (up to ``until``).
+
+    Deleted fixtures come back as ``{"id": ..., "deleted": True}``.
+    """
+    rows = conn.execute("""
+        SELECT id, match_id, deleted FROM match_changes
+        WHERE id > ? AND id <= COALESCE(?, id)
+        ORDER BY id
+    """, (after, until)).fetchall()
+    if not rows:
+        return []
+    # One batched load for every fixture still present
+    matches = {match["id"]: match for match in load_matches(
+        conn, sorted({row[1] for row in rows if not row[2]}))}
+    return [(row[0], matches.get(row[1]) or {"id": row[1], "deleted": True}) for row in rows]
+
+
+def format_event(event_id, payload):
+    return f"id: {event_id}\nevent: match\ndata: {json.dumps(payload)}\n\n"
+
+
+class Broadcaster:
+    """One polling thread per process fanning match changes out to subscribers.
+
+    ``get_pool`` returns the worker's ``db.ConnectionPool``;
+    ``load_matches(conn, ids)`` returns the current fixture dicts for ``ids``.
+    Subscriber callbacks run on the broadcaster thread and must not block.
+    """
+
+    def __init__(self, get_pool, load_matches, poll_interval=POLL_INTERVAL):
+        self.get_pool = get_pool
+        self.load_matches = load_matches
+        self.poll_interval = poll_interval
+        self._subscribers = {}
+        self._next_token = 0
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.last_id = None
+
+    def _events(self, conn, after, until=None):
+        return changes(conn, self.load_matches, after, until)
+
+    def replay(self, after):
+        """Events after change id ``after`` (for reconnecting clients)."""
+        pool = self.get_pool()
+        conn = pool.acquire()
+        try:
+            return self._events(conn, after, self.last_id)
+        finally:
+            pool.release(conn)
+
+    def _poll(self):
+        pool = self.get_pool()
+        conn = pool.acquire()
+        try:
+            if self.last_id is None:
+                self.last_id = latest_change(conn)
+                return []
+            events = self._events(conn, self.last_id)
+        finally:
+            pool.release(conn)
+        if events:
+            self.last_id = events[-1][0]
+        return events
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            try:
+                events = self._poll()
+            except Exception as e:  # keep broadcasting after a transient DB error
+                print(f"❌ live broadcaster: {e!r}")
+                time.sleep(self.poll_interval)
+                continue
+            with self._lock:
+                subscribers = list(self._subscribers.values())
+            for event in events:
+                for callback in subscribers:
+                    callback(event)
+
+    def start(self):
+        # A thread does not survive fork, so each worker process starts its own
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self.last_id = None
+                self._poll()
+                self._thread = threading.Thread(target=self._run, name="live-broadcaster", daemon=True)
+                self._thread.start()
+
+    def subscribe(self, callback, limit=None):
+        """Register ``callback(event)``; returns ``(token, last_id)``.
+
+        Events after ``last_id`` are delivered to the callback; anything up
+        to it can be fetched with ``replay``. Raises ``StreamLimit`` when
+        ``limit`` subscribers are already registered.
+        """
+        self.start()
+        with self._lock:
+            if limit is not None and len(self._subscribers) >= limit:
+                raise StreamLimit()
+            self._next_token += 1
+            self._subscribers[self._next_token] = callback
+            return self._next_token, self.last_id
+
+    def unsubscribe(self, token):
+        with self._lock:
+            self._subscribers.pop(token, None)
+
+    def notify(self):
+        """Poll now instead of waiting for the next interval (after a local write)."""
+        self._wake.set()
+
+    def stats(self):
+        with self._lock:
+            return {"subscribers": len(self._subscribers), "last_id": self.last_id}
+
+
+class _EventStream:
+    """Response body that unsubscribes on ``close()``, even if it was never iterated."""
+
+    def __init__(self, body, unsubscribe):
+        self.body = body
+        self.unsubscribe = unsubscribe
+
+    def __iter__(self):
+        return self.body
+
+    def close(self):
+        self.body.close()
+        self.unsubscribe()
+
+
+def event_stream(broadcaster, since, max_seconds=None, limit=None):
+    """SSE body for a blocking (WSGI) worker: replay, then live events.
+
+    ``max_seconds`` ends the stream so a thread is not held forever; the
+    browser's ``EventSource`` reconnects with ``Last-Event-ID``. Subscribes
+    straight away, so ``StreamLimit`` is raised here rather than mid-response.
+    """
+    events = queue.Queue(SUBSCRIBER_BUFFER)
+    overflowed = threading.Event()
+
+    def deliver(event):
+        try:
+            events.put_nowait(event)
+        except queue.Full:
+            overflowed.set()
+
+    token, last_id = broadcaster.subscribe(deliver, limit)
+    body = _event_body(broadcaster, since, last_id, events, overflowed, max_seconds)
+    return _EventStream(body, lambda: broadcaster.unsubscribe(token))
+
+
+def _event_body(broadcaster, since, last_id, events, overflowed, max_seconds):
+    deadline = time.monotonic() + max_seconds if max_seconds else None
+    yield f"retry: {int(POLL_INTERVAL * 2000)}\n\n"
+    sent = since
+    if since is not None and since < last_id:
+        for event_id, payload in broadcaster.replay(since):
+            yield format_event(event_id, payload)
+            sent = event_id
+    while deadline is None or time.monotonic() < deadline:
+        if overflowed.is_set():
+            return  # too far behind: reconnect and catch up from the log
+        wait = HEARTBEAT_SECONDS if deadline is None else min(HEARTBEAT_SECONDS, max(deadline - time.monotonic(), 0.01))
+        try:
+            event_id, payload = events.get(timeout=wait)
+        except queue.Empty:
+            yield ": keepalive\n\n"
+            continue
+        if sent is None or event_id > sent:
+            yield format_event(event_id, payload)
+            sent = event_id
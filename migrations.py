@@ -0,0 +1,436 @@
+"""Versioned schema migrations for ultimate_cup.db.
+
+The database's ``PRAGMA user_version`` records the last step applied, and
+``migrate()`` runs every later step in order, each inside its own
+``BEGIN IMMEDIATE`` transaction so two workers starting at once cannot both
+apply it. A step may list hot queries whose ``EXPLAIN QUERY PLAN`` must
+touch the named tables through an index; ``check_query_plans()`` asserts them.
+
+    python migrations.py [database] [--check]
+"""
+import sqlite3
+import sys
+
+import charts
+import leaderboards
+import live
+import standings
+
+DATABASE = "ultimate_cup.db"
+
+
+def _columns(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _add_columns(conn, table, columns):
+    existing = _columns(conn, table)
+    for name, definition in columns:
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+
+
+# ---------- 1: baseline ----------
+# Reconciles the tables created by the old init_*.py / update_db.py scripts,
+# which each left a slightly different set of columns behind.
+def baseline(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS teams (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            group_name TEXT
+        )
+    """)
+    _add_columns(conn, "teams", [
+        ("group_name", "TEXT"),
+        ("badge_path", "TEXT"),
+        ("coach", "TEXT"),
+        ("badge", "TEXT"),
+        ("year_established", "INTEGER"),
+    ])
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS matches (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            team_a INTEGER,
+            team_b INTEGER,
+            score_a INTEGER,
+            score_b INTEGER,
+            date TEXT,
+            venue TEXT,
+            stage TEXT,
+            FOREIGN KEY (team_a) REFERENCES teams(id),
+            FOREIGN KEY (team_b) REFERENCES teams(id)
+        )
+    """)
+    _add_columns(conn, "matches", [
+        ("stage", "TEXT"),
+        ("year", "TEXT"),
+        ("yellow_a", "INTEGER DEFAULT 0"),
+        ("yellow_b", "INTEGER DEFAULT 0"),
+        ("red_a", "INTEGER DEFAULT 0"),
+        ("red_b", "INTEGER DEFAULT 0"),
+        ("goals_a", "INTEGER DEFAULT 0"),
+        ("goals_b", "INTEGER DEFAULT 0"),
+    ])
+    # Fixtures seeded before the year column existed
+    conn.execute("UPDATE matches SET year = substr(date, 1, 4) WHERE year IS NULL AND date IS NOT NULL")
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS players (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            team_id INTEGER,
+            goals INTEGER DEFAULT 0,
+            yellow_cards INTEGER DEFAULT 0,
+            red_cards INTEGER DEFAULT 0,
+            FOREIGN KEY (team_id) REFERENCES teams(id)
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS match_goals (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            match_id INTEGER NOT NULL,
+            player_id INTEGER NOT NULL,
+            goals_scored INTEGER DEFAULT 1,
+            FOREIGN KEY (match_id) REFERENCES matches(id),
+            FOREIGN KEY (player_id) REFERENCES players(id)
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS goals (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            match_id INTEGER,
+            player_id INTEGER,
+            goals INTEGER DEFAULT 1,
+            FOREIGN KEY (match_id) REFERENCES matches(id),
+            FOREIGN KEY (player_id) REFERENCES players(id)
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS team_ratings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            team_name TEXT,
+            year INTEGER,
+            points REAL
+        )
+    """)
+
+
+# ---------- 2: indexes for the hot read paths ----------
+HOT_PATH_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_matches_date ON matches (date)",
+    "CREATE INDEX IF NOT EXISTS idx_matches_year_date ON matches (year, date)",
+    "CREATE INDEX IF NOT EXISTS idx_matches_year_stage_date ON matches (year, stage, date)",
+    "CREATE INDEX IF NOT EXISTS idx_matches_team_a ON matches (team_a)",
+    "CREATE INDEX IF NOT EXISTS idx_matches_team_b ON matches (team_b)",
+    "CREATE INDEX IF NOT EXISTS idx_match_goals_match ON match_goals (match_id, player_id, goals_scored)",
+    "CREATE INDEX IF NOT EXISTS idx_players_team ON players (team_id, name)",
+    "CREATE INDEX IF NOT EXISTS idx_teams_name ON teams (name)",
+    "CREATE INDEX IF NOT EXISTS idx_team_ratings_team_year ON team_ratings (team_name, year)",
+    "CREATE INDEX IF NOT EXISTS idx_team_ratings_year_points ON team_ratings (year, points)",
+]
+
+
+def hot_path_indexes(conn):
+    # executescript() would COMMIT the migration's transaction, so run one by one
+    for statement in HOT_PATH_INDEXES:
+        conn.execute(statement)
+
+
+# Each hot query names the tables (by alias, as they appear in the plan) that
+# must be reached through an index rather than a full scan.
+HOT_QUERIES = [
+    ("matches by year and stage, newest first", """
+        SELECT m.id FROM matches m
+        JOIN teams t1 ON m.team_a = t1.id
+        JOIN teams t2 ON m.team_b = t2.id
+        WHERE m.year = ? AND m.stage = ? ORDER BY m.date DESC
+    """, ("m", "t1", "t2")),
+    ("matches by year, newest first", """
+        SELECT m.id FROM matches m WHERE m.year = ? ORDER BY m.date DESC
+    """, ("m",)),
+    ("scorers of one match", """
+        SELECT p.name, mg.goals_scored, p.team_id
+        FROM match_goals mg JOIN players p ON mg.player_id = p.id
+        WHERE mg.match_id = ?
+    """, ("mg", "p")),
+    ("scorers of a season's matches", """
+        SELECT mg.match_id, p.name, mg.goals_scored, p.team_id
+        FROM match_goals mg
+        JOIN players p ON mg.player_id = p.id
+        JOIN matches m ON mg.match_id = m.id
+        WHERE m.year = ?
+    """, ("m", "mg", "p")),
+    ("players of a team", "SELECT id, name FROM players WHERE team_id = ?", ("players",)),
+    ("team by name", "SELECT id FROM teams WHERE name = ?", ("teams",)),
+    ("rating for team and year", "SELECT id FROM team_ratings WHERE team_name = ? AND year = ?", ("team_ratings",)),
+    ("ratings of a year", """
+        SELECT r.team_name, r.points, t.badge
+        FROM team_ratings r LEFT JOIN teams t ON r.team_name = t.name
+        WHERE r.year = ? ORDER BY r.points DESC
+    """, ("r", "t")),
+    ("matches of a team", "SELECT id FROM matches WHERE team_a = ? OR team_b = ?", ("matches",)),
+]
+
+
+# ---------- 3: materialised team standings ----------
+def team_standings(conn):
+    conn.execute(standings.CREATE_TABLE)
+    standings.rebuild(conn)
+
+
+STANDINGS_QUERIES = [
+    ("all-season record of a team", """
+        SELECT SUM(wins), SUM(draws), SUM(losses) FROM team_standings WHERE team_id = ?
+    """, ("team_standings",)),
+    ("record of a team in one season", """
+        SELECT wins, draws, losses FROM team_standings WHERE team_id = ? AND year = ?
+    """, ("team_standings",)),
+]
+
+
+# ---------- 4: data version counters (see cache.py) ----------
+VERSIONED_TABLES = ("teams", "players", "matches", "match_goals", "team_ratings")
+
+
+def data_versions(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS data_versions (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    for table in VERSIONED_TABLES:
+        conn.execute("INSERT OR IGNORE INTO data_versions (table_name, version) VALUES (?, 0)", (table,))
+
+
+
+# ---------- 5: last-modified time for each data version ----------
+def data_versions_updated_at(conn):
+    _add_columns(conn, "data_versions", [("updated_at", "INTEGER NOT NULL DEFAULT 0")])
+    conn.execute("UPDATE data_versions SET updated_at = CAST(strftime('%s', 'now') AS INTEGER)")
+
+
+
+# ---------- 6: keyset pagination of fixtures ----------
+def fixture_pagination_indexes(conn):
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_matches_stage_date ON matches (stage, date)")
+
+
+PAGINATION_QUERIES = [
+    ("next page of all fixtures", """
+        SELECT m.id FROM matches m
+        WHERE (m.date, m.id) < (?, ?) ORDER BY m.date DESC, m.id DESC LIMIT ?
+    """, ("m",)),
+    ("next page of a season", """
+        SELECT m.id FROM matches m
+        WHERE m.year = ? AND (m.date, m.id) < (?, ?) ORDER BY m.date DESC, m.id DESC LIMIT ?
+    """, ("m",)),
+    ("first page of a stage", """
+        SELECT m.id FROM matches m
+        WHERE m.stage = ? ORDER BY m.date DESC, m.id DESC LIMIT ?
+    """, ("m",)),
+    ("scorers of a page", """
+        SELECT mg.match_id, p.name, mg.goals_scored, p.team_id
+        FROM match_goals mg JOIN players p ON mg.player_id = p.id
+        WHERE mg.match_id IN (?, ?, ?)
+    """, ("mg", "p")),
+]
+
+
+# ---------- 7: pre-rendered ratings charts (see charts.py) ----------
+def rating_charts(conn):
+    conn.execute(charts.CREATE_TABLE)
+    charts.rebuild(conn)
+
+
+CHART_QUERIES = [
+    ("chart of a season", "SELECT svg FROM rating_charts WHERE year = ?", ("rating_charts",)),
+    ("ratings of a season for its chart", charts.RATINGS_QUERY, ("team_ratings",)),
+]
+
+
+# ---------- 8: fixture change log for live scores (see live.py) ----------
+def match_changes(conn):
+    conn.execute(live.CREATE_TABLE)
+
+
+LIVE_QUERIES = [
+    ("fixture changes since an event id", """
+        SELECT id, match_id, deleted FROM match_changes WHERE id > ? AND id <= COALESCE(?, id) ORDER BY id
+    """, ("match_changes",)),
+]
+
+
+# ---------- 9: admin table search (see admin_tables.py) ----------
+def admin_search_indexes(conn):
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_teams_name_nocase ON teams (name COLLATE NOCASE, id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_players_name_nocase ON players (name COLLATE NOCASE, id)")
+
+
+ADMIN_QUERIES = [
+    ("admin teams by name prefix", """
+        SELECT id, name FROM teams
+        WHERE name >= ? COLLATE NOCASE AND name < ? COLLATE NOCASE AND (name COLLATE NOCASE, id) > (?, ?)
+        ORDER BY name COLLATE NOCASE, id LIMIT ?
+    """, ("teams",)),
+    ("admin players page", """
+        SELECT p.id, p.name, t.name FROM players p LEFT JOIN teams t ON p.team_id = t.id
+        WHERE (p.name COLLATE NOCASE, p.id) > (?, ?) ORDER BY p.name COLLATE NOCASE, p.id LIMIT ?
+    """, ("p", "t")),
+    ("admin players by name prefix", """
+        SELECT p.id FROM players p
+        WHERE p.name >= ? COLLATE NOCASE AND p.name < ? COLLATE NOCASE ORDER BY p.name COLLATE NOCASE, p.id LIMIT ?
+    """, ("p",)),
+    ("admin matches by team name prefix", """
+        SELECT m.id FROM matches m
+        WHERE (m.team_a IN (SELECT id FROM teams WHERE name >= ? COLLATE NOCASE AND name < ? COLLATE NOCASE)
+            OR m.team_b IN (SELECT id FROM teams WHERE name >= ? COLLATE NOCASE AND name < ? COLLATE NOCASE))
+        ORDER BY m.date DESC, m.id DESC LIMIT ?
+    """, ("m", "teams")),
+]
+
+
+# ---------- 10: season leaderboards (see leaderboards.py) ----------
+def season_leaderboards(conn):
+    for statement in leaderboards.CREATE_TABLES:
+        conn.execute(statement)
+    leaderboards.rebuild(conn)
+
+
+LEADERBOARD_QUERIES = [
+    ("top scorers of a season or stage", leaderboards.TOP_SCORERS_QUERY, ("s", "p", "t")),
+    ("most-carded teams of a season or stage", leaderboards.DISCIPLINE_QUERY, ("d", "t")),
+    ("a fixture's scorers for a leaderboard update", """
+        SELECT mg.player_id, SUM(mg.goals_scored) FROM matches m JOIN match_goals mg ON mg.match_id = m.id
+        WHERE m.id = ? GROUP BY m.id, mg.player_id
+    """, ("m", "mg")),
+]
+
+
+# ---------- 11: player goal totals kept with match_goals (see admin_writes.py) ----------
+def player_goal_totals(conn):
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_match_goals_player ON match_goals (player_id, goals_scored)")
+    # Fixture saves used to add scorers without touching players.goals; lift
+    # every total to at least the goals recorded against fixtures
+    conn.execute("""
+        UPDATE players SET goals = s.goals
+        FROM (
+            SELECT player_id, SUM(COALESCE(goals_scored, 1)) AS goals FROM match_goals GROUP BY player_id
+        ) AS s
+        WHERE players.id = s.player_id AND COALESCE(players.goals, 0) < s.goals
+    """)
+
+
+PLAYER_GOAL_QUERIES = [
+    ("a player's goals recorded in fixtures",
+     "SELECT COALESCE(SUM(COALESCE(goals_scored, 1)), 0) FROM match_goals WHERE player_id = ?", ("match_goals",)),
+    ("a fixture's scorers for crediting their totals", """
+        SELECT mg.player_id, SUM(COALESCE(mg.goals_scored, 1)) FROM match_goals mg
+        WHERE mg.match_id = ? GROUP BY mg.player_id
+    """, ("mg",)),
+]
+
+
+# ---------- 12: unique team names ----------
+# Ratings, ?team= links and the season analytics all find a team by name, so
+# two teams with one name overwrote each other. Later duplicates are renamed
+# "Name (id)"; the ratings stay with the first.
+def unique_team_names(conn):
+    renamed = conn.execute("""
+        UPDATE teams SET name = name || ' (' || id || ')'
+        WHERE id != (SELECT MIN(id) FROM teams first WHERE first.name = teams.name)
+    """).rowcount
+    conn.execute("DROP INDEX IF EXISTS idx_teams_name")
+    conn.execute("CREATE UNIQUE INDEX idx_teams_name ON teams (name)")
+    if renamed:
+        conn.execute("""
+            INSERT INTO data_versions (table_name, version, updated_at)
+            VALUES ('teams', 1, CAST(strftime('%s', 'now') AS INTEGER))
+            ON CONFLICT (table_name) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at
+        """)
+
+
+# (version, description, step, hot queries the step is responsible for)
+MIGRATIONS = [
+    (1, "baseline schema", baseline, []),
+    (2, "hot path indexes", hot_path_indexes, HOT_QUERIES),
+    (3, "team standings", team_standings, STANDINGS_QUERIES),
+    (4, "data versions", data_versions, []),
+    (5, "data version timestamps", data_versions_updated_at, []),
+    (6, "fixture pagination indexes", fixture_pagination_indexes, PAGINATION_QUERIES),
+    (7, "ratings charts", rating_charts, CHART_QUERIES),
+    (8, "fixture change log", match_changes, LIVE_QUERIES),
+    (9, "admin search indexes", admin_search_indexes, ADMIN_QUERIES),
+    (10, "season leaderboards", season_leaderboards, LEADERBOARD_QUERIES),
+    (11, "player goal totals", player_goal_totals, PLAYER_GOAL_QUERIES),
+    (12, "unique team names", unique_team_names, []),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(database=DATABASE, target=None):
+    """Bring ``database`` up to ``target`` (default SCHEMA_VERSION) and return the versions applied."""
+    conn = sqlite3.connect(database, isolation_level=None)
+    applied = []
+    try:
+        for version, description, step, _ in MIGRATIONS:
+            if schema_version(conn) >= version or (target is not None and version > target):
+                continue
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Another worker may have got here first
+                if schema_version(conn) < version:
+                    step(conn)
+                    conn.execute(f"PRAGMA user_version = {version}")
+                    applied.append(version)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+    finally:
+        conn.close()
+    return applied
+
+
+def unindexed_tables(conn, sql, tables):
+    """Tables from ``tables`` that the query plan reaches with a full table scan."""
+    params = (None,) * sql.count("?")
+    plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+    return [table for table in tables
+            if any((detail == f"SCAN {table}" or detail.startswith(f"SCAN {table} "))
+                   and "INDEX" not in detail
+                   for detail in plan)]
+
+
+def check_query_plans(conn):
+    """Assert every applied step's hot queries avoid full table scans."""
+    version = schema_version(conn)
+    for step_version, description, _, queries in MIGRATIONS:
+        if step_version > version:
+            continue
+        for name, sql, tables in queries:
+            scanned = unindexed_tables(conn, sql, tables)
+            assert not scanned, f"migration {step_version} ({description}): '{name}' full-scans {', '.join(scanned)}"
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    database = args[0] if args else DATABASE
+    applied = migrate(database)
+    print(f"✅ {database} is at schema version {SCHEMA_VERSION}"
+          + (f" (applied {', '.join(map(str, applied))})" if applied else ""))
+    if "--check" in sys.argv:
+        conn = sqlite3.connect(database)
+        check_query_plans(conn)
+        conn.close()
+        print("✅ Hot queries use indexes")
@@ -0,0 +1,145 @@
+"""Materialised team standings, one row per (team, season).
+
+``team_standings`` is kept in step with ``matches`` by the admin routes: a
+fixture's result is added with ``apply_match(conn, match_id)`` after it is
+written and taken back out with ``apply_match(conn, match_id, -1)`` before
+it changes or is deleted, inside the same transaction as the write.
+Fixtures without a season (``year IS NULL``) or without a score are not
+counted.
+
+    python standings.py rebuild [database]
+    python standings.py check [database]
+"""
+import sqlite3
+import sys
+
+
+def _sides(condition="1"):
+    """Every fixture matching ``condition`` seen from both sides: one row per (team, match).
+
+    The condition goes inside each branch so SQLite can use the primary key
+    instead of materialising the whole union.
+    """
+    return f"""
+        SELECT id AS match_id, team_a AS team_id, CAST(year AS INTEGER) AS year,
+               score_a AS gf, score_b AS ga
+        FROM matches
+        WHERE year IS NOT NULL AND score_a IS NOT NULL AND score_b IS NOT NULL AND {condition}
+        UNION ALL
+        SELECT id, team_b, CAST(year AS INTEGER), score_b, score_a
+        FROM matches
+        WHERE year IS NOT NULL AND score_a IS NOT NULL AND score_b IS NOT NULL AND {condition}
+    """
+
+
+_AGGREGATE = f"""
+    SELECT team_id, year,
+           COUNT(*) AS played,
+           SUM(gf > ga) AS wins,
+           SUM(gf = ga) AS draws,
+           SUM(gf < ga) AS losses,
+           SUM(gf) AS goals_for,
+           SUM(ga) AS goals_against,
+           SUM(CASE WHEN gf > ga THEN 3 WHEN gf = ga THEN 1 ELSE 0 END) AS points
+    FROM ({_sides()})
+    GROUP BY team_id, year
+"""
+
+COLUMNS = ("played", "wins", "draws", "losses", "goals_for", "goals_against", "points")
+
+CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS team_standings (
+        team_id INTEGER NOT NULL,
+        year INTEGER NOT NULL,
+        played INTEGER NOT NULL DEFAULT 0,
+        wins INTEGER NOT NULL DEFAULT 0,
+        draws INTEGER NOT NULL DEFAULT 0,
+        losses INTEGER NOT NULL DEFAULT 0,
+        goals_for INTEGER NOT NULL DEFAULT 0,
+        goals_against INTEGER NOT NULL DEFAULT 0,
+        points INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (team_id, year),
+        FOREIGN KEY (team_id) REFERENCES teams(id)
+    )
+"""
+
+
+def _apply(conn, condition, params, sign):
+    conn.execute(f"""
+        INSERT INTO team_standings (team_id, year, {", ".join(COLUMNS)})
+        SELECT team_id, year,
+               :sign * COUNT(*),
+               :sign * SUM(gf > ga),
+               :sign * SUM(gf = ga),
+               :sign * SUM(gf < ga),
+               :sign * SUM(gf),
+               :sign * SUM(ga),
+               :sign * SUM(CASE WHEN gf > ga THEN 3 WHEN gf = ga THEN 1 ELSE 0 END)
+        FROM ({_sides(condition)})
+        GROUP BY team_id, year
+        ON CONFLICT (team_id, year) DO UPDATE SET
+            {", ".join(f"{column} = {column} + excluded.{column}" for column in COLUMNS)}
+    """, {"sign": sign, **params})
+    if sign < 0:
+        conn.execute("DELETE FROM team_standings WHERE played <= 0")
+
+
+def apply_match(conn, match_id, sign=1):
+    """Add (``sign=1``) or remove (``sign=-1``) one fixture's result.
+
+    The match is read and the standings upserted in a single statement, so
+    the change is atomic with whatever else the caller's transaction does.
+    """
+    _apply(conn, "id = :match_id", {"match_id": match_id}, sign)
+
+
+def apply_match_range(conn, first_id, last_id, sign=1):
+    """Same as ``apply_match`` for every fixture with ``first_id <= id <= last_id``."""
+    _apply(conn, "id BETWEEN :first_id AND :last_id", {"first_id": first_id, "last_id": last_id}, sign)
+
+
+def rebuild(conn):
+    """Recompute every row from ``matches``; the caller commits."""
+    conn.execute("DELETE FROM team_standings")
+    conn.execute(f"INSERT INTO team_standings (team_id, year, {', '.join(COLUMNS)}) {_AGGREGATE}")
+
+
+def check(conn):
+    """Compare ``team_standings`` with ``matches``.
+
+    Returns ``(team_id, year, expected, actual)`` for every row that differs,
+    where ``expected``/``actual`` are column dicts or ``None`` when missing.
+    """
+    def rows(sql):
+        return {(row[0], row[1]): dict(zip(COLUMNS, row[2:])) for row in conn.execute(sql)}
+
+    expected = rows(_AGGREGATE)
+    actual = rows(f"SELECT team_id, year, {', '.join(COLUMNS)} FROM team_standings")
+    return [(team_id, year, expected.get((team_id, year)), actual.get((team_id, year)))
+            for team_id, year in sorted(expected.keys() | actual.keys())
+            if expected.get((team_id, year)) != actual.get((team_id, year))]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in ("rebuild", "check"):
+        sys.exit(__doc__)
+
+    from migrations import migrate
+
+    database = sys.argv[2] if len(sys.argv) > 2 else "ultimate_cup.db"
+    migrate(database)
+    conn = sqlite3.connect(database)
+
+    if sys.argv[1] == "rebuild":
+        rebuild(conn)
+        conn.commit()
+        count = conn.execute("SELECT COUNT(*) FROM team_standings").fetchone()[0]
+        print(f"✅ Rebuilt {count} standings rows.")
+    else:
+        mismatches = check(conn)
+        for team_id, year, expected, actual in mismatches:
+            print(f"❌ team {team_id}, {year}: expected {expected}, found {actual}")
+        if mismatches:
+            sys.exit(1)
+        print("✅ team_standings matches the matches table.")
+    conn.close()
@@ -0,0 +1,53 @@
+"""Shared fixtures: a small synthetic tournament in a temporary database,
+and the app pointed at it with every per-process cache emptied."""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, "benchmarks")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from synthetic import generate  # noqa: E402
+
+YEAR = 2025
+
+
+@pytest.fixture
+def database(tmp_path):
+    """Path of a migrated database holding two seasons (2024, 2025) of fixtures."""
+    path = str(tmp_path / "ultimate_cup.db")
+    generate(path, seasons=2, teams=8, players=6, start_year=YEAR - 1)
+    return path
+
+
+@pytest.fixture
+def app(database):
+    import app as app_module
+    import db
+
+    flask_app = app_module.app
+    saved = {key: flask_app.config[key] for key in ("DATABASE", "DB_READ_MODE", "DB_SNAPSHOT_SECONDS")}
+    db.close_pool(flask_app)
+    flask_app.config.update(DATABASE=database, TESTING=True)
+    app_module.response_cache.clear()
+    app_module.analytics_cache.clear()
+    yield flask_app
+    db.close_pool(flask_app)
+    flask_app.config.update(saved)
+    app_module.response_cache.clear()
+    app_module.analytics_cache.clear()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_client(client):
+    with client.session_transaction() as session:
+        session["logged_in"] = True
+    return client
@@ -0,0 +1,150 @@
+"""Each admin action is one transaction: one commit, rolled back whole on
+error, and one log sync per action at ``synchronous = FULL`` (user-023)."""
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+import admin_writes
+from common import build_sync_counter, preload_env
+from conftest import ROOT, YEAR
+
+
+@pytest.fixture
+def conn(database):
+    conn = sqlite3.connect(database, isolation_level=None)
+    conn.execute("PRAGMA journal_mode = WAL")
+    yield conn
+    conn.close()
+
+
+def scorer(conn):
+    """A player with recorded goals, their team, and an opponent."""
+    player_id, team_id, goals = conn.execute("""
+        SELECT p.id, p.team_id, p.goals FROM players p
+        WHERE EXISTS (SELECT 1 FROM match_goals WHERE player_id = p.id) LIMIT 1
+    """).fetchone()
+    opponent = conn.execute("SELECT id FROM teams WHERE id != ? LIMIT 1", (team_id,)).fetchone()[0]
+    return player_id, team_id, opponent, goals
+
+
+def actions(conn):
+    player_id, team_id, opponent, goals = scorer(conn)
+    match = {"team_a": team_id, "team_b": opponent, "score_a": 2, "score_b": 0,
+             "date": f"{YEAR}-09-01", "stage": "Group", "year": str(YEAR)}
+    return {
+        "save_team_rating": lambda: admin_writes.save_team_rating(conn, "Newcomers", YEAR, 10.0),
+        "add_player": lambda: admin_writes.add_player(conn, "New Player", team_id),
+        "update_player": lambda: admin_writes.update_player(conn, player_id, goals + 1, 0, 0),
+        "add_match": lambda: admin_writes.add_match(conn, match, [(player_id, 2)]),
+        "delete_match": lambda: admin_writes.delete_match(
+            conn, conn.execute("SELECT MAX(id) FROM matches").fetchone()[0]),
+    }
+
+
+@pytest.mark.parametrize("name", ["save_team_rating", "add_player", "update_player", "add_match", "delete_match"])
+def test_each_action_commits_once(conn, name):
+    action = actions(conn)[name]
+    log = []
+    conn.set_trace_callback(log.append)
+    action()
+    conn.set_trace_callback(None)
+    assert [s.split()[0].upper() for s in log if s.split()[0].upper() in ("BEGIN", "COMMIT", "ROLLBACK")] \
+        == ["BEGIN", "COMMIT"]
+
+
+def test_refused_edit_changes_nothing(conn):
+    player_id, _, _, goals = scorer(conn)
+    changes = conn.total_changes
+    with pytest.raises(admin_writes.WriteError):
+        admin_writes.update_player(conn, player_id, 0, 5, 5)
+    assert not conn.in_transaction
+    assert conn.execute("SELECT goals, yellow_cards, red_cards FROM players WHERE id = ?",
+                        (player_id,)).fetchone()[0] == goals
+    assert conn.total_changes == changes
+
+
+def test_failed_fixture_is_rolled_back_whole(conn):
+    player_id, team_id, opponent, goals = scorer(conn)
+    before = conn.execute("SELECT COUNT(*), (SELECT COUNT(*) FROM match_goals) FROM matches").fetchone()
+    match = {"team_a": team_id, "team_b": opponent, "score_a": 1, "score_b": 0, "year": str(YEAR)}
+    with pytest.raises(ValueError):
+        admin_writes.add_match(conn, match, [(player_id, 1), (player_id, 1, "too many values")])
+    assert conn.execute("SELECT COUNT(*), (SELECT COUNT(*) FROM match_goals) FROM matches").fetchone() == before
+    assert conn.execute("SELECT goals FROM players WHERE id = ?", (player_id,)).fetchone()[0] == goals
+
+
+SYNCS = """
+import sqlite3, sys
+import admin_writes
+from common import sync_count
+
+conn = sqlite3.connect(sys.argv[1], isolation_level=None)
+conn.execute("PRAGMA journal_mode = WAL")
+conn.execute("PRAGMA wal_autocheckpoint = 0")
+player_id, = conn.execute("SELECT id FROM players LIMIT 1").fetchone()
+admin_writes.update_player(conn, player_id, 999, 0, 0)  # the first write syncs the new log's header
+for synchronous in ("FULL", "NORMAL"):
+    conn.execute(f"PRAGMA synchronous = {synchronous}")
+    before = sync_count()
+    for goals in range(1000, 1010):
+        admin_writes.update_player(conn, player_id, goals, 0, 0)
+    print(sync_count() - before)
+"""
+
+
+def test_full_syncs_once_per_action_and_normal_not_at_all(database, tmp_path):
+    library = build_sync_counter(str(tmp_path))
+    if library is None:
+        pytest.skip("no C compiler to build the sync counter")
+    env = preload_env(library)
+    env["PYTHONPATH"] = os.pathsep.join([ROOT, os.path.join(ROOT, "benchmarks")])
+    result = subprocess.run([sys.executable, "-c", SYNCS, database], env=env, cwd=str(tmp_path),
+                            capture_output=True, text=True, check=True)
+    full, normal = (int(line) for line in result.stdout.split())
+    assert full == 10
+    assert normal == 0
+
+
+def test_renaming_onto_another_team_is_refused(conn):
+    (first, _), (_, taken) = conn.execute("SELECT id, name FROM teams ORDER BY id LIMIT 2").fetchall()
+    with pytest.raises(admin_writes.WriteError):
+        admin_writes.update_team(conn, first, taken, None, None, None)
+    assert conn.execute("SELECT COUNT(*) FROM teams WHERE name = ?", (taken,)).fetchone()[0] == 1
+
+
+def test_rename_takes_the_rating_history_along(conn):
+    team_id, name = conn.execute("""
+        SELECT t.id, t.name FROM teams t WHERE EXISTS (SELECT 1 FROM team_ratings WHERE team_name = t.name)
+        ORDER BY t.id LIMIT 1
+    """).fetchone()
+    ratings = conn.execute("SELECT year, points FROM team_ratings WHERE team_name = ? ORDER BY year",
+                           (name,)).fetchall()
+    versions = dict(conn.execute("SELECT table_name, version FROM data_versions"))
+    admin_writes.update_team(conn, team_id, "Renamed FC", None, None, None)
+
+    assert conn.execute("SELECT COUNT(*) FROM team_ratings WHERE team_name = ?", (name,)).fetchone()[0] == 0
+    assert conn.execute("SELECT year, points FROM team_ratings WHERE team_name = 'Renamed FC' ORDER BY year"
+                        ).fetchall() == ratings
+    for year, _ in ratings:
+        svg = conn.execute("SELECT svg FROM rating_charts WHERE year = ?", (year,)).fetchone()[0]
+        assert "Renamed FC" in svg and name not in svg
+    assert dict(conn.execute("SELECT table_name, version FROM data_versions"))["team_ratings"] \
+        > versions.get("team_ratings", 0)
+
+
+@pytest.mark.parametrize("field", ["goals", "yellow_cards", "red_cards"])
+def test_edit_player_form_rejects_non_numbers(admin_client, database, field):
+    with sqlite3.connect(database) as conn:
+        player_id, goals, yellow, red = conn.execute(
+            "SELECT id, goals, yellow_cards, red_cards FROM players ORDER BY id LIMIT 1").fetchone()
+    form = {"goals": goals, "yellow_cards": yellow, "red_cards": red, field: "three"}
+    response = admin_client.post(f"/edit_player/{player_id}", data=form)
+    assert response.status_code == 302 and response.headers["Location"].endswith(f"/edit_player/{player_id}")
+    with admin_client.session_transaction() as session:
+        assert any("whole number" in message for _, message in session["_flashes"])
+    with sqlite3.connect(database) as conn:
+        assert conn.execute("SELECT goals, yellow_cards, red_cards FROM players WHERE id = ?",
+                            (player_id,)).fetchone() == (goals, yellow, red)
@@ -0,0 +1,32 @@
+"""Which thread pool each request runs on under ASGI (user-015)."""
+import pytest
+
+pytest.importorskip("a2wsgi")
+
+
+@pytest.fixture
+def route_pool(app, monkeypatch):
+    # Importing asgi turns live updates on; put the setting back afterwards
+    monkeypatch.setitem(app.config, "LIVE_UPDATES", app.config["LIVE_UPDATES"])
+    import asgi
+
+    return lambda method, path: asgi.route_pool(app, method, path)
+
+
+@pytest.mark.parametrize("path", ["/", "/matches", "/user", "/team_summary", "/static/images/Gosho.jpg",
+                                  "/api/matches", "/api/matches/changes", "/api/leaderboards",
+                                  "/api/tournament", "/api/team_summaries"])
+def test_public_reads_use_the_read_pool(route_pool, path):
+    assert route_pool("GET", path) == "read"
+
+
+@pytest.mark.parametrize("method, path", [("GET", "/admin"), ("GET", "/api/admin/players"),
+                                          ("GET", "/api/export/fixtures"), ("GET", "/cache_stats"),
+                                          ("POST", "/admin/import"), ("POST", "/api/matches"),
+                                          ("GET", "/no/such/page")])
+def test_admin_and_unknown_routes_use_the_admin_pool(route_pool, method, path):
+    assert route_pool(method, path) == "admin"
+
+
+def test_live_stream_has_its_own_pool(route_pool):
+    assert route_pool("GET", "/api/matches/stream") == "live"
@@ -0,0 +1,60 @@
+"""Badge uploads become the variants the pages use, and every stored badge
+path renders through ``badge_url`` (user-011)."""
+import io
+import os
+
+import pytest
+
+import badges
+
+PIL = pytest.importorskip("PIL")
+
+
+def png_upload(size=(300, 200)):
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGBA", size, (255, 106, 0, 128)).save(buffer, "PNG")
+    buffer.seek(0)
+    return buffer
+
+
+def test_upload_offers_every_size(app, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = badges.store_badge(png_upload())
+    assert path.startswith("static/badges/") and path.endswith("-thumb.png")
+    assert sorted(name.split("-", 1)[1] for name in os.listdir("static/badges")) == [
+        "medium.png", "medium.webp", "thumb.png", "thumb.webp"]
+
+    medium = path.replace("-thumb.png", "-medium.webp")
+    with app.test_request_context():
+        assert badges.badge_url(path) == "/" + path
+        assert badges.badge_url(path, "webp") == "/" + path.replace(".png", ".webp")
+        assert badges.badge_srcset(path, "webp") == f"/{path.replace('.png', '.webp')} 80w, /{medium} 256w"
+
+
+@pytest.mark.parametrize("stored", ["static/badges/LOGO PNG.png", "/static/badges/LOGO PNG.png"])
+def test_legacy_badge_paths_render_the_same(app, stored):
+    with app.test_request_context():
+        assert badges.badge_url(stored) == "/static/badges/LOGO%20PNG.png"
+        assert badges.badge_url(stored, "webp") is None
+        assert badges.badge_srcset(stored, "webp") is None
+
+
+def test_no_badge(app):
+    with app.test_request_context():
+        assert badges.badge_url(None) is None
+        assert badges.badge_url("") is None
+
+
+def test_photos_offer_every_size_once_backfilled(app, client, tmp_path, monkeypatch):
+    assert 'type="image/webp"' not in client.get("/").get_data(as_text=True)
+
+    manifest = tmp_path / "image_variants.json"
+    manifest.write_text('{"images/Musa.jpg": {"medium": {"webp": "images/abc-medium.webp"},'
+                        ' "large": {"webp": "images/abc-large.webp"}}}')
+    monkeypatch.setattr(badges, "IMAGE_MANIFEST", str(manifest))
+    with app.test_request_context():
+        assert badges.image_srcset("images/Musa.jpg") == \
+            "/static/images/abc-medium.webp 800w, /static/images/abc-large.webp 1600w"
+        assert badges.image_srcset("images/Gosho.jpg") is None
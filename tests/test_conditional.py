@@ -0,0 +1,99 @@
+"""Revalidating public pages answers 304 from the data versions alone (user-008)."""
+import re
+import sqlite3
+
+import pytest
+
+import admin_writes
+import cache
+from conftest import YEAR
+
+HEAVY_TABLES = {"matches", "match_goals", "team_ratings", "team_standings", "players",
+                "season_scorers", "season_discipline"}
+# URL -> the data versions its ETag is built from
+DEPENDS_ON = {
+    "/matches": ("matches", "teams", "match_goals", "players"),
+    f"/matches?year={YEAR}": ("matches", "teams", "match_goals", "players"),
+    f"/user?year={YEAR}": ("team_ratings", "teams", "matches"),
+    f"/api/team_summaries?year={YEAR}": ("teams", "matches"),
+    "/api/matches?limit=20": ("matches", "teams", "match_goals", "players"),
+    f"/api/leaderboards?year={YEAR}": ("matches", "match_goals", "players", "teams"),
+    f"/api/tournament?year={YEAR}": ("matches", "teams"),
+}
+URLS = list(DEPENDS_ON)
+
+
+@pytest.fixture
+def statements(app):
+    """Every statement run on a connection handed out during the test."""
+    log = []
+    saved = app.extensions.get("db_wrapper")
+
+    def trace(conn):
+        conn.set_trace_callback(log.append)
+        return saved(conn) if saved else conn
+
+    app.extensions["db_wrapper"] = trace
+    yield log
+    if saved is None:
+        app.extensions.pop("db_wrapper")
+    else:
+        app.extensions["db_wrapper"] = saved
+
+
+def tables_read(log):
+    return {name for statement in log for name in re.findall(r"(?:FROM|JOIN)\s+(\w+)", statement)}
+
+
+@pytest.mark.parametrize("url", URLS + ["/team_summary?team={team}"])
+def test_revalidation_reads_no_data_tables(client, database, statements, url):
+    with sqlite3.connect(database) as conn:
+        url = url.format(team=conn.execute("SELECT name FROM teams ORDER BY id LIMIT 1").fetchone()[0])
+    fresh = client.get(url)
+    assert fresh.status_code == 200 and fresh.headers["ETag"]
+    assert tables_read(statements) & HEAVY_TABLES  # the trace sees the full render
+
+    statements.clear()
+    revalidated = client.get(url, headers={"If-None-Match": fresh.headers["ETag"]})
+    assert revalidated.status_code == 304
+    assert revalidated.get_data() == b""
+    assert not tables_read(statements) & HEAVY_TABLES
+
+
+def test_admin_write_changes_the_etag(client, database):
+    fresh = client.get("/matches")
+    with sqlite3.connect(database, isolation_level=None) as conn:
+        match_id = conn.execute("SELECT MAX(id) FROM matches").fetchone()[0]
+        admin_writes.update_match(conn, match_id, {"score_a": 9})
+    revalidated = client.get("/matches", headers={"If-None-Match": fresh.headers["ETag"]})
+    assert revalidated.status_code == 200
+    assert revalidated.headers["ETag"] != fresh.headers["ETag"]
+
+
+def test_deploy_changes_the_etag(app, client, monkeypatch, tmp_path):
+    fresh = client.get("/matches")
+
+    # New templates, as a restart after a deploy would fingerprint them
+    monkeypatch.setitem(app.extensions, "template_fingerprint", "new-templates")
+    revalidated = client.get("/matches", headers={"If-None-Match": fresh.headers["ETag"]})
+    assert revalidated.status_code == 200
+
+    # A new asset build, picked up without a restart
+    manifest = tmp_path / "manifest.json"
+    manifest.write_text('{"css/site.css": "dist/css/site.0123456789abcdef.css"}')
+    monkeypatch.setattr(app.extensions["asset_manifest"], "path", str(manifest))
+    rebuilt = client.get("/matches", headers={"If-None-Match": revalidated.headers["ETag"]})
+    assert rebuilt.status_code == 200
+    assert len({fresh.headers["ETag"], revalidated.headers["ETag"], rebuilt.headers["ETag"]}) == 3
+
+
+@pytest.mark.parametrize("url, table", [(url, table) for url, tables in DEPENDS_ON.items() for table in tables])
+def test_bumping_each_table_changes_the_etag(client, database, url, table):
+    fresh = client.get(url)
+    with sqlite3.connect(database, isolation_level=None) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        cache.bump_versions(conn, table)
+        conn.execute("COMMIT")
+    revalidated = client.get(url, headers={"If-None-Match": fresh.headers["ETag"]})
+    assert revalidated.status_code == 200
+    assert revalidated.headers["ETag"] != fresh.headers["ETag"]
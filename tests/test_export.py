@@ -0,0 +1,44 @@
+"""Season exports seek by year and reject malformed seasons (user-025)."""
+import csv
+import io
+import json
+import sqlite3
+
+import pytest
+
+import export
+from conftest import YEAR
+
+# The alias each export's driving table goes by
+DRIVING_TABLE = {"fixtures": "m", "players": "p", "ratings": "team_ratings"}
+
+
+@pytest.mark.parametrize("kind", sorted(export.EXPORTS))
+def test_season_export_seeks_by_year(app, client, database, kind):
+    client.get("/matches")  # brings the schema up to date
+    with sqlite3.connect(database) as conn:
+        plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + export.query(kind, [YEAR]),
+                                               {"years": json.dumps([YEAR])})]
+    assert f"SCAN {DRIVING_TABLE[kind]}" not in plan
+    assert ":years" not in export.query(kind)
+
+
+def test_export_keeps_only_the_chosen_season(admin_client):
+    everything = list(csv.DictReader(io.StringIO(admin_client.get("/api/export/fixtures").get_data(as_text=True))))
+    season = list(csv.DictReader(io.StringIO(
+        admin_client.get(f"/api/export/fixtures?year={YEAR}").get_data(as_text=True))))
+    assert {row["year"] for row in everything} == {str(YEAR - 1), str(YEAR)}
+    assert season == [row for row in everything if row["year"] == str(YEAR)]
+
+
+@pytest.mark.parametrize("year", ["twenty", "2025.0", "-1", ""])
+def test_malformed_season_is_rejected(admin_client, year):
+    response = admin_client.get(f"/api/export/fixtures?year={YEAR}&year={year}")
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+def test_export_needs_an_admin(client):
+    response = client.get("/api/export/fixtures")
+    assert response.status_code == 401
+    assert "error" in response.get_json()
@@ -0,0 +1,72 @@
+"""Bulk import formats, and imports that stop part-way (user-010)."""
+import io
+import json
+import sqlite3
+from datetime import date, timedelta
+
+import importer
+from conftest import YEAR
+
+
+def fixture_rows(database, count):
+    with sqlite3.connect(database) as conn:
+        team_a, team_b = [name for (name,) in conn.execute("SELECT name FROM teams ORDER BY id LIMIT 2")]
+    return [{"team_a": team_a, "team_b": team_b, "score_a": 1, "score_b": n % 3,
+             "date": (date(YEAR, 1, 1) + timedelta(days=n % 365)).isoformat(),
+             "stage": "Friendly", "venue": "Import Park"} for n in range(count)]
+
+
+def upload(admin_client, data, filename):
+    return admin_client.post("/admin/import", data={"kind": "fixtures", "file": (io.BytesIO(data), filename)})
+
+
+def test_json_lines_upload(admin_client, database):
+    data = "".join(json.dumps(row) + "\n" for row in fixture_rows(database, 3)).encode()
+    response = upload(admin_client, data, "fixtures.jsonl")
+    assert response.status_code == 200
+    assert response.get_json() == {"inserted": 3, "error_count": 0, "errors": [], "stopped": None}
+
+
+def test_json_array_is_refused(admin_client, database):
+    response = upload(admin_client, json.dumps(fixture_rows(database, 3)).encode(), "fixtures.json")
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+def test_undecodable_upload_reports_what_was_saved(admin_client, database):
+    data = "".join(json.dumps(row) + "\n" for row in fixture_rows(database, 3)).encode() + b"\xff\xfe\n"
+    response = upload(admin_client, data, "fixtures.jsonl")
+    assert response.status_code == 400
+    report = response.get_json()
+    assert report["inserted"] == 0 and "stopped" in report["stopped"]
+
+
+def test_stopped_import_keeps_committed_chunks(database):
+    rows = fixture_rows(database, 300)  # well past the decoder's first read
+    data = ("".join(json.dumps(row) + "\n" for row in rows[:-1]).encode() + b"\xff\n"
+            + json.dumps(rows[-1]).encode())
+    conn = sqlite3.connect(database, isolation_level=None)
+    before = conn.execute("SELECT COUNT(*) FROM matches").fetchone()[0]
+    stream = io.TextIOWrapper(io.BytesIO(data), encoding="utf-8", newline="")
+    report = importer.run_import(conn, "fixtures", stream, "jsonl", chunk_size=20)
+    assert report.bad_file and report.stopped
+    assert 0 < report.inserted < len(rows)
+    assert not conn.in_transaction
+    assert conn.execute("SELECT COUNT(*) FROM matches").fetchone()[0] - before == report.inserted
+    conn.close()
+
+
+def test_imported_fixtures_reach_live_listeners(admin_client, database, monkeypatch):
+    import app as app_module
+
+    notified = []
+    monkeypatch.setattr(app_module.broadcaster, "notify", lambda: notified.append(True))
+    since = admin_client.get("/api/matches/changes?since=0").get_json()["last_id"]
+    data = "".join(json.dumps(row) + "\n" for row in fixture_rows(database, 3)).encode()
+    assert upload(admin_client, data, "fixtures.jsonl").get_json()["inserted"] == 3
+
+    events = admin_client.get(f"/api/matches/changes?since={since}").get_json()["events"]
+    with sqlite3.connect(database) as conn:
+        imported = [match_id for (match_id,) in conn.execute("SELECT id FROM matches ORDER BY id DESC LIMIT 3")]
+    assert sorted(event["match"]["id"] for event in events) == sorted(imported)
+    assert notified
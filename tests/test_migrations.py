@@ -0,0 +1,59 @@
+"""Versioned migrations and the hot-query plans each step is responsible for (user-005)."""
+import shutil
+import sqlite3
+
+import pytest
+
+from conftest import ROOT
+
+import migrations
+
+STEPS_WITH_QUERIES = [(version, description, queries)
+                      for version, description, _, queries in migrations.MIGRATIONS if queries]
+
+
+def test_fresh_database_applies_every_step_once(tmp_path):
+    path = str(tmp_path / "fresh.db")
+    assert migrations.migrate(path) == [version for version, *_ in migrations.MIGRATIONS]
+    assert migrations.migrate(path) == []
+    with sqlite3.connect(path) as conn:
+        assert migrations.schema_version(conn) == migrations.SCHEMA_VERSION
+
+
+def test_shipped_database_migrates(tmp_path):
+    path = str(tmp_path / "shipped.db")
+    shutil.copy(f"{ROOT}/ultimate_cup.db", path)
+    migrations.migrate(path)
+    with sqlite3.connect(path) as conn:
+        assert migrations.schema_version(conn) == migrations.SCHEMA_VERSION
+        migrations.check_query_plans(conn)
+
+
+@pytest.mark.parametrize("version, description, queries", STEPS_WITH_QUERIES,
+                         ids=[description for _, description, _ in STEPS_WITH_QUERIES])
+def test_step_indexes_its_hot_queries(tmp_path, version, description, queries):
+    # Stop right after this step, so its own indexes must serve its queries
+    path = str(tmp_path / "partial.db")
+    migrations.migrate(path, target=version)
+    with sqlite3.connect(path) as conn:
+        assert migrations.schema_version(conn) == version
+        for name, sql, tables in queries:
+            assert migrations.unindexed_tables(conn, sql, tables) == [], name
+
+
+def test_hot_queries_use_indexes_on_a_populated_database(database):
+    with sqlite3.connect(database) as conn:
+        migrations.check_query_plans(conn)
+
+
+def test_duplicate_team_names_are_renamed(tmp_path):
+    path = str(tmp_path / "duplicates.db")
+    migrations.migrate(path, target=11)
+    with sqlite3.connect(path) as conn:
+        conn.executemany("INSERT INTO teams (id, name) VALUES (?, ?)", [(1, "Lions"), (2, "Eagles"), (3, "Lions")])
+    migrations.migrate(path)
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT id, name FROM teams ORDER BY id").fetchall() == [
+            (1, "Lions"), (2, "Eagles"), (3, "Lions (3)")]
+        with pytest.raises(sqlite3.IntegrityError):
+            conn.execute("INSERT INTO teams (name) VALUES ('Eagles')")
@@ -0,0 +1,67 @@
+"""Public pages keep answering while an admin write holds the lock, in every
+``DB_READ_MODE``, and the separate read pools can't write (user-024)."""
+import sqlite3
+import threading
+import time
+
+import pytest
+
+import db
+from conftest import YEAR
+
+HOLD_SECONDS = 1.0
+URLS = ["/", "/matches", f"/user?year={YEAR}", f"/api/team_summaries?year={YEAR}", "/api/matches?limit=20",
+        f"/api/leaderboards?year={YEAR}"]
+
+
+@pytest.fixture(params=db.READ_MODES)
+def read_mode(request, app):
+    db.close_pool(app)
+    app.config.update(DB_READ_MODE=request.param, DB_SNAPSHOT_SECONDS=0.2)
+    return request.param
+
+
+def hold_write_lock(database, held, release):
+    """Take the write lock, leave a change uncommitted and hold it until ``release`` (or HOLD_SECONDS)."""
+    conn = sqlite3.connect(database, isolation_level=None)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("UPDATE matches SET score_a = score_a + 1")
+        held.set()
+        release.wait(HOLD_SECONDS)
+        conn.execute("ROLLBACK")
+    finally:
+        conn.close()
+
+
+def test_public_reads_never_wait_for_a_write(client, database, read_mode):
+    client.get("/matches")  # open the pools, the WAL and the first snapshot before the lock is taken
+    held, release = threading.Event(), threading.Event()
+    writer = threading.Thread(target=hold_write_lock, args=(database, held, release))
+    writer.start()
+    try:
+        assert held.wait(5)
+        timings = {}
+        for url in URLS:
+            start = time.perf_counter()
+            response = client.get(url)
+            timings[url] = time.perf_counter() - start
+            assert response.status_code == 200, url
+        assert writer.is_alive(), "the write lock was released before the reads finished"
+    finally:
+        release.set()
+        writer.join()
+    assert max(timings.values()) < HOLD_SECONDS / 2, timings
+
+
+@pytest.mark.parametrize("mode", ["readonly", "snapshot"])
+def test_read_pools_refuse_writes(app, mode):
+    app.config["DB_READ_MODE"] = mode
+    with app.app_context():
+        pool = db.get_read_pool(app)
+        conn = pool.acquire()
+        try:
+            with pytest.raises(sqlite3.OperationalError):
+                conn.execute("UPDATE teams SET name = name")
+        finally:
+            pool.release(conn)
@@ -0,0 +1,26 @@
+"""The response cache serves repeats, follows the build version, and its
+stats are for admins only (user-007)."""
+import app as app_module
+
+
+def test_cache_stats_need_an_admin(client):
+    assert client.get("/cache_stats").status_code == 401
+
+
+def test_cache_stats_for_an_admin(admin_client):
+    admin_client.get("/")
+    admin_client.get("/")
+    stats = admin_client.get("/cache_stats").get_json()
+    assert stats["hits"] >= 1 and stats["entries"] >= 1
+
+
+def test_home_page_follows_the_build_version(app, client, monkeypatch):
+    client.get("/")
+    client.get("/")
+    hits = app_module.response_cache.hits
+    assert hits >= 1
+
+    monkeypatch.setitem(app.extensions, "template_fingerprint", "new-templates")
+    client.get("/")
+    assert app_module.response_cache.hits == hits
+    assert app_module.response_cache.invalidations >= 1
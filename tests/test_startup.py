@@ -0,0 +1,29 @@
+"""Importing app must not pull in the heavy analytics packages (user-004)."""
+import json
+import subprocess
+import sys
+
+from conftest import ROOT
+
+HEAVY_MODULES = ("pandas", "plotly", "numpy")
+
+IMPORT_APP = f"""
+import json, sys
+import app
+print(json.dumps([name for name in {HEAVY_MODULES!r} if name in sys.modules]))
+"""
+
+
+def test_app_import_loads_no_heavy_modules():
+    # A fresh interpreter, so nothing another test imported counts
+    result = subprocess.run([sys.executable, "-c", IMPORT_APP], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert json.loads(result.stdout.splitlines()[-1]) == []
+
+
+def test_first_page_loads_no_heavy_modules(database):
+    script = IMPORT_APP.replace("import app\n", f"""import app
+app.app.config["DATABASE"] = {database!r}
+assert app.app.test_client().get("/").status_code == 200
+""")
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert json.loads(result.stdout.splitlines()[-1]) == []
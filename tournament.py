@@ -0,0 +1,220 @@
+"""Group tables and knockout bracket for a season, computed from its fixtures.
+
+``build(fixtures)`` makes a single pass over a season's fixtures in date
+order. Group Stage results go into per-team rows; every other stage becomes
+a knockout round. Groups come from the fixtures themselves: teams that met
+in the group stage share a group. A group takes its label from
+``teams.group_name`` when all of its teams agree, so the tables stay right
+even when the draw changes from season to season.
+
+Group tables are ordered by points, goal difference, then goals scored.
+Teams still level are separated by a mini-table of only the games between
+them (points, goal difference, goals scored), and finally by name.
+
+Knockout rounds are listed in the order they were first played. A tie level
+after the recorded score (decided on penalties, say) has no winner, because
+the fixtures do not record one. Each decided tie links to the next tie its
+winner plays, as ``{"stage", "index"}``.
+
+The app keeps built seasons in a ``cache.SeasonCache`` keyed by
+``(year, data versions)``, so a fixture or team write makes the next read
+rebuild.
+
+    python tournament.py [database] [--year 2025]
+"""
+import argparse
+import itertools
+import sqlite3
+from collections import OrderedDict
+
+TABLES = ("matches", "teams")  # data versions a built season depends on
+
+SEASON_QUERY = """
+    SELECT m.id, m.team_a, m.team_b, m.score_a, m.score_b, m.stage, m.date,
+           t1.name AS team_a_name, t1.group_name AS team_a_group,
+           t2.name AS team_b_name, t2.group_name AS team_b_group
+    FROM matches m
+    JOIN teams t1 ON m.team_a = t1.id
+    JOIN teams t2 ON m.team_b = t2.id
+    WHERE m.year = ?
+    ORDER BY m.date, m.id
+"""
+
+
+def load_season(conn, year):
+    return conn.execute(SEASON_QUERY, (str(year),)).fetchall()
+
+
+def _is_group_stage(stage):
+    return (stage or "").strip().lower().startswith("group")
+
+
+def _new_row(team_id, name):
+    return {"team_id": team_id, "team": name, "played": 0, "wins": 0, "draws": 0, "losses": 0,
+            "goals_for": 0, "goals_against": 0, "goal_difference": 0, "points": 0}
+
+
+def _record(row, gf, ga):
+    row["played"] += 1
+    row["goals_for"] += gf
+    row["goals_against"] += ga
+    row["goal_difference"] += gf - ga
+    if gf > ga:
+        row["wins"] += 1
+        row["points"] += 3
+    elif gf == ga:
+        row["draws"] += 1
+        row["points"] += 1
+    else:
+        row["losses"] += 1
+
+
+def _key(row):
+    return row["points"], row["goal_difference"], row["goals_for"]
+
+
+def _rank_group(rows, results):
+    """Order one group's rows, breaking full ties with head-to-head results."""
+    rows = sorted(rows, key=lambda r: (-r["points"], -r["goal_difference"], -r["goals_for"], r["team"]))
+    ranked, i = [], 0
+    while i < len(rows):
+        j = i
+        while j + 1 < len(rows) and _key(rows[j + 1]) == _key(rows[i]):
+            j += 1
+        tied = rows[i:j + 1]
+        if len(tied) > 1:
+            ids = {r["team_id"] for r in tied}
+            mini = {r["team_id"]: _new_row(r["team_id"], r["team"]) for r in tied}
+            for team_a, team_b, score_a, score_b in results:
+                if team_a in ids and team_b in ids:
+                    _record(mini[team_a], score_a, score_b)
+                    _record(mini[team_b], score_b, score_a)
+            tied.sort(key=lambda r: (-mini[r["team_id"]]["points"], -mini[r["team_id"]]["goal_difference"],
+                                     -mini[r["team_id"]]["goals_for"], r["team"]))
+        ranked.extend(tied)
+        i = j + 1
+    for position, row in enumerate(ranked, start=1):
+        row["position"] = position
+    return ranked
+
+
+def build(fixtures):
+    """Group tables and knockout rounds from one season's fixture rows (date order)."""
+    rows, names, group_labels = {}, {}, {}
+    parent = {}  # union-find over group-stage opponents
+    group_results = []
+    rounds = OrderedDict()  # stage -> ties, in the order stages are first played
+
+    def find(team):
+        while parent[team] != team:
+            parent[team] = parent[parent[team]]
+            team = parent[team]
+        return team
+
+    for f in fixtures:
+        names[f["team_a"]], names[f["team_b"]] = f["team_a_name"], f["team_b_name"]
+        group_labels.setdefault(f["team_a"], f["team_a_group"])
+        group_labels.setdefault(f["team_b"], f["team_b_group"])
+        played = f["score_a"] is not None and f["score_b"] is not None
+
+        if _is_group_stage(f["stage"]):
+            for team in (f["team_a"], f["team_b"]):
+                if team not in rows:
+                    rows[team] = _new_row(team, names[team])
+                    parent[team] = team
+            root_a, root_b = find(f["team_a"]), find(f["team_b"])
+            if root_a != root_b:
+                parent[root_b] = root_a
+            if played:
+                _record(rows[f["team_a"]], f["score_a"], f["score_b"])
+                _record(rows[f["team_b"]], f["score_b"], f["score_a"])
+                group_results.append((f["team_a"], f["team_b"], f["score_a"], f["score_b"]))
+            continue
+
+        stage = f["stage"] or "Knockout"
+        winner = None
+        if played and f["score_a"] != f["score_b"]:
+            winner = f["team_a"] if f["score_a"] > f["score_b"] else f["team_b"]
+        rounds.setdefault(stage, []).append({
+            "match_id": f["id"], "date": f["date"],
+            "team_a": names[f["team_a"]], "team_b": names[f["team_b"]],
+            "team_a_id": f["team_a"], "team_b_id": f["team_b"],
+            "score_a": f["score_a"], "score_b": f["score_b"],
+            "winner": names[winner] if winner else None, "winner_id": winner, "next": None,
+        })
+
+    # ---------- Groups ----------
+    members = {}
+    for team in rows:
+        members.setdefault(find(team), []).append(team)
+    groups = []
+    for teams in members.values():
+        labels = {group_labels.get(team) for team in teams}
+        label = labels.pop() if len(labels) == 1 and None not in labels else None
+        groups.append([label, teams])
+    groups.sort(key=lambda g: (g[0] is None, g[0] or "", min(names[t] for t in g[1])))
+    taken = {label for label, _ in groups if label}
+    letters = (f"Group {chr(65 + i)}" if i < 26 else f"Group {i + 1}" for i in itertools.count())
+    for group in groups:
+        if group[0] is None or [g[0] for g in groups].count(group[0]) > 1:
+            group[0] = next(letter for letter in letters if letter not in taken)
+            taken.add(group[0])
+
+    result_sets = {}
+    for result in group_results:
+        result_sets.setdefault(find(result[0]), []).append(result)
+    group_tables = [
+        {"group": label, "table": _rank_group([rows[t] for t in teams], result_sets.get(find(teams[0]), []))}
+        for label, teams in groups
+    ]
+
+    # ---------- Knockout bracket ----------
+    # Later rounds, searched in order, so a third-place match between the
+    # semi-finals and the final doesn't hide the final
+    ordered = list(rounds.items())
+    next_tie = {}  # team -> (stage, index) of its latest tie seen walking backwards
+    for stage, ties in reversed(ordered):
+        for tie in ties:
+            if tie["winner_id"] is not None and tie["winner_id"] in next_tie:
+                tie["next"] = dict(zip(("stage", "index"), next_tie[tie["winner_id"]]))
+        for index, tie in enumerate(ties):
+            next_tie[tie["team_a_id"]] = next_tie[tie["team_b_id"]] = (stage, index)
+    final = rounds.get("Final")
+    champion = final[-1]["winner"] if final else None
+
+    return {
+        "groups": group_tables,
+        "knockout": [{"stage": stage, "ties": ties} for stage, ties in ordered],
+        "champion": champion,
+    }
+
+
+def season(conn, year):
+    """``build()`` for one season straight from the database."""
+    return build(load_season(conn, year))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Print a season's group tables and knockout bracket.")
+    parser.add_argument("database", nargs="?", default="ultimate_cup.db")
+    parser.add_argument("--year", type=int)
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.database)
+    conn.row_factory = sqlite3.Row
+    year = args.year or conn.execute("SELECT MAX(CAST(year AS INTEGER)) FROM matches").fetchone()[0]
+    built = season(conn, year)
+    conn.close()
+
+    print(f"🏆 {year}")
+    for group in built["groups"]:
+        print(f"\n{group['group']}")
+        for row in group["table"]:
+            print(f"  {row['position']}. {row['team']:<28} P{row['played']} W{row['wins']} D{row['draws']} "
+                  f"L{row['losses']} GD{row['goal_difference']:+d} {row['points']} pts")
+    for knockout_round in built["knockout"]:
+        print(f"\n{knockout_round['stage']}")
+        for tie in knockout_round["ties"]:
+            print(f"  {tie['team_a']} {tie['score_a']} - {tie['score_b']} {tie['team_b']}"
+                  + (f"  → {tie['winner']}" if tie["winner"] else ""))
+    print(f"\n✅ Champion: {built['champion']}" if built["champion"] else "\n⏳ No champion yet")